@@ -0,0 +1,238 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from constants import EMPTY_CONFIG_HAND
+from constraints import MasterConstraintList, UnsupportedConstraints
+from constraintspecs import EncodedSlots, compile_specs
+
+CONFIGHANDS = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+
+#one row of a constraint report: a single slot of one config-hand that breaks a constraint
+Violation = namedtuple('Violation', ['gloss', 'confighand', 'slot', 'constraint'])
+
+
+class SlotData:
+    """
+    Stands in for a transcription slot widget, so that the classes in constraints.py can check a transcription
+    stored in a Sign. Like the widgets, an empty slot has the text '' and slot 1 (the forearm checkbox) is 'V' or '_'.
+    """
+
+    __slots__ = ('num', 'symbol')
+
+    def __init__(self, num, symbol):
+        self.num = num
+        self.symbol = symbol
+
+    def __repr__(self):
+        return 'SlotData({!r}, {!r})'.format(self.num, self.symbol)
+
+    def text(self):
+        return self.symbol
+
+    def getText(self, empty_text='_'):
+        return self.symbol if self.symbol else empty_text
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return self.symbol == other
+        else:
+            return self.symbol == other.text()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+def slot_data(transcription):
+    """
+    :param transcription: a list of 34 symbols, as stored in Sign.config1hand1 and the like
+    :return: a list of 34 SlotData, in the same order as TranscriptionLayout.slots
+    """
+    slots = [SlotData(1, 'V' if transcription[0] and transcription[0] != '_' else '_')]
+    slots.extend(SlotData(n, '' if symbol == '_' or not symbol else symbol)
+                 for n, symbol in enumerate(transcription[1:], start=2))
+    return slots
+
+
+def is_empty(transcription):
+    return tuple(symbol if symbol else '_' for symbol in transcription[1:]) == EMPTY_CONFIG_HAND
+
+
+def supported_constraints(selected=None):
+    """
+    :param selected: None for every constraint, a list of constraint names, or a dictionary of
+    {name: True/False} like the one the main window keeps in its settings
+    :return: a list of (name, constraint class) from MasterConstraintList that can be checked on a transcription
+    """
+    if isinstance(selected, dict):
+        selected = [name for name, value in selected.items() if value]
+    return [(name, constraint) for name, constraint in MasterConstraintList
+            if constraint not in UnsupportedConstraints and (selected is None or name in selected)]
+
+
+def check_transcription(transcription, constraints):
+    """
+    :param transcription: a list of 34 symbols
+    :param constraints: a list of (name, constraint class), as returned by supported_constraints
+    :return: a list of (slot number, constraint name) tuples, sorted by slot
+    """
+    slots = slot_data(transcription)
+    output = list()
+    for name, constraint in constraints:
+        result = constraint.check(slots)
+        if result:
+            output.extend((int(slot), constraint.name) for slot in result.split(', '))
+    output.sort()
+    return output
+
+
+def check_rows(rows, constraint_names, skip_empty=True):
+    """
+    The part of check_corpus that runs in a worker process. Signs are sent as plain tuples rather than Sign objects,
+    so that their parameter trees do not have to be pickled.
+    :param rows: a list of (gloss, config1hand1, config1hand2, config2hand1, config2hand2) tuples
+    :param constraint_names: the names of the constraints to check
+    :return: a list of Violations
+    """
+    constraints = supported_constraints(constraint_names)
+    violations = list()
+    for gloss, *transcriptions in rows:
+        for confighand, transcription in zip(CONFIGHANDS, transcriptions):
+            if skip_empty and is_empty(transcription):
+                continue
+            violations.extend(Violation(gloss, confighand, slot, name)
+                              for slot, name in check_transcription(transcription, constraints))
+    return violations
+
+
+def check_corpus(signs, constraints=None, skip_empty=True, processes=None, chunk=2000):
+    """
+    Check every sign against the transcription constraints. This gives the same answers as the
+    'Check transcription' button would for each sign, without loading the signs into the main window.
+    :param signs: a Corpus or any iterable of signs
+    :param constraints: None for every supported constraint, a list of names, or a {name: True/False} dictionary
+    :param skip_empty: if True, config-hands with nothing transcribed are not checked, so that one-hand and
+    one-config signs are not reported for the empty slots of their unused config-hands
+    :param processes: the number of worker processes, None to let the pool decide, or 1 to run here
+    :param chunk: the number of signs sent to a worker at a time
+    :return: a ConstraintReport
+    """
+    names = [name for name, constraint in supported_constraints(constraints)]
+    rows = [(sign.gloss, sign.config1hand1, sign.config1hand2, sign.config2hand1, sign.config2hand2)
+            for sign in signs]
+    chunks = [rows[n:n+chunk] for n in range(0, len(rows), chunk)]
+
+    if len(chunks) < 2 or processes == 1:
+        results = [check_rows(rows, names, skip_empty) for rows in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(check_rows, rows, names, skip_empty) for rows in chunks]
+            results = [future.result() for future in futures]
+
+    report = ConstraintReport(names, len(rows))
+    for violations in results:
+        report.violations.extend(violations)
+    return report
+
+
+def compiled_constraints(selected=None, specs=None):
+    """
+    :param selected: None, a list of constraint ids or a {id: True/False} dictionary, as for supported_constraints
+    :param specs: a list of constraint specs, or None for the ports of the constraints in constraints.py
+    :return: a list of (id, CompiledConstraint)
+    """
+    if isinstance(selected, dict):
+        selected = [name for name, value in selected.items() if value]
+    return [(name, constraint) for name, constraint in compile_specs(specs)
+            if selected is None or name in selected]
+
+
+def check_corpus_compiled(signs, constraints=None, specs=None, skip_empty=True):
+    """
+    The same check as check_corpus, but with constraint specs evaluated on all the transcriptions of each
+    config-hand at once instead of the classes in constraints.py
+    :param specs: a list of constraint specs, or None for the ports of the constraints in constraints.py
+    :return: a ConstraintReport
+    """
+    compiled = compiled_constraints(constraints, specs)
+    signs = list(signs)
+    found = list()
+    for position, confighand in enumerate(CONFIGHANDS):
+        transcriptions = [getattr(sign, confighand) for sign in signs]
+        encoded = EncodedSlots(transcriptions)
+        checked = ~encoded.empty(EMPTY_CONFIG_HAND) if skip_empty else np.ones(len(encoded), dtype=bool)
+        checked = checked[:, np.newaxis]
+        for name, constraint in compiled:
+            rows, columns = np.nonzero(constraint.evaluate(encoded) & checked)
+            found.extend((row, position, column+1, constraint.name) for row, column in zip(rows.tolist(),
+                                                                                         columns.tolist()))
+    found.sort()
+
+    report = ConstraintReport([name for name, constraint in compiled], len(signs))
+    report.violations.extend(Violation(signs[row].gloss, CONFIGHANDS[position], slot, name)
+                             for row, position, slot, name in found)
+    return report
+
+
+def compare_specs(transcriptions, specs=None):
+    """
+    Check that the constraint specs give exactly the same violations as the classes in constraints.py with the same
+    ids. tests/test_constraintspecs.py runs it on fixtures and random transcriptions, and it can be run on any list of
+    transcriptions, such as every config-hand in a corpus.
+    :param transcriptions: a list of transcriptions, each a list of 34 symbols
+    :return: a list of (transcription, constraint id, violations from the class, violations from the spec) for every
+    disagreement, which is empty if the specs match
+    """
+    transcriptions = list(transcriptions)
+    classes = dict(supported_constraints())
+    encoded = EncodedSlots(transcriptions)
+    differences = list()
+    for name, compiled in compile_specs(specs):
+        if name not in classes:
+            continue
+        violations = compiled.evaluate(encoded)
+        for row, transcription in enumerate(transcriptions):
+            expected = [slot for slot, constraint in check_transcription(transcription, [(name, classes[name])])]
+            found = (np.nonzero(violations[row])[0] + 1).tolist()
+            if expected != found:
+                differences.append((transcription, name, expected, found))
+    return differences
+
+
+class ConstraintReport:
+    """
+    The violations found by check_corpus, one per sign, config-hand, slot and constraint
+    """
+
+    def __init__(self, constraints, size):
+        self.constraints = constraints
+        self.size = size
+        self.violations = list()
+
+    def __len__(self):
+        return len(self.violations)
+
+    def glosses(self):
+        return sorted(set(violation.gloss for violation in self.violations))
+
+    def byGloss(self, gloss):
+        return [violation for violation in self.violations if violation.gloss == gloss]
+
+    def counts(self):
+        """
+        :return: a dictionary of {constraint name: number of signs that break it}
+        """
+        signs = {violation.constraint: set() for violation in self.violations}
+        for violation in self.violations:
+            signs[violation.constraint].add(violation.gloss)
+        return {name: len(glosses) for name, glosses in signs.items()}
+
+    def summary(self):
+        lines = ['Checked {} signs against {} constraints.'.format(self.size, len(self.constraints)),
+                 '{} signs have at least one violation.'.format(len(self.glosses()))]
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, mode='w', encoding='utf-8') as f:
+            print('\t'.join(Violation._fields), file=f)
+            for violation in self.violations:
+                print('\t'.join(str(value) for value in violation), file=f)
@@ -0,0 +1,546 @@
+from collections import namedtuple
+from math import log2
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from constants import EMPTY_CONFIG_HAND
+
+#A contrast merges symbols in some transcription slots. Slots are numbered from 1 to 34, and symbols=None merges
+#every symbol that appears in those slots.
+Contrast = namedtuple('Contrast', ['label', 'slots', 'symbols'])
+
+FunctionalLoadResult = namedtuple('FunctionalLoadResult', ['selection', 'contrast', 'startingSize',
+                                                           'startingEntropy', 'endingSize', 'endingEntropy',
+                                                           'change'])
+
+#bootstrap intervals for the starting entropy and the change in entropy of one result
+BootstrapInterval = namedtuple('BootstrapInterval', ['startingLower', 'startingUpper', 'changeLower',
+                                                     'changeUpper'])
+
+TYPE_WEIGHTING = 'type'
+TOKEN_WEIGHTING = 'token'
+
+CONFIGHANDS = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+#ways of looking at more than one config-hand
+SEPARATE = 'separate' #one analysis per config-hand
+CONCATENATED = 'concatenated' #one row per sign, made of all the selected config-hands side by side
+MULTISET = 'multiset' #one row per non-empty config-hand, pooled over the selected config-hands
+SELECTION_MODES = [SEPARATE, CONCATENATED, MULTISET]
+
+MERGED = -1
+
+#flexion slots for each finger, by joint
+FLEXION_SLOTS = {'Thumb': {'Medial': 4, 'Distal': 5},
+                 'Index': {'Proximal': 17, 'Medial': 18, 'Distal': 19},
+                 'Middle': {'Proximal': 22, 'Medial': 23, 'Distal': 24},
+                 'Ring': {'Proximal': 27, 'Medial': 28, 'Distal': 29},
+                 'Pinky': {'Proximal': 32, 'Medial': 33, 'Distal': 34}}
+FINGERS = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+JOINTS = ['Proximal', 'Medial', 'Distal']
+
+DUCTION_SLOTS = {'Thumb/Finger': 3, 'Index/Middle': 20, 'Middle/Ring': 25, 'Ring/Pinky': 30}
+
+OPPOSITION_SLOTS = [2]
+#the thumb surface and bone, the finger surface and bone, and which fingers the thumb touches
+CONTACT_SLOTS = [6, 7, 10, 11, 12, 13, 14, 15]
+
+
+def flexion_contrasts(finger, joint):
+    """
+    :param finger: Thumb, Index, Middle, Ring, Pinky or All
+    :param joint: Proximal, Medial, Distal or All
+    :return: a list of Contrasts. Choosing All for both gives one contrast per finger.
+    """
+    if finger == 'All' and joint == 'All':
+        return [Contrast('All {} joints'.format(f.lower()), sorted(FLEXION_SLOTS[f].values()), None)
+                for f in FINGERS]
+    if finger == 'All':
+        slots = [FLEXION_SLOTS[f][joint] for f in FINGERS if joint in FLEXION_SLOTS[f]]
+        return [Contrast('All {} joints'.format(joint.lower()), slots, None)]
+    if joint == 'All':
+        return [Contrast('All {} joints'.format(finger.lower()), sorted(FLEXION_SLOTS[finger].values()), None)]
+    if joint not in FLEXION_SLOTS[finger]:
+        raise ValueError('The {} has no {} joint'.format(finger.lower(), joint.lower()))
+    return [Contrast('{} {} joint'.format(finger, joint.lower()), [FLEXION_SLOTS[finger][joint]], None)]
+
+
+def duction_contrasts(duction):
+    """
+    :param duction: Thumb/Finger, Index/Middle, Middle/Ring, Ring/Pinky or All
+    :return: a list with one Contrast
+    """
+    if duction == 'All':
+        return [Contrast('All duction', sorted(DUCTION_SLOTS.values()), None)]
+    return [Contrast('{} duction'.format(duction), [DUCTION_SLOTS[duction]], None)]
+
+
+def opposition_contrasts():
+    """
+    :return: a list with one Contrast, which merges the thumb opposition symbols (L, U, O)
+    """
+    return [Contrast('Thumb opposition', OPPOSITION_SLOTS, None)]
+
+
+def contact_contrasts():
+    """
+    :return: a list with one Contrast, which merges every symbol in the thumb/finger contact slots
+    """
+    return [Contrast('Thumb/finger contact', CONTACT_SLOTS, None)]
+
+
+def custom_contrast(symbolA, symbolB, slots=None):
+    """
+    :param slots: a list of slot numbers, or None for every slot
+    """
+    symbolA = symbolA if symbolA else '_'
+    symbolB = symbolB if symbolB else '_'
+    slots = list(range(1, 35)) if not slots else list(slots)
+    return Contrast('{} and {}'.format(symbolA, symbolB), slots, (symbolA, symbolB))
+
+
+class EncodedTranscriptions:
+    """
+    Transcriptions as an integer array with one column per slot. With one config-hand there is one row per sign.
+    With several, CONCATENATED puts them side by side (34 columns each) and MULTISET gives every non-empty
+    config-hand its own row, weighted like its sign. Empty slots are encoded as '_'.
+    """
+
+    def __init__(self, signs, confighands='config1hand1', mode=CONCATENATED):
+        if isinstance(confighands, str):
+            confighands = [confighands]
+        if mode not in (CONCATENATED, MULTISET):
+            raise ValueError('Transcriptions can only be encoded {} or as a {}'.format(CONCATENATED, MULTISET))
+        self.confighands = list(confighands)
+        self.mode = mode
+        self.symbols = list()
+        self.codes = dict()
+        rows = list()
+        frequencies = list()
+        for sign in signs:
+            transcriptions = [[symbol if symbol else '_' for symbol in getattr(sign, confighand)]
+                              for confighand in self.confighands]
+            if mode == CONCATENATED:
+                rows.append([self.encode(symbol) for transcription in transcriptions for symbol in transcription])
+                frequencies.append(sign.frequency)
+            else:
+                for transcription in transcriptions:
+                    if tuple(transcription[1:]) != EMPTY_CONFIG_HAND:
+                        rows.append([self.encode(symbol) for symbol in transcription])
+                        frequencies.append(sign.frequency)
+        width = 34 if mode == MULTISET else 34 * len(self.confighands)
+        self.array = np.array(rows, dtype=np.int32).reshape(-1, width)
+        self.tokenFrequencies = np.array(frequencies, dtype=np.float64)
+
+    @property
+    def label(self):
+        if len(self.confighands) == 1:
+            return self.confighands[0]
+        elif self.mode == MULTISET:
+            return 'any of ' + ', '.join(self.confighands)
+        return ' + '.join(self.confighands)
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def encode(self, symbol):
+        try:
+            return self.codes[symbol]
+        except KeyError:
+            self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            return self.codes[symbol]
+
+    def weights(self, weighting=TYPE_WEIGHTING):
+        if weighting == TYPE_WEIGHTING:
+            return np.ones(len(self), dtype=np.float64)
+        elif weighting == TOKEN_WEIGHTING:
+            return self.tokenFrequencies
+        raise ValueError('Unknown weighting {!r}, use {!r} or {!r}'.format(weighting, TYPE_WEIGHTING,
+                                                                           TOKEN_WEIGHTING))
+
+    def merge(self, contrast):
+        """
+        :return: a copy of the array with the symbols of the contrast replaced by MERGED in the contrast's slots
+        """
+        #with concatenated config-hands, a contrast applies to the same slot of each of them
+        columns = [offset + slot - 1 for offset in range(0, self.array.shape[1], 34) for slot in contrast.slots]
+        merged = self.array.copy()
+        if contrast.symbols is None:
+            merged[:, columns] = MERGED
+        else:
+            codes = [self.codes[symbol] for symbol in contrast.symbols if symbol in self.codes]
+            block = merged[:, columns]
+            block[np.isin(block, codes)] = MERGED
+            merged[:, columns] = block
+        return merged
+
+
+def class_ids(array):
+    """
+    :param array: an integer array with one transcription per row
+    :return: an array giving each row the number of its distinct transcription, and the number of distinct rows
+    """
+    #view each row as one opaque value, which np.unique sorts much faster than rows compared column by column
+    rows = np.ascontiguousarray(array).view(np.dtype((np.void, array.dtype.itemsize * array.shape[1])))
+    distinct, inverse = np.unique(rows.reshape(-1), return_inverse=True)
+    return inverse.reshape(-1), len(distinct)
+
+
+def entropy(array, weights):
+    """
+    :param array: an integer array with one transcription per row
+    :param weights: the weight of each row
+    :return: the number of distinct rows, and the entropy in bits of the weighted distribution over them
+    """
+    if not len(array):
+        return 0, 0.0
+    inverse, size = class_ids(array)
+    counts = np.bincount(inverse, weights=weights)
+    counts = counts[counts > 0]
+    p = counts / counts.sum()
+    return size, float(-(p * np.log2(p)).sum())
+
+
+def functional_load(signs, contrasts, confighands='config1hand1', weighting=TYPE_WEIGHTING):
+    """
+    Measure how much each contrast distinguishes transcriptions, as the drop in entropy when it is merged
+    :param signs: a Corpus, any iterable of signs, or an EncodedTranscriptions
+    :param contrasts: a list of Contrasts
+    :param confighands: which config-hand to look at, or a list of them to concatenate
+    :param weighting: TYPE_WEIGHTING counts every sign once, TOKEN_WEIGHTING counts signs by frequency
+    :return: a list of FunctionalLoadResults, one per contrast
+    """
+    encoded = signs if isinstance(signs, EncodedTranscriptions) else EncodedTranscriptions(signs, confighands)
+    weights = encoded.weights(weighting)
+    startingSize, startingEntropy = entropy(encoded.array, weights)
+    results = list()
+    for contrast in contrasts:
+        endingSize, endingEntropy = entropy(encoded.merge(contrast), weights)
+        results.append(FunctionalLoadResult(encoded.label, contrast.label, startingSize, startingEntropy,
+                                            endingSize, endingEntropy, startingEntropy-endingEntropy))
+    return results
+
+
+def encode_selection(signs, confighands, mode=SEPARATE):
+    """
+    :param confighands: the config-hands to analyse
+    :param mode: SEPARATE, CONCATENATED or MULTISET
+    :return: a list of EncodedTranscriptions, one for each config-hand if mode is SEPARATE, otherwise one
+    """
+    if mode not in SELECTION_MODES:
+        raise ValueError('Unknown mode {!r}, choose one of: {}'.format(mode, ', '.join(SELECTION_MODES)))
+    signs = list(signs)
+    if mode == SEPARATE:
+        return [EncodedTranscriptions(signs, confighand) for confighand in confighands]
+    return [EncodedTranscriptions(signs, confighands, mode)]
+
+
+def run_selections(function, encodings, *args, processes=None, **kwargs):
+    """
+    Call function(encoded, *args, **kwargs) for each encoding, in a process pool if there is more than one
+    :param processes: the number of worker processes, None to let the pool decide, or 1 to run here
+    :return: a list of the return values, in the same order as encodings
+    """
+    if len(encodings) < 2 or processes == 1:
+        return [function(encoded, *args, **kwargs) for encoded in encodings]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(function, encoded, *args, **kwargs) for encoded in encodings]
+        return [future.result() for future in futures]
+
+
+def functional_load_by_selection(signs, contrasts, confighands=CONFIGHANDS, mode=SEPARATE,
+                                 weighting=TYPE_WEIGHTING, processes=None):
+    """
+    Run functional_load over a selection of config-hands
+    :return: a list of FunctionalLoadResults, grouped by selection
+    """
+    encodings = encode_selection(signs, confighands, mode)
+    results = list()
+    for selectionResults in run_selections(functional_load, encodings, contrasts, weighting=weighting,
+                                           processes=processes):
+        results.extend(selectionResults)
+    return results
+
+
+def bootstrap_functional_load(signs, contrasts, confighands='config1hand1', weighting=TYPE_WEIGHTING,
+                              replicates=1000, confidence=0.95, seed=None, chunk=50):
+    """
+    Bootstrap intervals for functional_load. Each replicate resamples the rows (signs, or config-hands when they
+    are pooled) with replacement and keeps their type or token weights. The class of every row in every table is
+    worked out once, so a replicate only has to add up weights. Entropy measured on a resample is biased low, so
+    the replicates are first moved by their bias (the estimate minus their mean), and the intervals are the
+    percentiles of the moved replicates. Unlike basic bootstrap intervals, which reflect the replicates around the
+    estimate, these keep the skew of the replicates the right way round and contain the estimate unless the
+    replicates are extremely skewed.
+    :param replicates: the number of bootstrap samples
+    :param confidence: the width of the intervals
+    :param seed: a seed for the random number generator, for repeatable intervals
+    :param chunk: how many replicates to add up at once, which trades memory for speed
+    :return: a list of BootstrapIntervals, one per contrast
+    """
+    encoded = signs if isinstance(signs, EncodedTranscriptions) else EncodedTranscriptions(signs, confighands)
+    n = len(encoded)
+    if not n:
+        return [BootstrapInterval(0.0, 0.0, 0.0, 0.0) for contrast in contrasts]
+    weights = encoded.weights(weighting)
+    tables = [class_ids(encoded.array)] + [class_ids(encoded.merge(contrast)) for contrast in contrasts]
+    rng = np.random.default_rng(seed)
+    entropies = np.zeros((len(tables), replicates))
+    for start in range(0, replicates, chunk):
+        size = min(chunk, replicates-start)
+        #how many times each row is drawn in each replicate
+        draws = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+        sampleWeights = np.bincount(draws.reshape(-1), minlength=size*n).reshape(size, n) * weights
+        total = sampleWeights.sum(axis=1)
+        for t, (ids, classes) in enumerate(tables):
+            offsets = (np.arange(size) * classes)[:, None]
+            counts = np.bincount((ids + offsets).reshape(-1), weights=sampleWeights.reshape(-1),
+                                 minlength=size*classes).reshape(size, classes)
+            p = counts / total[:, None]
+            entropies[t, start:start+size] = -xlogx(p).sum(axis=1)
+
+    estimates = list()
+    for ids, classes in tables:
+        p = np.bincount(ids, weights=weights, minlength=classes) / weights.sum()
+        estimates.append(-xlogx(p).sum())
+
+    tail = (1-confidence) / 2 * 100
+    def interval(estimate, samples):
+        low, high = np.percentile(samples, [tail, 100-tail]) + (estimate - samples.mean())
+        return float(low), float(high)
+
+    startingLower, startingUpper = interval(estimates[0], entropies[0])
+    intervals = list()
+    for t in range(1, len(tables)):
+        changeLower, changeUpper = interval(estimates[0]-estimates[t], entropies[0]-entropies[t])
+        intervals.append(BootstrapInterval(startingLower, startingUpper, changeLower, changeUpper))
+    return intervals
+
+
+def bootstrap_by_selection(signs, contrasts, confighands=CONFIGHANDS, mode=SEPARATE, weighting=TYPE_WEIGHTING,
+                           replicates=1000, confidence=0.95, seed=None, processes=None):
+    """
+    Run bootstrap_functional_load over a selection of config-hands
+    :return: a list of BootstrapIntervals in the same order as the results of functional_load_by_selection
+    """
+    encodings = encode_selection(signs, confighands, mode)
+    intervals = list()
+    for selectionIntervals in run_selections(bootstrap_functional_load, encodings, contrasts, weighting=weighting,
+                                             replicates=replicates, confidence=confidence, seed=seed,
+                                             processes=processes):
+        intervals.extend(selectionIntervals)
+    return intervals
+
+
+def predefined_contrasts():
+    """
+    :return: every single-joint flexion contrast and every single duction contrast
+    """
+    contrasts = list()
+    for finger in FINGERS:
+        for joint in JOINTS:
+            if joint in FLEXION_SLOTS[finger]:
+                contrasts.extend(flexion_contrasts(finger, joint))
+    for duction in DUCTION_SLOTS:
+        contrasts.extend(duction_contrasts(duction))
+    return contrasts
+
+
+def xlogx(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.where(x > 0, x * np.log2(np.where(x > 0, x, 1)), 0.0)
+
+
+class PairwiseFunctionalLoad:
+    """
+    The functional load of every pair of symbols in every slot. values[slot-1, a, b] is the entropy lost by merging
+    symbols[a] with symbols[b] in that slot, and is nan if either symbol never appears there.
+    """
+
+    def __init__(self, encoded, weighting=TYPE_WEIGHTING):
+        if encoded.array.shape[1] != 34:
+            raise ValueError('Symbol pairs can only be compared for one config-hand at a time or a multiset')
+        self.selection = encoded.label
+        self.symbols = list(encoded.symbols)
+        self.weighting = weighting
+        weights = encoded.weights(weighting)
+        self.startingSize, self.startingEntropy = entropy(encoded.array, weights)
+        total = weights.sum()
+        n = len(self.symbols)
+        self.values = np.full((34, n, n), np.nan)
+        self.endingSizes = np.zeros((34, n, n), dtype=np.int64)
+        if not len(encoded):
+            return
+
+        for column in range(34):
+            symbols = encoded.array[:, column]
+            present = np.unique(symbols)
+            if len(present) < 2:
+                continue
+            #signs that are identical outside this slot share a context
+            masked = encoded.array.copy()
+            masked[:, column] = MERGED
+            rows = np.ascontiguousarray(masked).view(np.dtype((np.void, masked.dtype.itemsize * 34))).reshape(-1)
+            contexts = np.unique(rows, return_inverse=True)[1].reshape(-1)
+            table = np.zeros((contexts.max()+1, n))
+            np.add.at(table, (contexts, symbols), weights)
+            table = table[:, present]
+            f = xlogx(table)
+            occupied = table > 0
+            #H = log W - sum(f(n))/W over the classes, so merging a and b changes the entropy by
+            #sum over contexts of f(n_a + n_b) - f(n_a) - f(n_b), divided by W
+            for i, a in enumerate(present):
+                gain = (xlogx(table[:, [i]] + table) - f[:, [i]] - f).sum(axis=0) / total
+                collapsed = (occupied[:, [i]] & occupied).sum(axis=0)
+                for j, b in enumerate(present):
+                    if a != b:
+                        self.values[column, a, b] = gain[j]
+                        self.endingSizes[column, a, b] = self.startingSize - collapsed[j]
+
+    def pairs(self):
+        """
+        :return: (slot, symbolA, symbolB, change in entropy) tuples for each pair that appears, with the two
+        symbols in alphabetical order
+        """
+        slots, first, second = np.nonzero(~np.isnan(self.values))
+        return [(slot+1, self.symbols[a], self.symbols[b], float(self.values[slot, a, b]))
+                for slot, a, b in zip(slots, first, second) if self.symbols[a] < self.symbols[b]]
+
+    def results(self):
+        """
+        :return: the pairs as FunctionalLoadResults, labelled 'slot N: A/B'
+        """
+        return [FunctionalLoadResult(self.selection, 'slot {}: {}/{}'.format(slot, a, b),
+                                     self.startingSize, self.startingEntropy,
+                                     int(self.endingSizes[slot-1, self.symbols.index(a), self.symbols.index(b)]),
+                                     self.startingEntropy-change, change)
+                for slot, a, b, change in self.pairs()]
+
+    def saveMatrix(self, path):
+        save_matrices([self], path)
+
+
+def save_matrices(matrices, path):
+    """
+    Write a tab-separated matrix with one row per selection and slot, and one column per symbol pair, for drawing
+    heatmaps. Cells are blank where the pair does not occur in that slot.
+    :param matrices: a list of PairwiseFunctionalLoads
+    """
+    cells = dict()
+    for matrix in matrices:
+        for slot, a, b, change in matrix.pairs():
+            cells[(matrix.selection, slot, a, b)] = change
+    pairs = sorted({(a, b) for selection, slot, a, b in cells})
+    with open(path, mode='w', encoding='utf-8') as f:
+        print('\t'.join(['selection', 'slot'] + ['{}/{}'.format(a, b) for a, b in pairs]), file=f)
+        for matrix in matrices:
+            for slot in range(1, 35):
+                row = [str(cells.get((matrix.selection, slot, a, b), '')) for a, b in pairs]
+                print('\t'.join([matrix.selection, str(slot)] + row), file=f)
+
+
+def pairwise_functional_load(signs, confighand='config1hand1', weighting=TYPE_WEIGHTING):
+    """
+    :param signs: a Corpus, any iterable of signs, or an EncodedTranscriptions
+    :return: a PairwiseFunctionalLoad
+    """
+    encoded = signs if isinstance(signs, EncodedTranscriptions) else EncodedTranscriptions(signs, confighand)
+    return PairwiseFunctionalLoad(encoded, weighting)
+
+
+def pairwise_functional_load_by_selection(signs, confighands=CONFIGHANDS, mode=SEPARATE,
+                                          weighting=TYPE_WEIGHTING, processes=None):
+    """
+    :param mode: SEPARATE or MULTISET
+    :return: a list of PairwiseFunctionalLoads, one per selection
+    """
+    return run_selections(PairwiseFunctionalLoad, encode_selection(signs, confighands, mode), weighting,
+                          processes=processes)
+
+
+def save_results(results, path, intervals=None):
+    """
+    Write FunctionalLoadResults to a tab-separated file
+    :param intervals: an optional list of BootstrapIntervals, one per result, added as extra columns
+    """
+    with open(path, mode='w', encoding='utf-8') as f:
+        fields = FunctionalLoadResult._fields + (BootstrapInterval._fields if intervals is not None else tuple())
+        print('\t'.join(fields), file=f)
+        for n, result in enumerate(results):
+            values = tuple(result) + (tuple(intervals[n]) if intervals is not None else tuple())
+            print('\t'.join(str(value) for value in values), file=f)
+
+
+class FunctionalLoadTracker:
+    """
+    Keeps the count tables for a set of contrasts up to date one sign at a time, so their functional load can be
+    shown while a corpus is being edited. For each table it stores the total weight W and S = sum of w*log2(w) over
+    its classes, so the entropy log2(W) - S/W is available without looking at the rest of the corpus.
+    """
+
+    def __init__(self, contrasts, confighands='config1hand1', weighting=TYPE_WEIGHTING, signs=None):
+        if weighting not in (TYPE_WEIGHTING, TOKEN_WEIGHTING):
+            raise ValueError('Unknown weighting {!r}, use {!r} or {!r}'.format(weighting, TYPE_WEIGHTING,
+                                                                               TOKEN_WEIGHTING))
+        self.contrasts = list(contrasts)
+        self.confighands = [confighands] if isinstance(confighands, str) else list(confighands)
+        self.weighting = weighting
+        self.selection = ' + '.join(self.confighands)
+        #one table for the unmerged transcriptions, then one per contrast
+        self.tables = [dict() for n in range(len(self.contrasts)+1)]
+        self.sums = [0.0 for n in range(len(self.contrasts)+1)]
+        self.total = 0.0
+        self.columns = [[offset + slot - 1 for offset in range(0, 34*len(self.confighands), 34)
+                         for slot in contrast.slots] for contrast in self.contrasts]
+        if signs is not None:
+            for sign in signs:
+                self.add(sign)
+
+    def keys(self, sign):
+        key = [symbol if symbol else '_' for confighand in self.confighands for symbol in getattr(sign, confighand)]
+        keys = [tuple(key)]
+        for contrast, columns in zip(self.contrasts, self.columns):
+            merged = key[:]
+            for column in columns:
+                if contrast.symbols is None or merged[column] in contrast.symbols:
+                    merged[column] = MERGED
+            keys.append(tuple(merged))
+        return keys
+
+    def weight(self, sign):
+        return 1.0 if self.weighting == TYPE_WEIGHTING else float(sign.frequency)
+
+    def add(self, sign):
+        self.update(sign, self.weight(sign))
+
+    def remove(self, sign):
+        self.update(sign, -self.weight(sign))
+
+    def update(self, sign, weight):
+        if weight == 0:
+            #a sign with no tokens is not in any table
+            return
+        for n, key in enumerate(self.keys(sign)):
+            table = self.tables[n]
+            old = table.get(key, 0.0)
+            new = old + weight
+            self.sums[n] += xlogx_scalar(new) - xlogx_scalar(old)
+            if new > 1e-9:
+                table[key] = new
+            else:
+                table.pop(key, None)
+        self.total += weight
+
+    def entropy(self, n):
+        if self.total <= 0:
+            return 0.0
+        return log2(self.total) - self.sums[n]/self.total
+
+    def results(self):
+        startingSize, startingEntropy = len(self.tables[0]), self.entropy(0)
+        return [FunctionalLoadResult(self.selection, contrast.label, startingSize, startingEntropy,
+                                     len(self.tables[n+1]), self.entropy(n+1), startingEntropy-self.entropy(n+1))
+                for n, contrast in enumerate(self.contrasts)]
+
+
+def xlogx_scalar(x):
+    return x*log2(x) if x > 0 else 0.0
@@ -1,7 +1,7 @@
 from analysis.unmarked_handshapes import (HandshapeAny, HandshapeEmpty,
                                           HandshapeA, HandshapeB1, HandshapeB2, HandshapeC, HandshapeO, HandshapeS,
                                           Handshape1, Handshape5)
-from analysis.transcription_search import check_global_options, check_config_type, check_hand_type
+from analysis.transcription_search import check_global_options
 
 handshape_mapping = {
     'any': HandshapeAny,
@@ -35,16 +35,10 @@ def handshape_search(corpus, forearm, estimated, uncertain, incomplete, config,
     :return: a list of signs that match the criteria
     """
     ret = list()
-    for word in corpus:
+    for word in corpus.signsOfType(hand, config):
         if not check_global_options(word, (forearm, estimated, uncertain, incomplete)):
             continue
 
-        if not check_config_type(word, config):
-            continue
-
-        if not check_hand_type(word, hand):
-            continue
-
         if not check_handshape(word, logic, c1h1, c1h2, c2h1, c2h2):
             continue
 
@@ -69,21 +69,7 @@ def match_specification(slots, spec):
 
 
 def find_sign_type(sign):
-    c1h1 = ''.join([slot if slot else '_' for slot in sign.config1hand1])
-    c1h2 = ''.join([slot if slot else '_' for slot in sign.config1hand2])
-    c2h1 = ''.join([slot if slot else '_' for slot in sign.config2hand1])
-    c2h2 = ''.join([slot if slot else '_' for slot in sign.config2hand2])
-
-    if (c1h1 == '_______∅/______1____2____3____4___' and c2h1 == '_______∅/______1____2____3____4___')\
-            or (c1h2 == '_______∅/______1____2____3____4___' and c2h2 == '_______∅/______1____2____3____4___'):
-        typ = 'one'
-    else:
-        if c1h1 == c1h2 and c2h1 == c2h2:
-            typ = 'two-same'
-        else:
-            typ = 'two-diff'
-
-    return typ
+    return sign.sign_type
 
 
 def filter_logic(logic, c1h1_match, c1h2_match, c2h1_match, c2h2_match):
@@ -120,9 +106,7 @@ def extended_finger_search(corpus, c1h1, c1h2, c2h1, c2h2, logic, sign_type):
     # if "or", means that only one of them has to be true
 
     ret = list()
-    for word in corpus:
-        actual_type = find_sign_type(word)
-
+    for word in corpus.signsOfType(sign_types=sign_type):
         c1h1_slots = ''.join([slot if slot else '_' for slot in word.config1hand1])
         c1h2_slots = ''.join([slot if slot else '_' for slot in word.config1hand2])
         c2h1_slots = ''.join([slot if slot else '_' for slot in word.config2hand1])
@@ -133,10 +117,7 @@ def extended_finger_search(corpus, c1h1, c1h2, c2h1, c2h2, logic, sign_type):
         c2h1_match = match_specification(c2h1_slots, c2h1)
         c2h2_match = match_specification(c2h2_slots, c2h2)
 
-        logic_matched = filter_logic(logic, c1h1_match, c1h2_match, c2h1_match, c2h2_match)
-        type_matched = filter_type(actual_type, sign_type)
-
-        if logic_matched and type_matched:
+        if filter_logic(logic, c1h1_match, c1h2_match, c2h1_match, c2h2_match):
             ret.append(word)
 
     return ret
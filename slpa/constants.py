@@ -5,6 +5,10 @@ X_IN_BOX = '\u2327'
 
 NULL = '\u2205'
 
+#the transcription of a hand with no handshape, from slot 2 to slot 34
+#(slot 8 is always NULL, slot 9 '/', and slots 16, 21, 26 and 31 the finger numbers, see fillPredeterminedSlots)
+EMPTY_CONFIG_HAND = tuple('______' + NULL + '/______1____2____3____4___')
+
 STANDARD_SYMBOLS = ['_', '+', '-', '/', '1', '2', '3', '4', '<', '=', '?', 'E', 'F', 'H', 'L', 'M', 'O', 'U', 'V',
                     'b', 'd', 'e', 'f', 'fr', 'i', 'm', 'p', 'r', 't', 'u', 'x', 'x+', 'x-', '{', NULL, X_IN_BOX]
 
@@ -138,15 +138,15 @@ class RingPinkyAnatomicalContstraint():
     def check(cls, transcription):
         output = list()
         if transcription[27].text() in 'EHi':
-            output.append('27')
-        if transcription[28].text() in 'EHi':
             output.append('28')
-        if output == ['27', '28']:
+        if transcription[28].text() in 'EHi':
+            output.append('29')
+        if output == ['28', '29']:
             if transcription[14].text() != '4':
                 if transcription[32].text() == 'F':
-                    output.append('32')
-                if transcription[33].text() == 'F':
                     output.append('33')
+                if transcription[33].text() == 'F':
+                    output.append('34')
                 output.sort()
                 return ', '.join(output)
         else:
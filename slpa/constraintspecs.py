@@ -0,0 +1,255 @@
+import json
+import numpy as np
+
+#Constraints written as data instead of code. A spec is a dictionary:
+#   {'id': 'MedialJointConstraint', 'name': 'Medial Joint Constraint', 'explanation': '...',
+#    'constraint_type': 'simple', 'rules': [...]}
+#and each rule is one of
+#   {'forbid': [slots], 'symbols': [symbols]}     every listed slot holding one of the symbols is a violation
+#   {'match': [[slot, slot], ...]}                  both slots of a pair are violations if their symbols differ
+#with these optional keys, which decide whether the rule applies to a transcription at all:
+#   'when': [conditions], 'logic': 'all' or 'any'   the rule only applies if all (or any) of the conditions hold
+#   'unless': [conditions]                          the rule does not apply if any of these conditions hold
+#A condition is {'slot': slot, 'symbols': [symbols]} and holds when the slot has one of the symbols.
+#Slots are numbered from 1 to 34 and an empty slot is written '_'.
+
+EXTENDED = ['E', 'H', 'i', '_'] #the original checks use text() in 'EHi', which is also true of an empty slot
+
+CONSTRAINT_SPECS = [
+    {'id': 'NoEmptySlotsConstraint',
+     'name': 'No Empty Slots Constraint',
+     'explanation': 'Every transcription slot must have a value',
+     'constraint_type': 'transcription',
+     'rules': [{'forbid': [n for n in range(2, 35) if n not in (12, 13, 14, 15)], 'symbols': ['_']}]},
+    {'id': 'DistalMedialCorrespondanceConstraint',
+     'name': 'Distal Medial Constraint',
+     'explanation': 'Medial and distal joints must match in flexion',
+     'constraint_type': 'simple',
+     'rules': [{'match': [[18, 19], [23, 24], [28, 29], [33, 34]]}]},
+    {'id': 'MedialJointConstraint',
+     'name': 'Medial Joint Constraint',
+     'explanation': 'Medial joints cannot be marked \'H\'',
+     'constraint_type': 'simple',
+     'rules': [{'forbid': [18, 23, 28, 33], 'symbols': ['H']}]},
+    {'id': 'IndexRingPinkySelectionConstraint',
+     'name': 'Index-Ring-Pinky Selection Constraint',
+     'explanation': ('If the middle and pinky proximal joints are flexed, '
+                     'the index and ring proximal joints cannot be extended'),
+     'constraint_type': 'conditional',
+     'rules': [{'forbid': [17, 27], 'symbols': EXTENDED,
+                'when': [{'slot': 22, 'symbols': ['F']}, {'slot': 32, 'symbols': ['F']}], 'logic': 'any'}]},
+    {'id': 'IndexMiddlePinkySelectionConstraint',
+     'name': 'Index-Middle-Pinky Selection Constraint',
+     'explanation': ('If the ring proximal joint is flexed, '
+                     'the index, middle, and pinky proximal joints cannot be extended'),
+     'constraint_type': 'conditional',
+     'rules': [{'forbid': [17, 22, 32], 'symbols': EXTENDED,
+                'when': [{'slot': 27, 'symbols': ['F']}]}]},
+    {'id': 'RingPinkyAnatomicalContstraint',
+     'name': 'Ring-Pinky Constraint',
+     'explanation': ('If the ring medial and distal joints are extended, '
+                     'the pinky medial and distal joints cannot be flexed (unless thumb is in contact with pinky)'),
+     'constraint_type': 'conditional',
+     'rules': [{'forbid': [28, 29], 'symbols': EXTENDED,
+                'when': [{'slot': 28, 'symbols': EXTENDED}, {'slot': 29, 'symbols': EXTENDED}],
+                'unless': [{'slot': 15, 'symbols': ['4']}]},
+               {'forbid': [33, 34], 'symbols': ['F'],
+                'when': [{'slot': 28, 'symbols': EXTENDED}, {'slot': 29, 'symbols': EXTENDED}],
+                'unless': [{'slot': 15, 'symbols': ['4']}]}]},
+]
+
+CONSTRAINT_TYPES = ['transcription', 'simple', 'conditional']
+SPEC_FIELDS = ['id', 'name', 'explanation', 'constraint_type', 'rules']
+
+
+class ConstraintSpecError(ValueError):
+    pass
+
+
+class EncodedSlots:
+    """
+    A list of transcriptions as an integer array, one row per transcription and one column per slot, with empty
+    slots encoded as '_'. Symbols are numbered in the order they are first seen.
+    """
+
+    def __init__(self, transcriptions):
+        codes = {'_': 0}
+        rows = [[codes.setdefault(symbol if symbol else '_', len(codes)) for symbol in transcription]
+                for transcription in transcriptions]
+        self.codes = codes
+        self.symbols = list(codes)
+        self.array = np.array(rows, dtype=np.int32).reshape(-1, 34)
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def empty(self, template):
+        """
+        :param template: the symbols of an empty transcription, such as EMPTY_CONFIG_HAND for slots 2 to 34
+        :return: a boolean array which is True for every transcription that matches the template from slot 2 on
+        """
+        if any(symbol not in self.codes for symbol in template):
+            return np.zeros(len(self), dtype=bool)
+        row = np.array([self.codes[symbol] for symbol in template], dtype=np.int32)
+        return (self.array[:, 1:] == row).all(axis=1)
+
+    def mask(self, slots, symbols):
+        """
+        :return: a boolean array with one row per transcription and one column per slot in slots, which is True
+        where that slot holds one of the symbols
+        """
+        table = np.zeros(len(self.symbols)+1, dtype=bool)
+        table[[self.codes[symbol] for symbol in symbols if symbol in self.codes]] = True
+        return table[self.array[:, [slot-1 for slot in slots]]]
+
+
+class CompiledConstraint:
+    """
+    A constraint spec checked and turned into lists of slots and symbol sets, ready to be evaluated on a whole
+    EncodedSlots array at once. It has the same name, explanation and constraint_type attributes as the classes
+    in constraints.py.
+    """
+
+    def __init__(self, spec):
+        validate_spec(spec)
+        self.spec = spec
+        self.id = spec['id']
+        self.name = spec['name']
+        self.explanation = spec['explanation']
+        self.constraint_type = spec['constraint_type']
+        self.rules = list()
+        for rule in spec['rules']:
+            when = [(condition['slot'], frozenset(condition['symbols'])) for condition in rule.get('when', list())]
+            unless = [(condition['slot'], frozenset(condition['symbols']))
+                      for condition in rule.get('unless', list())]
+            logic = rule.get('logic', 'all')
+            if 'forbid' in rule:
+                self.rules.append(('forbid', list(rule['forbid']), frozenset(rule['symbols']), when, logic, unless))
+            else:
+                self.rules.append(('match', [tuple(pair) for pair in rule['match']], None, when, logic, unless))
+
+    def __repr__(self):
+        return 'CompiledConstraint({!r})'.format(self.id)
+
+    def evaluate(self, encoded):
+        """
+        :param encoded: an EncodedSlots
+        :return: a boolean array the same shape as encoded.array, which is True for every slot that breaks
+        this constraint
+        """
+        violations = np.zeros(encoded.array.shape, dtype=bool)
+        for kind, slots, symbols, when, logic, unless in self.rules:
+            applies = np.ones(len(encoded), dtype=bool)
+            if when:
+                conditions = np.column_stack([encoded.mask([slot], options)[:, 0] for slot, options in when])
+                applies = conditions.all(axis=1) if logic == 'all' else conditions.any(axis=1)
+            for slot, options in unless:
+                applies &= ~encoded.mask([slot], options)[:, 0]
+
+            if kind == 'forbid':
+                columns = [slot-1 for slot in slots]
+                violations[:, columns] |= encoded.mask(slots, symbols) & applies[:, np.newaxis]
+            else:
+                for first, second in slots:
+                    differ = (encoded.array[:, first-1] != encoded.array[:, second-1]) & applies
+                    violations[:, first-1] |= differ
+                    violations[:, second-1] |= differ
+        return violations
+
+
+def validate_spec(spec):
+    for field in SPEC_FIELDS:
+        if field not in spec:
+            raise ConstraintSpecError('The constraint spec {!r} has no {!r}'.format(spec.get('id', spec), field))
+    if spec['constraint_type'] not in CONSTRAINT_TYPES:
+        raise ConstraintSpecError('{!r} is not a constraint type, choose one of: {}'.format(
+            spec['constraint_type'], ', '.join(CONSTRAINT_TYPES)))
+    if not spec['rules']:
+        raise ConstraintSpecError('The constraint spec {!r} has no rules'.format(spec['id']))
+
+    for rule in spec['rules']:
+        if ('forbid' in rule) == ('match' in rule):
+            raise ConstraintSpecError('Each rule in {!r} needs either "forbid" or "match"'.format(spec['id']))
+        if 'forbid' in rule:
+            validate_slots(rule['forbid'], spec['id'])
+            if not rule.get('symbols'):
+                raise ConstraintSpecError('A "forbid" rule in {!r} has no symbols'.format(spec['id']))
+        else:
+            for pair in rule['match']:
+                if len(pair) != 2:
+                    raise ConstraintSpecError('{!r} in {!r} is not a pair of slots'.format(pair, spec['id']))
+                validate_slots(pair, spec['id'])
+        if rule.get('logic', 'all') not in ('all', 'any'):
+            raise ConstraintSpecError('The logic of a rule in {!r} must be "all" or "any"'.format(spec['id']))
+        for condition in rule.get('when', list()) + rule.get('unless', list()):
+            if 'slot' not in condition or not condition.get('symbols'):
+                raise ConstraintSpecError('The condition {!r} in {!r} needs a slot and some symbols'.format(
+                    condition, spec['id']))
+            validate_slots([condition['slot']], spec['id'])
+
+
+def validate_slots(slots, spec_id):
+    for slot in slots:
+        if not isinstance(slot, int) or not 1 <= slot <= 34:
+            raise ConstraintSpecError('{!r} in {!r} is not a slot number between 1 and 34'.format(slot, spec_id))
+
+
+def spec_slots(spec):
+    """
+    :return: the sorted list of slots that a constraint spec reads, in its rules and in their conditions
+    """
+    slots = set()
+    for rule in spec['rules']:
+        if 'forbid' in rule:
+            slots.update(rule['forbid'])
+        else:
+            for pair in rule['match']:
+                slots.update(pair)
+        for condition in rule.get('when', list()) + rule.get('unless', list()):
+            slots.add(condition['slot'])
+    return sorted(slots)
+
+
+def dependency_graph(specs=None):
+    """
+    :param specs: a list of constraint specs, or None for CONSTRAINT_SPECS
+    :return: a dictionary of {slot: list of the ids of the constraints that read it}, for slots 1 to 34
+    """
+    specs = CONSTRAINT_SPECS if specs is None else specs
+    graph = {slot: list() for slot in range(1, 35)}
+    for spec in specs:
+        for slot in spec_slots(spec):
+            graph[slot].append(spec['id'])
+    return graph
+
+
+def compile_specs(specs=None):
+    """
+    :param specs: a list of constraint specs, or None for CONSTRAINT_SPECS
+    :return: a list of (id, CompiledConstraint) in the order of the specs, like MasterConstraintList
+    """
+    specs = CONSTRAINT_SPECS if specs is None else specs
+    compiled = list()
+    for spec in specs:
+        if spec.get('id') in [constraint_id for constraint_id, constraint in compiled]:
+            raise ConstraintSpecError('There is more than one constraint spec called {!r}'.format(spec['id']))
+        compiled.append((spec['id'], CompiledConstraint(spec)))
+    return compiled
+
+
+def load_specs(path):
+    """
+    Read a list of constraint specs from a JSON file, so that new constraints can be added without changing the code
+    """
+    with open(path, encoding='utf-8') as f:
+        specs = json.load(f)
+    if isinstance(specs, dict):
+        specs = [specs]
+    for spec in specs:
+        validate_spec(spec)
+    return specs
+
+
+def save_specs(specs, path):
+    with open(path, mode='w', encoding='utf-8') as f:
+        json.dump(specs, f, indent=4, ensure_ascii=False)
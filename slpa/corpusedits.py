@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from constants import GLOBAL_OPTIONS, FINGERSPELL_OPTIONS, STANDARD_SYMBOLS
+
+CONFIGHANDS = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+
+
+class BulkEditError(ValueError):
+    pass
+
+
+class SignEdit(ABC):
+    """
+    Base class for the edits accepted by Corpus.bulkUpdate. Subclasses check their arguments in validate, before
+    any sign is changed, and then change one sign at a time in apply.
+    """
+
+    changesTranscription = False
+
+    def validate(self):
+        pass
+
+    @abstractmethod
+    def apply(self, sign):
+        pass
+
+
+class SetField(SignEdit):
+    """
+    Set a sign field, such as the frequency, the coder or one of the global options, to the same value on every sign
+    """
+
+    fields = {'frequency': (int, float), 'coder': str, 'lastUpdated': date, 'signNotes': str}
+    for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+        fields[option] = bool
+
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+
+    def __repr__(self):
+        return 'SetField({!r}, {!r})'.format(self.field, self.value)
+
+    def validate(self):
+        if self.field not in self.fields:
+            raise BulkEditError('Cannot set {!r}, choose one of: {}'.format(self.field, ', '.join(self.fields)))
+        if not isinstance(self.value, self.fields[self.field]) \
+                or (self.field == 'frequency' and isinstance(self.value, bool)):
+            raise BulkEditError('{!r} is not a valid value for {}'.format(self.value, self.field))
+
+    def apply(self, sign):
+        setattr(sign, self.field, self.value)
+
+
+class ReplaceSymbol(SignEdit):
+    """
+    Replace one transcription symbol with another. Empty slots are matched and written as '_'.
+    """
+
+    changesTranscription = True
+
+    def __init__(self, old, new, slots=None, confighands=None):
+        """
+        :param old: the symbol to look for
+        :param new: the symbol to put in its place
+        :param slots: a list of slot numbers, from 1 to 34, or None for every slot
+        :param confighands: a list of 'config1hand1', 'config1hand2', 'config2hand1', 'config2hand2',
+        or None for all four
+        """
+        self.old = old if old else '_'
+        self.new = new if new else '_'
+        self.slots = list(range(1, 35)) if slots is None else list(slots)
+        self.confighands = CONFIGHANDS[:] if confighands is None else list(confighands)
+
+    def __repr__(self):
+        return 'ReplaceSymbol({!r}, {!r}, slots={!r}, confighands={!r})'.format(self.old, self.new,
+                                                                               self.slots, self.confighands)
+
+    def validate(self):
+        validateSlots(self.slots, self.confighands)
+        if self.new not in STANDARD_SYMBOLS:
+            raise BulkEditError('{!r} is not a transcription symbol'.format(self.new))
+
+    def apply(self, sign):
+        for confighand in self.confighands:
+            transcription = list(getattr(sign, confighand))
+            for slot in self.slots:
+                symbol = transcription[slot-1]
+                if (symbol if symbol else '_') == self.old:
+                    transcription[slot-1] = self.new
+            sign.setTranscription(confighand, transcription)
+
+
+class SetFlags(SignEdit):
+    """
+    Turn the uncertain and/or estimate flags on or off for some transcription slots. A value of None leaves that
+    flag as it is.
+    """
+
+    def __init__(self, isUncertain=None, isEstimate=None, slots=None, confighands=None):
+        self.isUncertain = isUncertain
+        self.isEstimate = isEstimate
+        self.slots = list(range(1, 35)) if slots is None else list(slots)
+        self.confighands = CONFIGHANDS[:] if confighands is None else list(confighands)
+
+    def __repr__(self):
+        return 'SetFlags(isUncertain={!r}, isEstimate={!r}, slots={!r}, confighands={!r})'.format(
+            self.isUncertain, self.isEstimate, self.slots, self.confighands)
+
+    def validate(self):
+        validateSlots(self.slots, self.confighands)
+        for value in (self.isUncertain, self.isEstimate):
+            if value is not None and not isinstance(value, bool):
+                raise BulkEditError('Flags can only be set to True, False or None, not {!r}'.format(value))
+
+    def apply(self, sign):
+        changes = dict()
+        if self.isUncertain is not None:
+            changes['isUncertain'] = self.isUncertain
+        if self.isEstimate is not None:
+            changes['isEstimate'] = self.isEstimate
+        if not changes:
+            return
+        for confighand in self.confighands:
+            #signs can share their default flag lists, so make a new list instead of changing it in place
+            flags = list(sign.flags[confighand])
+            for slot in self.slots:
+                flags[slot-1] = flags[slot-1]._replace(**changes)
+            sign.flags[confighand] = flags
+
+
+def validateSlots(slots, confighands):
+    for confighand in confighands:
+        if confighand not in CONFIGHANDS:
+            raise BulkEditError('{!r} is not one of {}'.format(confighand, ', '.join(CONFIGHANDS)))
+    for slot in slots:
+        if not isinstance(slot, int) or not 1 <= slot <= 34:
+            raise BulkEditError('{!r} is not a slot number between 1 and 34'.format(slot))
@@ -0,0 +1,1111 @@
+import os
+import csv
+import json
+import hashlib
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from datetime import date
+import numpy as np
+from xml.etree import ElementTree as xmlElementTree
+from xml.parsers import expat
+import parameters
+from lexicon import Sign
+from gui.transcriptions import Flag
+from constants import GLOBAL_OPTIONS, FINGERSPELL_OPTIONS, X_IN_BOX, NULL, STANDARD_SYMBOLS
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    #Parquet and Arrow files are optional, everything else works without pyarrow
+    pyarrow = None
+
+CONFIGHANDS = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+
+#a line of a TSV file that could not be imported. Lines are numbered from 1, counting the header line.
+LineError = namedtuple('LineError', ['line', 'gloss', 'message'])
+
+
+class ImportReport:
+    def __init__(self, path):
+        self.path = path
+        self.imported = 0
+        self.errors = list()
+        self.cancelled = False
+
+    def summary(self):
+        lines = ['Imported {} signs.'.format(self.imported)]
+        if self.errors:
+            lines.append('{} lines could not be imported.'.format(len(self.errors)))
+        if self.cancelled:
+            lines.append('The import was cancelled before the end of the file.')
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, mode='w', encoding='utf-8') as f:
+            print('\t'.join(LineError._fields), file=f)
+            for error in self.errors:
+                print('\t'.join(str(value) for value in error), file=f)
+
+
+def column_map(headers):
+    """
+    Work out where every field is in a row, once per file, so that a row can be read by position
+    :param headers: the fields of the header line
+    :return: a dictionary of {field name: column number}, with one list of 34 column numbers per config-hand
+    """
+    positions = {header: n for n, header in enumerate(headers)}
+    missing = [header for header in Sign.headers.split('\t') if header not in positions
+               and header not in CONFIGHANDS]
+    if missing:
+        raise ValueError('The file has no column for {}'.format(', '.join(missing)))
+    columns = {header: positions[header] for header in positions}
+    for confighand in CONFIGHANDS:
+        columns[confighand] = [positions['{}slot{}'.format(confighand, n)] for n in range(1, 35)]
+    return columns
+
+
+def flag_list(text):
+    return list() if text == 'None' else [int(n) for n in text.split('-')]
+
+
+def sign_from_row(row, columns, useDefaultParameters=False):
+    """
+    Build a Sign from one row of an exported TSV file
+    :param row: a list of fields
+    :param columns: the result of column_map for the file's header line
+    :param useDefaultParameters: if True, the parameters column is ignored
+    """
+    kwargs = dict()
+    flags = dict()
+    transcriptions = list()
+    for confighand in CONFIGHANDS:
+        transcriptions.append([row[n] for n in columns[confighand]])
+        uncertain = flag_list(row[columns[confighand+'uncertain']])
+        estimated = flag_list(row[columns[confighand+'estimated']])
+        #the export numbers slots from 1. Imports before corpusio read the numbers as list positions, which moved
+        #every flag one slot along and lost the flags on slot 34, so files that went through one are already shifted
+        flags[confighand] = [Flag(True if n in uncertain else False, True if n in estimated else False)
+                             for n in range(1, 35)]
+    kwargs['config1'] = transcriptions[0:2]
+    kwargs['config2'] = transcriptions[2:4]
+    kwargs['flags'] = flags
+    kwargs['gloss'] = row[columns['gloss']]
+    for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+        kwargs[option] = True if row[columns[option]] == 'True' else False
+    #signs with the same parameters share one selection, which the parameter dialog copies before editing
+    if useDefaultParameters:
+        kwargs['parameters'] = parameters.sharedDefaultParameters
+    else:
+        kwargs['parameters'] = parameters.sharedParseXML(row[columns['parameters']].strip())
+    kwargs['_frequency'] = float(row[columns['frequency']])
+    kwargs['_coder'] = row[columns['coder']]
+    year, month, day = tuple(row[columns['date']].split(sep='-'))
+    kwargs['_lastUpdated'] = date(int(year), int(month), int(day))
+    notes = row[columns['notes']]
+    kwargs['signNotes'] = '' if notes == 'None' else notes
+    return Sign(kwargs)
+
+
+def first_parameters(path):
+    """
+    :return: the parameters column of the first sign in a TSV file, or '' if there is none
+    """
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+        headers = next(reader, None)
+        row = next(reader, None)
+    if not headers or not row or 'parameters' not in headers or len(row) <= headers.index('parameters'):
+        return ''
+    return row[headers.index('parameters')].strip()
+
+
+def count_lines(path):
+    with open(path, mode='rb') as f:
+        return sum(1 for line in f)
+
+
+def import_tsv(path, corpus, useDefaultParameters=False, chunk=500, call_back=None, stop_check=None):
+    """
+    Read signs from a TSV file made by Export corpus, one line at a time, and add them to the corpus in chunks.
+    Lines that cannot be read are skipped and listed in the report.
+    :param path: the TSV file
+    :param corpus: the Corpus to add the signs to
+    :param useDefaultParameters: if True, every sign gets the default parameters
+    :param chunk: the number of signs read between commits to the corpus
+    :param call_back: called with (lines read, total lines) after every chunk
+    :param stop_check: called after every chunk, and the import stops if it returns True
+    :return: an ImportReport
+    """
+    report = ImportReport(path)
+    total = count_lines(path)
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+        columns = column_map(next(reader))
+        width = max(max(n) if isinstance(n, list) else n for n in columns.values()) + 1
+        signs = list()
+        read = 0
+        for row in reader:
+            if not row or not any(row):
+                continue
+            read += 1
+            try:
+                if len(row) < width:
+                    raise ValueError('expected {} fields but found {}'.format(width, len(row)))
+                signs.append(sign_from_row(row, columns, useDefaultParameters))
+            except (ValueError, IndexError, KeyError, TypeError, xmlElementTree.ParseError) as e:
+                gloss = row[columns['gloss']] if len(row) > columns['gloss'] else ''
+                report.errors.append(LineError(reader.line_num, gloss, str(e)))
+
+            if read % chunk == 0:
+                commit(corpus, signs, report)
+                if call_back is not None:
+                    call_back(reader.line_num, total)
+                if stop_check is not None and stop_check():
+                    report.cancelled = True
+                    return report
+        commit(corpus, signs, report)
+        if call_back is not None:
+            call_back(total, total)
+    return report
+
+
+def commit(corpus, signs, report):
+    for sign in signs:
+        corpus.addWord(sign)
+    report.imported += len(signs)
+    del signs[:]
+
+
+class ValidationReport:
+    """
+    The problems found by validate_tsv. Errors are lines that import_tsv would skip, and warnings are lines that
+    would be imported, but perhaps not as intended.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = 0
+        self.errors = list()
+        self.warnings = list()
+        self.cancelled = False
+
+    def problems(self):
+        return sorted([(error, 'error') for error in self.errors] + [(warning, 'warning')
+                                                                     for warning in self.warnings])
+
+    def summary(self):
+        lines = ['Checked {} lines.'.format(self.lines)]
+        if self.errors:
+            lines.append('{} lines cannot be imported.'.format(len(set(error.line for error in self.errors))))
+        if self.warnings:
+            lines.append('{} lines can be imported, but have warnings.'.format(
+                len(set(warning.line for warning in self.warnings))))
+        if self.cancelled:
+            lines.append('The check was cancelled before the end of the file.')
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, mode='w', encoding='utf-8') as f:
+            print('\t'.join(LineError._fields + ('problem',)), file=f)
+            for problem, kind in self.problems():
+                print('\t'.join([str(value) for value in problem] + [kind]), file=f)
+
+
+def well_formed(xmlstring):
+    """
+    :return: None if the string is well-formed XML, otherwise the parser's message. Nothing is built, so this
+    is much faster than parsing the parameters.
+    """
+    parser = expat.ParserCreate()
+    try:
+        parser.Parse(xmlstring, True)
+    except expat.ExpatError as e:
+        return str(e)
+    return None
+
+
+def validate_rows(rows, columns, width, check_parameters=True):
+    """
+    Check rows of a TSV file for everything that would stop import_tsv from reading them. This is the part of
+    validate_tsv that can run in a worker process.
+    :param rows: a list of (line number, list of fields)
+    :param columns: the result of column_map for the file's header line
+    :param width: the number of fields in the header line
+    :param check_parameters: if False, the parameters column is not checked, as when importing with defaults
+    :return: a list of errors and a list of warnings, both LineErrors
+    """
+    errors = list()
+    warnings = list()
+    symbols = set(STANDARD_SYMBOLS + [''])
+    slots = [(confighand, n, column) for confighand in CONFIGHANDS for n, column in enumerate(columns[confighand],
+                                                                                                start=1)]
+    checked = set() #parameters already found to be well-formed
+    needed = max(max(n) if isinstance(n, list) else n for n in columns.values()) + 1
+    for line, row in rows:
+        gloss = row[columns['gloss']] if len(row) > columns['gloss'] else ''
+        if len(row) < needed:
+            errors.append(LineError(line, gloss, 'expected {} fields but found {}'.format(width, len(row))))
+            continue
+        if len(row) > width:
+            warnings.append(LineError(line, gloss, 'expected {} fields but found {}, the last {} will be '
+                                                   'ignored'.format(width, len(row), len(row)-width)))
+
+        if not symbols.issuperset(row[column] for confighand, n, column in slots):
+            for confighand, n, column in slots:
+                if row[column] not in symbols:
+                    warnings.append(LineError(line, gloss, 'slot {} of {} has the nonstandard symbol {!r}'.format(
+                        n, confighand, row[column])))
+        for confighand in CONFIGHANDS:
+            for kind in ['uncertain', 'estimated']:
+                text = row[columns[confighand+kind]]
+                try:
+                    flags = flag_list(text)
+                except ValueError:
+                    flags = None
+                if flags is None:
+                    errors.append(LineError(line, gloss, '{}{} should be None or slot numbers joined by -, '
+                                                         'not {!r}'.format(confighand, kind, text)))
+                elif any(not 1 <= n <= 34 for n in flags):
+                    #import_tsv reads the line, but has no slot to put these flags on
+                    warnings.append(LineError(line, gloss, '{}{} has slot numbers outside 1-34, which will be '
+                                                           'ignored: {!r}'.format(confighand, kind, text)))
+        try:
+            float(row[columns['frequency']])
+        except ValueError:
+            errors.append(LineError(line, gloss, 'the frequency {!r} is not a number'.format(
+                row[columns['frequency']])))
+        try:
+            year, month, day = row[columns['date']].split('-')
+            date(int(year), int(month), int(day))
+        except ValueError:
+            errors.append(LineError(line, gloss, 'the date {!r} is not YYYY-MM-DD'.format(row[columns['date']])))
+        for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+            if row[columns[option]] not in ('True', 'False'):
+                warnings.append(LineError(line, gloss, '{} is {!r}, which will be read as False'.format(
+                    option, row[columns[option]])))
+        if check_parameters:
+            xmlstring = row[columns['parameters']].strip()
+            if xmlstring not in checked:
+                message = well_formed(xmlstring) if xmlstring else 'there are no parameters'
+                if message is None:
+                    checked.add(xmlstring)
+                else:
+                    errors.append(LineError(line, gloss, 'the parameters are not well-formed XML: {}'.format(
+                        message)))
+    return errors, warnings
+
+
+def validate_tsv(path, check_parameters=True, processes=1, chunk=5000, call_back=None, stop_check=None):
+    """
+    Check every line of a TSV file before importing it, so that all the problems can be reported before any work
+    is done. Column counts, flags, frequencies, dates and the parameter XML are checked, along with the symbols
+    in every slot against STANDARD_SYMBOLS (nonstandard symbols are only warnings, since transcriptions can be
+    unrestricted) and glosses that appear more than once.
+    :param check_parameters: if False, the parameters column is not checked, as when importing with defaults
+    :param processes: 1 to check here, or the number of worker processes (None to let the pool decide)
+    :param chunk: the number of lines checked at a time
+    :param call_back: called with (lines checked, total lines) after every chunk
+    :param stop_check: called after every chunk, and the check stops if it returns True
+    :return: a ValidationReport
+    """
+    report = ValidationReport(path)
+    total = count_lines(path)
+    pool = ProcessPoolExecutor(max_workers=processes) if processes != 1 else None
+    window = 2 * (processes or os.cpu_count() or 1)
+    pending = deque()
+    glosses = dict() #{gloss: first line}
+    try:
+        with open(path, mode='r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+            headers = next(reader, None)
+            if headers is None:
+                report.errors.append(LineError(1, '', 'the file is empty'))
+                return report
+            try:
+                columns = column_map(headers)
+            except (ValueError, KeyError) as e:
+                report.errors.append(LineError(1, '', str(e)))
+                return report
+
+            while True:
+                rows = list()
+                for row in reader:
+                    if not row or not any(row):
+                        continue
+                    rows.append((reader.line_num, row))
+                    if len(rows) == chunk:
+                        break
+                if not rows:
+                    break
+                report.lines += len(rows)
+                for line, row in rows:
+                    gloss = row[columns['gloss']] if len(row) > columns['gloss'] else ''
+                    if gloss in glosses:
+                        report.warnings.append(LineError(line, gloss, 'the gloss is also on line {}, and this '
+                                                                      'line will replace it'.format(glosses[gloss])))
+                    else:
+                        glosses[gloss] = line
+                if pool is None:
+                    add_problems(report, validate_rows(rows, columns, len(headers), check_parameters))
+                else:
+                    pending.append(pool.submit(validate_rows, rows, columns, len(headers), check_parameters))
+                    while len(pending) >= window:
+                        add_problems(report, pending.popleft().result())
+                if call_back is not None:
+                    call_back(reader.line_num, total)
+                if stop_check is not None and stop_check():
+                    report.cancelled = True
+                    return report
+            while pending:
+                add_problems(report, pending.popleft().result())
+    finally:
+        if pool is not None:
+            for future in pending:
+                future.cancel()
+            pool.shutdown()
+    report.errors.sort()
+    report.warnings.sort()
+    return report
+
+
+def add_problems(report, problems):
+    errors, warnings = problems
+    report.errors.extend(errors)
+    report.warnings.extend(warnings)
+
+
+def add_fields(transcription):
+    return '[{}]1[{}]2[{}]3[{}]4[{}]5[{}]6[{}]7'.format(transcription[0],
+                                                        ''.join(transcription[1:5]),
+                                                        ''.join(transcription[5:15]),
+                                                        ''.join(transcription[15:19]),
+                                                        ''.join(transcription[19:24]),
+                                                        ''.join(transcription[24:29]),
+                                                        ''.join(transcription[29:34]))
+
+
+def format_sign(sign, include_fields=False, blank_space='_', x_in_box=X_IN_BOX, null=NULL, parameter_format='xml'):
+    """
+    Write one sign as a line of an exported TSV file, without the line break. The sign is not changed.
+    :param include_fields: if True, the transcription columns are split into fields with brackets
+    :param blank_space: the symbol written for empty slots in the transcription columns
+    :param x_in_box: the symbol written for X_IN_BOX
+    :param null: the symbol written for NULL
+    :param parameter_format: 'xml', 'txt' or 'none'
+    """
+    output = list()
+    output.append(sign.gloss)
+    confighands = [getattr(sign, confighand) for confighand in CONFIGHANDS]
+    for hand in confighands:
+        transcription = [x if x else blank_space for x in hand]
+        transcription[0] = Sign.forearmSymbol(hand, blank_space)
+        transcription[7] = null
+        if transcription[19] == X_IN_BOX:
+            transcription[19] = x_in_box
+        if transcription[24] == X_IN_BOX:
+            transcription[24] = x_in_box
+        if transcription[29] == X_IN_BOX:
+            transcription[29] = x_in_box
+        if include_fields:
+            transcription = add_fields(transcription)
+        output.append(''.join(transcription))
+
+    for confighand, slot_list in zip(CONFIGHANDS, confighands):
+        output.append(Sign.forearmSymbol(slot_list, blank_space))
+        for symbol in slot_list[1:34]:
+            if symbol == X_IN_BOX:
+                symbol = x_in_box
+            if symbol == NULL:
+                symbol = null
+            output.append(symbol)
+
+        uncertain, estimates = list(), list()
+        for i, flag in enumerate(sign.flags[confighand]):
+            if flag.isUncertain:
+                uncertain.append(str(i + 1))
+            if flag.isEstimate:
+                estimates.append(str(i + 1))
+        output.append('None' if not uncertain else '-'.join(uncertain))
+        output.append('None' if not estimates else '-'.join(estimates))
+
+    output.append(str(sign.frequency))
+    output.append(sign.coder)
+    output.append(str(sign.lastUpdated))
+
+    for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+        output.append('True' if getattr(sign, option) else 'False')
+
+    output.append(sign.notes.replace('\n', '  ').replace('\t', '    '))
+    if parameter_format == 'xml':
+        output.append(parameters.exportXML(sign.parameters))
+    elif parameter_format == 'txt':
+        output.append(parameters.exportTree(sign.parameters))
+    elif parameter_format == 'none':
+        output.append(' ')
+    return '\t'.join(output)
+
+
+def format_signs(signs, options):
+    return [format_sign(sign, **options) for sign in signs]
+
+
+def export_tsv(signs, path, processes=1, chunk=1000, call_back=None, stop_check=None, watermark=False, **options):
+    """
+    Write signs to a TSV file that import_tsv can read back. Lines are formatted a chunk at a time and written
+    through a large buffer. The file is written under a temporary name and only renamed to path once it is
+    complete, so cancelling leaves any existing file alone.
+    :param signs: a Corpus or a list of signs
+    :param processes: 1 to format here, or the number of worker processes (None to let the pool decide), which
+    only pays off for very large corpora because every sign has to be sent to a worker
+    :param chunk: the number of signs formatted at a time
+    :param call_back: called with (signs written, total signs) after every chunk
+    :param stop_check: called after every chunk, and the export stops if it returns True
+    :param watermark: if True, a watermark is saved next to the file, so that export_delta can later write only
+    the signs that changed since this export
+    :param options: passed on to format_sign
+    :return: True if the file was written, False if the export was cancelled
+    """
+    exported = date.today()
+    fingerprints = dict()
+    signs = list(signs)
+    chunks = [signs[n:n+chunk] for n in range(0, len(signs), chunk)]
+    temporary = path + '.part'
+    pool = ProcessPoolExecutor(max_workers=processes) if processes != 1 and len(chunks) > 1 else None
+    futures = list()
+    try:
+        with open(temporary, mode='w', encoding='utf-8', buffering=1024*1024) as f:
+            f.write(Sign.headers + '\n')
+            if pool is None:
+                lines = (format_signs(signs, options) for signs in chunks)
+            else:
+                futures = [pool.submit(format_signs, signs, options) for signs in chunks]
+                lines = (future.result() for future in futures)
+            written = 0
+            for formatted in lines:
+                f.write('\n'.join(formatted) + '\n')
+                written += len(formatted)
+                if watermark:
+                    fingerprints.update(fingerprint(line) for line in formatted)
+                if call_back is not None:
+                    call_back(written, len(signs))
+                if stop_check is not None and stop_check():
+                    break
+            else:
+                f.close()
+                os.replace(temporary, path)
+                if watermark:
+                    save_watermark(watermark_path(path), exported, fingerprints, options)
+                return True
+    finally:
+        if pool is not None:
+            for future in futures:
+                future.cancel()
+            pool.shutdown()
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return False
+
+
+#the glosses in a delta file made by export_delta, by the kind of change
+Delta = namedtuple('Delta', ['added', 'changed', 'deleted'])
+DELTA_CHANGES = ['added', 'changed', 'deleted']
+
+
+def fingerprint(line):
+    """
+    :return: (gloss, hash of the line) for a line made by format_sign
+    """
+    return line.split('\t', 1)[0], hashlib.blake2b(line.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def watermark_path(path):
+    return path + '.watermark'
+
+
+def save_watermark(path, exported, fingerprints, options):
+    """
+    Save what an export contained: the date it was made, the options it was formatted with and a hash of the line
+    for every gloss
+    """
+    data = {'date': str(exported), 'options': options, 'signs': fingerprints}
+    with open(path + '.part', mode='w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + '.part', path)
+
+
+def load_watermark(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    year, month, day = data['date'].split('-')
+    data['date'] = date(int(year), int(month), int(day))
+    return data
+
+
+def export_delta(signs, path, base_path, use_dates=True, chunk=1000, call_back=None, stop_check=None):
+    """
+    Write only the signs that were added, changed or deleted since an earlier export, in the same format as that
+    export. The delta is a TSV file with a 'change' column in front of the usual columns: 'added' and 'changed'
+    lines have the whole sign, and 'deleted' lines (tombstones) only have the gloss. A watermark for the delta is
+    saved next to it, so that merge_delta can pass it on to the merged export and the next delta starts from there.
+    :param signs: a Corpus or any iterable of signs
+    :param path: the delta file
+    :param base_path: an earlier export made with a watermark, or the output of merge_delta
+    :param use_dates: if True, signs last updated before the base export are not formatted again, which is much
+    faster but misses signs that were changed without updating their date (such as merged signs)
+    :param chunk: the number of signs between calls to call_back and stop_check
+    :param call_back: called with (signs checked, total signs) every chunk
+    :param stop_check: called every chunk, and the export stops if it returns True
+    :return: a Delta, or None if the export was cancelled
+    """
+    mark = load_watermark(watermark_path(base_path))
+    options = mark['options']
+    old = mark['signs']
+    exported = date.today()
+    signs = list(signs)
+    fingerprints = dict()
+    delta = Delta(list(), list(), list())
+    lines = list()
+    for done, sign in enumerate(signs, start=1):
+        before = old.get(sign.gloss)
+        if before is not None and use_dates and sign.lastUpdated < mark['date']:
+            fingerprints[sign.gloss] = before
+        else:
+            line = format_sign(sign, **options)
+            gloss, after = fingerprint(line)
+            fingerprints[gloss] = after
+            if before is None:
+                delta.added.append(gloss)
+                lines.append('added\t' + line)
+            elif before != after:
+                delta.changed.append(gloss)
+                lines.append('changed\t' + line)
+        if done % chunk == 0:
+            if call_back is not None:
+                call_back(done, len(signs))
+            if stop_check is not None and stop_check():
+                return None
+    for gloss in old:
+        if gloss not in fingerprints:
+            delta.deleted.append(gloss)
+            lines.append('deleted\t' + gloss)
+
+    temporary = path + '.part'
+    try:
+        with open(temporary, mode='w', encoding='utf-8', buffering=1024*1024) as f:
+            f.write('change\t' + Sign.headers + '\n')
+            for line in lines:
+                f.write(line + '\n')
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    save_watermark(watermark_path(path), exported, fingerprints, options)
+    if call_back is not None:
+        call_back(len(signs), len(signs))
+    return delta
+
+
+def merge_delta(export_path, delta_path, output_path=None):
+    """
+    Apply a delta made by export_delta to the export it was made from. Changed signs are replaced where they are,
+    deleted signs are dropped and added signs go at the end. The base export is read one line at a time.
+    :param output_path: where to write the merged export, or None to replace export_path
+    :return: a Delta of the glosses that were added, changed and deleted
+    """
+    output_path = export_path if output_path is None else output_path
+    changes = dict()
+    with open(delta_path, mode='r', encoding='utf-8') as f:
+        header = f.readline().rstrip('\n')
+        if header != 'change\t' + Sign.headers:
+            raise ValueError('{} is not a delta file made by export_delta'.format(delta_path))
+        for number, line in enumerate(f, start=2):
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            change, sign = line.split('\t', 1)
+            if change not in DELTA_CHANGES:
+                raise ValueError('Line {} of {} has an unknown change {!r}'.format(number, delta_path, change))
+            changes[sign.split('\t', 1)[0]] = (change, sign)
+
+    merged = Delta(list(), list(), list())
+    temporary = output_path + '.part'
+    try:
+        with open(export_path, mode='r', encoding='utf-8') as base, \
+                open(temporary, mode='w', encoding='utf-8', buffering=1024*1024) as f:
+            header = base.readline()
+            if header.rstrip('\n') != Sign.headers:
+                raise ValueError('{} is not an export of a corpus'.format(export_path))
+            f.write(header)
+            for line in base:
+                if not line.endswith('\n'):
+                    line += '\n'
+                gloss = line.split('\t', 1)[0]
+                if gloss not in changes:
+                    f.write(line)
+                    continue
+                change, sign = changes.pop(gloss)
+                if change == 'deleted':
+                    merged.deleted.append(gloss)
+                else:
+                    merged.changed.append(gloss)
+                    f.write(sign + '\n')
+            for gloss, (change, sign) in changes.items():
+                if change != 'deleted':
+                    merged.added.append(gloss)
+                    f.write(sign + '\n')
+        os.replace(temporary, output_path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    if os.path.exists(watermark_path(delta_path)):
+        mark = load_watermark(watermark_path(delta_path))
+        save_watermark(watermark_path(output_path), mark['date'], mark['signs'], mark['options'])
+    return merged
+
+
+PARQUET_EXTENSIONS = ['.parquet']
+ARROW_EXTENSIONS = ['.arrow', '.feather']
+
+
+def arrow_available():
+    return pyarrow is not None
+
+
+def require_arrow():
+    if pyarrow is None:
+        raise ImportError('Parquet and Arrow files need the pyarrow package, which can be installed with '
+                          '"pip install pyarrow"')
+
+
+def is_parquet(path):
+    return os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS
+
+
+SLOT_COLUMNS = {confighand: ['{}slot{}'.format(confighand, n) for n in range(1, 35)] for confighand in CONFIGHANDS}
+
+
+def slot_columns(confighand):
+    return SLOT_COLUMNS[confighand]
+
+
+def flag_mask(flags, attribute):
+    """
+    :return: an integer with bit n-1 set for every slot n whose flag has the attribute ('isUncertain' or 'isEstimate')
+    """
+    return sum(1 << n for n, flag in enumerate(flags) if getattr(flag, attribute))
+
+
+#Flags cannot be changed, so the ones for each pair of bitmasks are made once and shared between signs
+flag_cache = dict()
+
+
+def flags_from_masks(uncertain, estimated):
+    """
+    :return: a new list of 34 Flags for two bitmasks made by flag_mask
+    """
+    try:
+        flags = flag_cache[uncertain, estimated]
+    except KeyError:
+        flags = tuple(Flag(bool(uncertain >> n & 1), bool(estimated >> n & 1)) for n in range(34))
+        flag_cache[uncertain, estimated] = flags
+    return list(flags)
+
+
+def checked_parameters(parameterList):
+    """
+    :return: a list of 'parent:name' for every checked parameter, in the same order as exportTree
+    """
+    checked = list()
+    for parameter in parameterList:
+        checked.extend('{}:{}'.format(p.parent.name, p.name) for p in parameter.getTree() if p.is_checked)
+    return checked
+
+
+def arrow_columns():
+    """
+    :return: a dictionary of {column name: kind} for the columns of an Arrow or Parquet file, where kind is
+    'category' for a dictionary-encoded string column and otherwise the name of a column type for arrow_type
+    """
+    columns = {'gloss': 'string'}
+    for confighand in CONFIGHANDS:
+        for column in slot_columns(confighand):
+            columns[column] = 'category'
+        columns[confighand+'uncertain'] = 'bitmask'
+        columns[confighand+'estimated'] = 'bitmask'
+    columns['frequency'] = 'float'
+    columns['coder'] = 'category'
+    columns['date'] = 'date'
+    for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+        columns[option] = 'bool'
+    columns['notes'] = 'string'
+    columns['parameters'] = 'category'
+    columns['selected_parameters'] = 'list'
+    return columns
+
+
+def arrow_type(kind):
+    return {'string': pyarrow.string(),
+            'bitmask': pyarrow.int64(),
+            'float': pyarrow.float64(),
+            'date': pyarrow.date32(),
+            'bool': pyarrow.bool_(),
+            'list': pyarrow.list_(pyarrow.string())}[kind]
+
+
+def arrow_table(signs, chunk=1000, call_back=None, stop_check=None):
+    """
+    Put signs into a pyarrow Table with one column per field. Every transcription slot is its own dictionary-encoded
+    column, flags are stored as bitmasks with bit n-1 for slot n, and the parameters are stored twice: as the XML
+    that import_arrow reads back, and as a list of the checked parameters for analysis in other programs.
+    :param call_back: called with (signs done, total signs) after every chunk
+    :param stop_check: called after every chunk, and None is returned if it returns True
+    :return: a pyarrow.Table, or None if stopped
+    """
+    require_arrow()
+    signs = list(signs)
+    columns = {name: list() for name in arrow_columns()}
+    transcriptions = {confighand: list() for confighand in CONFIGHANDS}
+    options = GLOBAL_OPTIONS+FINGERSPELL_OPTIONS
+    #{selection: (xml, checked parameters)}, since most signs share a selection. The key is the sign's
+    #ParameterSelection, or its SharedParameters if it has none, and is kept in the dictionary so it cannot be
+    #confused with a later object. Parameter lists that can be edited are written every time.
+    selections = dict()
+    for done, sign in enumerate(signs, start=1):
+        columns['gloss'].append(sign.gloss)
+        for confighand in CONFIGHANDS:
+            transcriptions[confighand].append(getattr(sign, confighand))
+            flags = sign.flags[confighand]
+            columns[confighand+'uncertain'].append(flag_mask(flags, 'isUncertain'))
+            columns[confighand+'estimated'].append(flag_mask(flags, 'isEstimate'))
+        columns['frequency'].append(float(sign.frequency))
+        columns['coder'].append(sign.coder)
+        columns['date'].append(sign.lastUpdated)
+        for option in options:
+            columns[option].append(bool(getattr(sign, option, False)))
+        columns['notes'].append(sign.notes)
+        key = sign.parameterSelection
+        if key is None and isinstance(sign.parameters, parameters.SharedParameters):
+            key = sign.parameters
+        selection = selections.get(key) if key is not None else None
+        if selection is None:
+            parameterList = sign.parameters
+            selection = (parameters.exportXML(parameterList), checked_parameters(parameterList))
+            if key is not None:
+                selections[key] = selection
+        columns['parameters'].append(selection[0])
+        columns['selected_parameters'].append(selection[1])
+
+        if done % chunk == 0:
+            if call_back is not None:
+                call_back(done, len(signs))
+            if stop_check is not None and stop_check():
+                return None
+    if call_back is not None:
+        call_back(len(signs), len(signs))
+    for confighand in CONFIGHANDS:
+        #one list of symbols per slot instead of one list of slots per sign
+        slots = zip(*transcriptions[confighand]) if signs else [list() for n in range(34)]
+        for column, symbols in zip(slot_columns(confighand), slots):
+            columns[column] = symbols
+
+    arrays = dict()
+    for name, kind in arrow_columns().items():
+        if kind == 'category':
+            arrays[name] = pyarrow.array(columns[name], type=pyarrow.string()).dictionary_encode()
+        else:
+            arrays[name] = pyarrow.array(columns[name], type=arrow_type(kind))
+    return pyarrow.table(arrays)
+
+
+def export_arrow(signs, path, chunk=1000, call_back=None, stop_check=None):
+    """
+    Write signs to a Parquet file (if path ends in .parquet) or an Arrow IPC/Feather file (anything else), for
+    reading into pandas or back into a corpus with import_arrow. As with export_tsv, the file is written under a
+    temporary name and only renamed to path once it is complete.
+    :return: True if the file was written, False if the export was cancelled
+    """
+    table = arrow_table(signs, chunk=chunk, call_back=call_back, stop_check=stop_check)
+    if table is None:
+        return False
+    temporary = path + '.part'
+    try:
+        if is_parquet(path):
+            pyarrow.parquet.write_table(table, temporary)
+        else:
+            pyarrow.feather.write_feather(table, temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return True
+
+
+def column_values(array):
+    """
+    :return: the values of a pyarrow array as a list. Dictionary-encoded columns are decoded with numpy, which is
+    much faster than to_pylist when there are few distinct values.
+    """
+    if pyarrow.types.is_dictionary(array.type) and not array.null_count:
+        dictionary = np.array(array.dictionary.to_pylist(), dtype=object)
+        return dictionary[array.indices.to_numpy()].tolist()
+    return array.to_pylist()
+
+
+def read_arrow(path):
+    require_arrow()
+    if is_parquet(path):
+        return pyarrow.parquet.read_table(path)
+    return pyarrow.feather.read_table(path)
+
+
+def sign_from_arrow(values, transcriptions, row):
+    """
+    Build a Sign from one row of a table made by arrow_table
+    :param values: a dictionary of {column name: list of values}
+    :param transcriptions: a dictionary of {config-hand: list of transcriptions, each a tuple of 34 symbols}
+    :param row: the position of the sign in the lists
+    """
+    kwargs = dict()
+    flags = dict()
+    for confighand in CONFIGHANDS:
+        flags[confighand] = flags_from_masks(values[confighand+'uncertain'][row],
+                                             values[confighand+'estimated'][row])
+    kwargs['config1'] = [list(transcriptions['config1hand1'][row]), list(transcriptions['config1hand2'][row])]
+    kwargs['config2'] = [list(transcriptions['config2hand1'][row]), list(transcriptions['config2hand2'][row])]
+    kwargs['flags'] = flags
+    kwargs['gloss'] = values['gloss'][row]
+    for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS:
+        kwargs[option] = bool(values[option][row])
+    kwargs['parameters'] = parameters.sharedParseXML(values['parameters'][row])
+    kwargs['_frequency'] = values['frequency'][row]
+    kwargs['_coder'] = values['coder'][row]
+    kwargs['_lastUpdated'] = values['date'][row]
+    kwargs['signNotes'] = values['notes'][row] or ''
+    return Sign(kwargs)
+
+
+def import_arrow(path, corpus, chunk=5000, call_back=None, stop_check=None):
+    """
+    Read signs from a file made by export_arrow and add them to the corpus in chunks. Signs that cannot be read are
+    skipped and listed in the report, numbered from 1.
+    :return: an ImportReport
+    """
+    report = ImportReport(path)
+    table = read_arrow(path)
+    #selected_parameters is only there for other programs, the parameters are read from their XML
+    expected = [name for name in arrow_columns() if name != 'selected_parameters']
+    missing = [column for column in expected if column not in table.column_names]
+    if missing:
+        raise ValueError('The file has no column for {}'.format(', '.join(missing)))
+
+    done = 0
+    for batch in table.select(expected).to_batches(max_chunksize=chunk):
+        values = {name: column_values(batch.column(n)) for n, name in enumerate(batch.schema.names)}
+        transcriptions = {confighand: list(zip(*[values[column] for column in slot_columns(confighand)]))
+                          for confighand in CONFIGHANDS}
+        signs = list()
+        for row in range(batch.num_rows):
+            try:
+                signs.append(sign_from_arrow(values, transcriptions, row))
+            except (ValueError, TypeError, xmlElementTree.ParseError) as e:
+                report.errors.append(LineError(done+row+1, values['gloss'][row], str(e)))
+        commit(corpus, signs, report)
+        done += batch.num_rows
+        if call_back is not None:
+            call_back(done, table.num_rows)
+        if stop_check is not None and stop_check():
+            report.cancelled = True
+            break
+    return report
+
+
+def sign_to_json(sign):
+    """
+    Write one sign as a line of a JSON Lines file, without the line break. The keys are the names in
+    Sign.sign_attributes, the parameters are written as the XML made by exportXML, flags as [uncertain, estimated]
+    pairs and the date as YYYY-MM-DD.
+    """
+    data = dict()
+    for attribute, default_value in Sign.sign_attributes.items():
+        if attribute == 'config1':
+            value = [sign.config1hand1, sign.config1hand2]
+        elif attribute == 'config2':
+            value = [sign.config2hand1, sign.config2hand2]
+        elif attribute == 'parameters':
+            value = parameters.exportXML(sign.parameters)
+        elif attribute == 'flags':
+            value = {confighand: [[bool(flag.isUncertain), bool(flag.isEstimate)] for flag in flags]
+                     for confighand, flags in sign.flags.items()}
+        elif attribute == '_lastUpdated':
+            value = str(sign.lastUpdated)
+        else:
+            value = getattr(sign, attribute, default_value)
+        data[attribute] = value
+    return json.dumps(data, ensure_ascii=False)
+
+
+def sign_from_json(data):
+    """
+    Build a Sign from a line made by sign_to_json, once it has been read with json.loads. Attributes other than the
+    transcriptions can be missing, and get their default values. The parameters are left as their XML, for the
+    caller to parse with parameters.sharedParseXML, so that signs read in different processes still end up sharing
+    their selections.
+    """
+    kwargs = {attribute: data[attribute] for attribute in Sign.sign_attributes if attribute in data}
+    for config in ['config1', 'config2']:
+        if config not in kwargs:
+            raise ValueError('there is no {}'.format(config))
+        if len(kwargs[config]) != 2 or any(len(transcription) != 34 for transcription in kwargs[config]):
+            raise ValueError('{} must have two transcriptions of 34 slots'.format(config))
+    #the corpus sorts and indexes signs by these, so a wrong type has to be caught here and not when it is added
+    for attribute in ['gloss', '_coder', 'signNotes']:
+        if attribute in kwargs and not isinstance(kwargs[attribute], str):
+            raise ValueError('{} should be a string, not {!r}'.format(attribute, kwargs[attribute]))
+    if '_frequency' in kwargs:
+        frequency = kwargs['_frequency']
+        if isinstance(frequency, bool) or not isinstance(frequency, (int, float, str)):
+            raise ValueError('_frequency should be a number, not {!r}'.format(frequency))
+        try:
+            kwargs['_frequency'] = float(frequency)
+        except ValueError:
+            raise ValueError('_frequency should be a number, not {!r}'.format(frequency))
+    if 'flags' in kwargs:
+        if not isinstance(kwargs['flags'], dict) or set(kwargs['flags']) != set(CONFIGHANDS):
+            raise ValueError('flags should have a list for each of {}'.format(', '.join(CONFIGHANDS)))
+        for confighand, flags in kwargs['flags'].items():
+            if not isinstance(flags, list) or len(flags) != 34 or any(not isinstance(flag, list) or len(flag) != 2
+                                                                      for flag in flags):
+                raise ValueError('the flags of {} should be 34 [uncertain, estimated] pairs'.format(confighand))
+        kwargs['flags'] = {confighand: [Flag(bool(uncertain), bool(estimated)) for uncertain, estimated in flags]
+                           for confighand, flags in kwargs['flags'].items()}
+    if '_lastUpdated' in kwargs:
+        year, month, day = kwargs['_lastUpdated'].split('-')
+        kwargs['_lastUpdated'] = date(int(year), int(month), int(day))
+    kwargs.setdefault('parameters', None)
+    return Sign(kwargs)
+
+
+def export_jsonl(signs, path, call_back=None, stop_check=None, every=1000):
+    """
+    Write signs to a JSON Lines file, one sign per line, one sign at a time. As with export_tsv, the file is written
+    under a temporary name and only renamed to path once it is complete.
+    :param signs: a Corpus or any iterable of signs
+    :param call_back: called with (signs written, total signs) every so often
+    :param stop_check: called every so often, and the export stops if it returns True
+    :param every: the number of signs written between calls to call_back and stop_check
+    :return: True if the file was written, False if the export was cancelled
+    """
+    total = len(signs) if hasattr(signs, '__len__') else 0
+    temporary = path + '.part'
+    try:
+        with open(temporary, mode='w', encoding='utf-8', buffering=1024*1024) as f:
+            written = 0
+            for sign in signs:
+                f.write(sign_to_json(sign) + '\n')
+                written += 1
+                if written % every == 0:
+                    if call_back is not None:
+                        call_back(written, total)
+                    if stop_check is not None and stop_check():
+                        return False
+        os.replace(temporary, path)
+        if call_back is not None:
+            call_back(written, total)
+        return True
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def parse_json_lines(lines):
+    """
+    The part of import_jsonl that can run in a worker process
+    :param lines: a list of (line number, text)
+    :return: a list of (line number, Sign) and a list of LineErrors
+    """
+    signs = list()
+    errors = list()
+    for number, line in lines:
+        if not line.strip():
+            continue
+        data = None
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError('expected a JSON object')
+            signs.append((number, sign_from_json(data)))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            gloss = data.get('gloss', '') if isinstance(data, dict) else ''
+            errors.append(LineError(number, gloss, str(e)))
+    return signs, errors
+
+
+def commit_json(corpus, result, report):
+    """
+    Add the signs parsed by parse_json_lines to the corpus, after giving them the shared parameter selection for
+    their XML
+    """
+    signs, errors = result
+    report.errors.extend(errors)
+    added = list()
+    for number, sign in signs:
+        try:
+            if sign.parameters is None:
+                sign.parameters = parameters.sharedDefaultParameters
+            else:
+                sign.parameters = parameters.sharedParseXML(sign.parameters)
+        except (xmlElementTree.ParseError, AttributeError) as e:
+            report.errors.append(LineError(number, sign.gloss, str(e)))
+            continue
+        added.append(sign)
+    commit(corpus, added, report)
+
+
+def import_jsonl(path, corpus, processes=1, chunk=2000, call_back=None, stop_check=None):
+    """
+    Read signs from a JSON Lines file made by export_jsonl and add them to the corpus. The file is read a chunk of
+    lines at a time, and with more than one process the chunks are parsed in worker processes, with only a few
+    chunks in flight at once so that memory use does not grow with the size of the file.
+    :param processes: 1 to parse here, or the number of worker processes (None to let the pool decide)
+    :param chunk: the number of lines parsed at a time
+    :param call_back: called with (lines read, total lines) after every chunk
+    :param stop_check: called after every chunk, and the import stops if it returns True
+    :return: an ImportReport
+    """
+    report = ImportReport(path)
+    total = count_lines(path)
+    pool = ProcessPoolExecutor(max_workers=processes) if processes != 1 else None
+    #enough chunks to keep every worker busy while the results of the first one are added to the corpus
+    window = 2 * (processes or os.cpu_count() or 1)
+    pending = deque()
+    read = 0
+    try:
+        with open(path, mode='r', encoding='utf-8') as f:
+            numbered = enumerate(f, start=1)
+            while True:
+                lines = list(islice(numbered, chunk))
+                if not lines:
+                    break
+                read += len(lines)
+                if pool is None:
+                    commit_json(corpus, parse_json_lines(lines), report)
+                else:
+                    pending.append(pool.submit(parse_json_lines, lines))
+                    while len(pending) >= window:
+                        commit_json(corpus, pending.popleft().result(), report)
+                if call_back is not None:
+                    call_back(read, total)
+                if stop_check is not None and stop_check():
+                    report.cancelled = True
+                    return report
+            while pending:
+                commit_json(corpus, pending.popleft().result(), report)
+    finally:
+        if pool is not None:
+            for future in pending:
+                future.cancel()
+            pool.shutdown()
+    report.errors.sort()
+    return report
@@ -0,0 +1,140 @@
+import hashlib
+from constants import GLOBAL_OPTIONS, FINGERSPELL_OPTIONS
+
+KEEP_CURRENT = 'keep'
+OVERWRITE = 'overwrite'
+KEEP_BOTH = 'both'
+MERGE_POLICIES = [KEEP_CURRENT, OVERWRITE, KEEP_BOTH]
+
+CONFIGHANDS = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+
+
+class MergePlan:
+    """
+    The result of comparing a source of signs against a corpus, one sign at a time. Signs are sorted into new signs
+    (no sign with that gloss in the corpus), identical signs (same gloss and same transcription key) and conflicts
+    (same gloss, different transcription key). Glosses are compared ignoring case, as in Corpus.__contains__, and a
+    sign is also compared against the new signs before it in the source. Nothing is changed until apply_merge is
+    called.
+    """
+
+    def __init__(self):
+        self.new = list()
+        self.identical = list()
+        self.conflicts = list()
+
+    def __len__(self):
+        return len(self.new) + len(self.identical) + len(self.conflicts)
+
+    def summary(self):
+        return '{} new signs, {} identical signs and {} conflicting signs'.format(len(self.new), len(self.identical),
+                                                                                 len(self.conflicts))
+
+
+class MergeReport:
+    def __init__(self, policy):
+        self.policy = policy
+        self.added = list()
+        self.identical = list()
+        self.conflicts = list() #(gloss, what happened) tuples
+
+    def summary(self):
+        lines = ['Added {} new signs.'.format(len(self.added)),
+                 'Skipped {} signs that were already in the corpus.'.format(len(self.identical)),
+                 'Found {} conflicting signs.'.format(len(self.conflicts))]
+        return '\n'.join(lines)
+
+    def conflictText(self):
+        return '\n'.join('{}\t{}'.format(gloss, resolution) for gloss, resolution in self.conflicts)
+
+    def save(self, path):
+        with open(path, mode='w', encoding='utf-8') as f:
+            print('gloss\tstatus', file=f)
+            for gloss in self.added:
+                print('{}\tadded'.format(gloss), file=f)
+            for gloss in self.identical:
+                print('{}\tidentical'.format(gloss), file=f)
+            for gloss, resolution in self.conflicts:
+                print('{}\t{}'.format(gloss, resolution), file=f)
+
+
+def transcription_key(sign):
+    """
+    A hash of everything that is compared when merging: the four transcriptions, with empty slots written as '_',
+    their flags, and the global and fingerspelling options. Parameters and notes are not compared.
+    """
+    lines = list()
+    for confighand in CONFIGHANDS:
+        lines.append('\t'.join(slot if slot else '_' for slot in getattr(sign, confighand)))
+        lines.append(''.join('{:d}{:d}'.format(*flag) for flag in sign.flags[confighand]))
+    lines.append(''.join('1' if getattr(sign, option, False) else '0'
+                         for option in GLOBAL_OPTIONS+FINGERSPELL_OPTIONS))
+    return hashlib.blake2b('\n'.join(lines).encode('utf-8'), digest_size=16).digest()
+
+
+def plan_merge(corpus, signs):
+    """
+    :param corpus: the corpus to merge into
+    :param signs: any iterable of signs, for example another Corpus
+    :return: a MergePlan
+    """
+    plan = MergePlan()
+    planned = dict() #{case-folded gloss: transcription key} for the new signs already in the plan
+    for sign in signs:
+        gloss = corpus.glossIndex.lookup(sign.gloss)
+        if gloss is not None:
+            key = transcription_key(corpus.wordlist[gloss])
+        elif sign.gloss.casefold() in planned:
+            key = planned[sign.gloss.casefold()]
+        else:
+            plan.new.append(sign)
+            planned[sign.gloss.casefold()] = transcription_key(sign)
+            continue
+
+        if key == transcription_key(sign):
+            plan.identical.append(sign)
+        else:
+            plan.conflicts.append(sign)
+    return plan
+
+
+def apply_merge(corpus, plan, policy=KEEP_CURRENT):
+    """
+    Add the signs in a MergePlan to the corpus, resolving every conflict with the same policy. The corpus is not
+    saved, so the caller can write it once afterwards.
+    :param corpus: the corpus the plan was made for
+    :param plan: a MergePlan from plan_merge
+    :param policy: KEEP_CURRENT, OVERWRITE or KEEP_BOTH (adds the new sign under a numbered gloss)
+    :return: a MergeReport
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError('Unknown merge policy {!r}, choose one of: {}'.format(policy, ', '.join(MERGE_POLICIES)))
+
+    report = MergeReport(policy)
+    for sign in plan.new:
+        corpus.addWord(sign)
+        report.added.append(sign.gloss)
+    report.identical.extend(sign.gloss for sign in plan.identical)
+    for sign in plan.conflicts:
+        if policy == KEEP_CURRENT:
+            report.conflicts.append((sign.gloss, 'kept current sign'))
+        elif policy == OVERWRITE:
+            current = corpus.glossIndex.lookup(sign.gloss)
+            if current is not None and current != sign.gloss:
+                #the current sign is spelled with different case, and is replaced rather than kept alongside
+                corpus.removeWord(current)
+            corpus.addWord(sign)
+            report.conflicts.append((sign.gloss, 'overwritten'))
+        else:
+            gloss = sign.gloss
+            sign.gloss = unused_gloss(corpus, gloss)
+            corpus.addWord(sign)
+            report.conflicts.append((gloss, 'added as {}'.format(sign.gloss)))
+    return report
+
+
+def unused_gloss(corpus, gloss):
+    n = 2
+    while '{} ({})'.format(gloss, n) in corpus:
+        n += 1
+    return '{} ({})'.format(gloss, n)
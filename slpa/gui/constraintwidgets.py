@@ -1,6 +1,9 @@
+from functools import partial
 from constraints import *
+from constraintspecs import dependency_graph
+from analysis.constraint_check import check_corpus
 from imports import (QWidget, QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QStackedWidget,
-                     QPushButton, QCheckBox, QLabel, QTabWidget)
+                     QPushButton, QCheckBox, QLabel, QTabWidget, QTableWidget, QTableWidgetItem, QFileDialog)
 
 class ConstraintTab(QWidget):
 
@@ -263,4 +266,131 @@ class ConstraintCheckMessageBox(QDialog):
         self.selected_page = new_page
 
     def changedTab(self, new_tab):
-        self.selected_tab = new_tab
\ No newline at end of file
+        self.selected_tab = new_tab
+
+
+class CorpusConstraintReport(QDialog):
+    """
+    Shows the result of checking every sign in the corpus against the selected constraints, one row per violated slot
+    """
+
+    def __init__(self, report):
+        super().__init__()
+        self.setWindowTitle('Corpus verification')
+        self.report = report
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(report.summary()))
+
+        if report.violations:
+            table = QTableWidget()
+            table.setColumnCount(4)
+            table.setHorizontalHeaderLabels(['Gloss', 'Config-hand', 'Slot', 'Constraint'])
+            table.setRowCount(len(report.violations))
+            for row, violation in enumerate(report.violations):
+                for column, value in enumerate(violation):
+                    table.setItem(row, column, QTableWidgetItem(str(value)))
+            layout.addWidget(table)
+
+        buttonLayout = QHBoxLayout()
+        if report.violations:
+            saveButton = QPushButton('Save report...')
+            saveButton.clicked.connect(self.saveReport)
+            buttonLayout.addWidget(saveButton)
+        ok = QPushButton('OK')
+        ok.clicked.connect(self.accept)
+        buttonLayout.addWidget(ok)
+        layout.addLayout(buttonLayout)
+        self.setLayout(layout)
+
+    def saveReport(self):
+        path = QFileDialog.getSaveFileName(self, 'Save Constraint Report', 'constraint_report', '*.tsv')[0]
+        if path:
+            self.report.save(path)
+
+
+class LiveConstraintChecker:
+    """
+    Checks the transcriptions in the main window against the selected constraints while they are being typed. Each
+    slot only triggers the constraints that read it (see constraintspecs.dependency_graph), and only the violation
+    labels of slots whose results changed are updated.
+    """
+
+    def __init__(self, transcriptions, constraints, enabled=True):
+        """
+        :param transcriptions: a dictionary of {'config1hand1': TranscriptionLayout, ...}
+        :param constraints: the main window's {name: True/False} dictionary of selected constraints
+        :param enabled: if False, nothing is checked until setEnabled(True) is called
+        """
+        self.transcriptions = transcriptions
+        self.enabled = enabled
+        self.results = {confighand: dict() for confighand in transcriptions}
+        self.setConstraints(constraints)
+
+        for confighand, transcription in transcriptions.items():
+            for slot in transcription.slots:
+                if slot.num == 1:
+                    slot.stateChanged.connect(partial(self.slotChanged, confighand, 1))
+                else:
+                    slot.textChanged.connect(partial(self.slotChanged, confighand, slot.num))
+
+    def setConstraints(self, constraints):
+        self.constraints = {name: constraint for name, constraint in MasterConstraintList
+                            if constraints.get(name) and constraint not in UnsupportedConstraints}
+        #constraints without a spec are assumed to read every slot
+        graph = dependency_graph()
+        known = set(name for names in graph.values() for name in names)
+        self.graph = {slot: [name for name in self.constraints if name in graph[slot] or name not in known]
+                      for slot in graph}
+        self.checkAll()
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+        if enabled:
+            self.checkAll()
+        else:
+            for confighand, transcription in self.transcriptions.items():
+                self.results[confighand] = dict()
+                transcription.clearViolationLabels()
+
+    def checkAll(self):
+        if not self.enabled:
+            return
+        for confighand, transcription in self.transcriptions.items():
+            self.results[confighand] = dict()
+            for name in self.constraints:
+                self.evaluate(confighand, name)
+            self.updateLabels(confighand, range(1, 35))
+
+    def slotChanged(self, confighand, num, *args):
+        if not self.enabled:
+            return
+        changed = set()
+        for name in self.graph[num]:
+            changed.update(self.evaluate(confighand, name))
+        if changed:
+            self.updateLabels(confighand, changed)
+
+    def evaluate(self, confighand, name):
+        """
+        Run one constraint on one transcription
+        :return: the set of slots whose result for this constraint changed
+        """
+        result = self.constraints[name].check(self.transcriptions[confighand].slots)
+        slots = set(int(slot) for slot in result.split(', ')) if result else set()
+        previous = self.results[confighand].get(name, set())
+        self.results[confighand][name] = slots
+        return slots ^ previous
+
+    def updateLabels(self, confighand, slots):
+        transcription = self.transcriptions[confighand]
+        for slot in slots:
+            violationLabel = getattr(transcription, 'violation{}'.format(slot))
+            names = sorted(self.constraints[name].name for name, violated in self.results[confighand].items()
+                           if slot in violated)
+            if names:
+                violationLabel.setText('   *')
+                violationLabel.setToolTip('\n'.join(['Slot {}'.format(slot)] + names))
+            else:
+                violationLabel.setText(' ')
+                violationLabel.setToolTip('')
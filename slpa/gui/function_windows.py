@@ -1,5 +1,5 @@
 from imports import (QThread, Signal, QDialog, QVBoxLayout, QPushButton, QScrollArea, QWidget,
-                     QHBoxLayout, Slot)
+                     QHBoxLayout, Slot, QProgressDialog, Qt)
 
 
 class FunctionWorker(QThread):
@@ -121,4 +121,63 @@ class FunctionDialog(QDialog):
         #TODO: implement this
         pass
         #self.aboutWindow = HelpDialog(self, self.name)
-        #self.aboutWindow.exec_()
\ No newline at end of file
+        #self.aboutWindow.exec_()
+
+
+class ProgressWorker(QThread):
+    """
+    Runs function(*args, call_back=..., stop_check=..., **kwargs) off the GUI thread. The function reports
+    progress through call_back(done, total) and stops early when stop_check() returns True.
+    """
+    updateProgress = Signal(int, int)
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.stopped = False
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.function(*self.args, call_back=self.emitProgress, stop_check=self.stopCheck,
+                                        **self.kwargs)
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self.stopped = True
+
+    def stopCheck(self):
+        return self.stopped
+
+    def emitProgress(self, done, total):
+        self.updateProgress.emit(done, total)
+
+
+def runWithProgress(parent, label, function, *args, **kwargs):
+    """
+    Run a function in a ProgressWorker behind a progress dialog with a Cancel button, and wait for it to finish
+    :return: the worker, with the return value in worker.result and any exception in worker.error
+    """
+    worker = ProgressWorker(function, *args, **kwargs)
+    progress = QProgressDialog(label, 'Cancel', 0, 100, parent)
+    progress.setWindowModality(Qt.WindowModal)
+    progress.setAutoClose(False)
+    progress.setMinimumDuration(0)
+
+    def setProgress(done, total):
+        progress.setValue(int(100 * done / total) if total else 0)
+
+    worker.updateProgress.connect(setProgress)
+    worker.finished.connect(progress.accept)
+    progress.canceled.connect(worker.stop)
+    worker.start()
+    progress.exec_()
+    if worker.isRunning():
+        #the dialog was cancelled or closed, so the function stops at its next check
+        worker.stop()
+    worker.wait()
+    return worker
@@ -1,8 +1,18 @@
-from collections import defaultdict
-from math import log2 as log
 from gui.transcriptions import STANDARD_SYMBOLS
+from analysis.functional_load import (functional_load_by_selection, pairwise_functional_load_by_selection,
+                                      bootstrap_by_selection,
+                                      flexion_contrasts, duction_contrasts, opposition_contrasts, contact_contrasts,
+                                      custom_contrast, predefined_contrasts,
+                                      save_results, save_matrices, FunctionalLoadTracker, TYPE_WEIGHTING,
+                                      TOKEN_WEIGHTING, CONFIGHANDS, SEPARATE, CONCATENATED, MULTISET)
 from imports import (QDialog, QHBoxLayout, QVBoxLayout, QGroupBox, QRadioButton, QButtonGroup, QPushButton,
-                    QStackedWidget, QWidget, QComboBox, QMessageBox, QLabel, QLineEdit, QTableWidget, QTableWidgetItem)
+                    QStackedWidget, QWidget, QComboBox, QMessageBox, QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+                    QFileDialog, QCheckBox)
+
+
+BOOTSTRAP_METHOD = ('Confidence intervals are bias-corrected percentile bootstrap intervals. Entropy measured on a '
+                    'resampled corpus is lower on average than on the corpus itself, so every bootstrap sample is '
+                    'moved up by that average difference before the 2.5th and 97.5th percentiles are taken.')
 
 
 class FunctionalLoadDialog(QDialog):
@@ -11,6 +21,8 @@ class FunctionalLoadDialog(QDialog):
         super().__init__()
         self.corpus = corpus
         self.results = list()
+        self.matrices = list()
+        self.intervals = None
 
         self.setWindowTitle('Functional Load')
         layout = QVBoxLayout()
@@ -25,16 +37,19 @@ class FunctionalLoadDialog(QDialog):
         oppositionOption = QRadioButton('Thumb opposition')
         contactOption = QRadioButton('Thumb/finger contact')
         customOption = QRadioButton('Custom options')
+        allOption = QRadioButton('All contrasts')
         self.contrastGroup.addButton(flexionOption, id=0)
         self.contrastGroup.addButton(ductionOption, id=1)
         self.contrastGroup.addButton(oppositionOption, id=2)
         self.contrastGroup.addButton(contactOption, id=3)
         self.contrastGroup.addButton(customOption, id=4)
+        self.contrastGroup.addButton(allOption, id=5)
         contrastLayout.addWidget(flexionOption)
         contrastLayout.addWidget(ductionOption)
         contrastLayout.addWidget(oppositionOption)
         contrastLayout.addWidget(contactOption)
         contrastLayout.addWidget(customOption)
+        contrastLayout.addWidget(allOption)
         contrastBox.setLayout(contrastLayout)
 
         #set up stacked widgets
@@ -63,11 +78,13 @@ class FunctionalLoadDialog(QDialog):
         #Collapse thumb opposition
         oppositionWidget = QWidget()
         oppositionLayout = QHBoxLayout()
+        oppositionLayout.addWidget(QLabel('Merge every thumb opposition symbol in slot 2'))
         oppositionWidget.setLayout(oppositionLayout)
 
         #Collapse thumb/finger contact
         contactWidget = QWidget()
         contactLayout = QHBoxLayout()
+        contactLayout.addWidget(QLabel('Merge every symbol in the thumb/finger contact slots (6, 7 and 10 to 15)'))
         contactWidget.setLayout(contactLayout)
 
         #Collapse custom slots
@@ -91,12 +108,21 @@ class FunctionalLoadDialog(QDialog):
         customLayout.addWidget(QLabel('(separate numbers with commas, leave blank to merge symbols everywhere)'))
         customWidget.setLayout(customLayout)
 
+        #Every contrast at once
+        allWidget = QWidget()
+        allLayout = QHBoxLayout()
+        self.allSelection = QComboBox()
+        self.allSelection.addItems(['Every pair of symbols in every slot', 'Every flexion and duction contrast'])
+        allLayout.addWidget(self.allSelection)
+        allWidget.setLayout(allLayout)
+
         #Build up middle widget
         self.middleWidget.addWidget(flexionWidget)
         self.middleWidget.addWidget(ductionWidget)
         self.middleWidget.addWidget(oppositionWidget)
         self.middleWidget.addWidget(contactWidget)
         self.middleWidget.addWidget(customWidget)
+        self.middleWidget.addWidget(allWidget)
 
         #Connect slots and signals
         flexionOption.clicked.connect(self.changeMiddleWidget)
@@ -104,6 +130,34 @@ class FunctionalLoadDialog(QDialog):
         oppositionOption.clicked.connect(self.changeMiddleWidget)
         contactOption.clicked.connect(self.changeMiddleWidget)
         customOption.clicked.connect(self.changeMiddleWidget)
+        allOption.clicked.connect(self.changeMiddleWidget)
+
+        #Which config-hands to analyse, and how to combine them
+        selectionBox = QGroupBox('Config-hands')
+        selectionLayout = QHBoxLayout()
+        self.confighandCheckBoxes = list()
+        for n, label in enumerate(['Config 1 hand 1', 'Config 1 hand 2', 'Config 2 hand 1', 'Config 2 hand 2']):
+            checkBox = QCheckBox(label)
+            checkBox.setChecked(n == 0)
+            selectionLayout.addWidget(checkBox)
+            self.confighandCheckBoxes.append(checkBox)
+        self.selectionMode = QComboBox()
+        self.selectionMode.addItems(['Separately', 'Side by side', 'Pooled together'])
+        selectionLayout.addWidget(self.selectionMode)
+        selectionBox.setLayout(selectionLayout)
+
+        #Count each sign once, or weight signs by their frequency
+        weightingBox = QGroupBox('Weighting')
+        weightingLayout = QHBoxLayout()
+        self.typeOption = QRadioButton('Type frequency')
+        self.typeOption.setChecked(True)
+        self.tokenOption = QRadioButton('Token frequency')
+        weightingLayout.addWidget(self.typeOption)
+        weightingLayout.addWidget(self.tokenOption)
+        self.bootstrapOption = QCheckBox('95% confidence intervals (1000 bootstrap samples)')
+        self.bootstrapOption.setToolTip(BOOTSTRAP_METHOD)
+        weightingLayout.addWidget(self.bootstrapOption)
+        weightingBox.setLayout(weightingLayout)
 
         #Bottom buttons (OK/Cancel)
         buttonLayout = QHBoxLayout()
@@ -116,6 +170,8 @@ class FunctionalLoadDialog(QDialog):
 
         layout.addWidget(contrastBox)
         layout.addWidget(self.middleWidget)
+        layout.addWidget(selectionBox)
+        layout.addWidget(weightingBox)
         layout.addLayout(buttonLayout)
 
         self.setLayout(layout)
@@ -133,9 +189,14 @@ class FunctionalLoadDialog(QDialog):
                 alert.setText('Thumbs cannot be selected for proximal joint. Choose either "Medial" or "Distal"')
                 alert.exec_()
                 return
-            self.calcByFlexion()
+            contrasts = flexion_contrasts(self.flexionFingerSelection.currentText(),
+                                          self.flexionJointSelection.currentText())
         elif index == 1:
-            self.calcByDuction()
+            contrasts = duction_contrasts(self.ductionFingerSelection.currentText())
+        elif index == 2:
+            contrasts = opposition_contrasts()
+        elif index == 3:
+            contrasts = contact_contrasts()
 
         elif index == 4:
             slots = self.customSlots.text()
@@ -144,219 +205,169 @@ class FunctionalLoadDialog(QDialog):
             alert.setText('Slot numbers must be between 1 and 34 (inclusive)')
 
             try:
-                slots = [int(x.strip()) for x in slots.split(',')]
+                slots = [int(x.strip()) for x in slots.split(',')] if slots.strip() else None
             except ValueError:
                 alert.exec_()
                 return
 
-            if any(n > 34 or n < 1 for n in slots):
+            if slots is not None and any(n > 34 or n < 1 for n in slots):
                 alert.exec_()
                 return
-            self.calcCustom(slots)
-
+            contrasts = [custom_contrast(self.customSymbo1A.currentText(), self.customSymbolB.currentText(), slots)]
+        elif index == 5 and self.allSelection.currentIndex() == 1:
+            contrasts = predefined_contrasts()
+        else:
+            #every pair of symbols, which is worked out by pairwise_functional_load_by_selection below
+            contrasts = list()
+
+        confighands = [confighand for confighand, checkBox in zip(CONFIGHANDS, self.confighandCheckBoxes)
+                       if checkBox.isChecked()]
+        mode = [SEPARATE, CONCATENATED, MULTISET][self.selectionMode.currentIndex()]
+        pairwise = index == 5 and self.allSelection.currentIndex() == 0
+        if not confighands or (pairwise and mode == CONCATENATED):
+            alert = QMessageBox()
+            alert.setWindowTitle('Invalid config-hands')
+            if not confighands:
+                alert.setText('Choose at least one config-hand')
+            else:
+                alert.setText('Pairs of symbols can only be compared for config-hands taken separately or pooled')
+            alert.exec_()
+            return
+
+        weighting = TOKEN_WEIGHTING if self.tokenOption.isChecked() else TYPE_WEIGHTING
+        if pairwise:
+            self.matrices = pairwise_functional_load_by_selection(self.corpus, confighands, mode, weighting)
+            self.results = [result for matrix in self.matrices for result in matrix.results()]
+        else:
+            self.results = functional_load_by_selection(self.corpus, contrasts, confighands, mode, weighting)
+            if self.bootstrapOption.isChecked():
+                self.intervals = bootstrap_by_selection(self.corpus, contrasts, confighands, mode, weighting)
         super().accept()
 
-    def calculateEntropy(self, corpus=None):
-        corpus_size = len(corpus) if corpus is not None else len(self.corpus)
-        return corpus_size, sum([1 / corpus_size * log(1 / corpus_size) for n in range(corpus_size)]) * -1
-
-
-    def calcByDuction(self):
-        corpus_size, starting_h = self.calculateEntropy()
-        duction = self.ductionFingerSelection.currentText()
-        if duction == 'Thumb/Finger':
-            slot = 3
-        elif duction == 'Index/Middle':
-            slot = 19
-        elif duction == 'Middle/Ring':
-            slot = 24
-        elif duction == 'Ring/Pinky':
-            slot = 29
-        elif duction == 'All':
-            slot = -1
-
-        if slot > 1:
-            print('{} DUCTION'.format(duction.upper()))
-            print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-            new_corpus = defaultdict(int)
-            for word in self.corpus:
-                ch = word.config1hand1.copy()
-                ch[slot] = 'X'
-                new_corpus[''.join(ch)] += 1
-
-            new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-            print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-            print('Change in entropy = {}\n'.format(starting_h - ending_h))
-        else:
-            print('{} DUCTION'.format(duction.upper()))
-            print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-            new_corpus = defaultdict(int)
-            for word in self.corpus:
-                ch = word.config1hand1.copy()
-                ch[2] = 'X'
-                ch[19] = 'X'
-                ch[24] = 'X'
-                ch[29] = 'X'
-                new_corpus[''.join(ch)] += 1
-            new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-            print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-            print('Change in entropy = {}\n'.format(starting_h - ending_h))
-
-        result = [corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h]
-        self.results = [result]
-
-
-    def calcCustom(self, slots):
-        corpus_size, starting_h = self.calculateEntropy()
-
-        slots = [n-1 for n in slots]
-        # minus 1 because slot numbers starts at 1 but list indices start at 0
-
-        symbolA = self.customSymbo1A.currentText()
-        symbolB = self.customSymbolB.currentText()
-
-        print('Merging {} and {}'.format(symbolA, symbolB))
-        print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-        new_corpus = defaultdict(int)
-        for word in self.corpus:
-            ch = word.config1hand1.copy()
-            for slot in slots:
-                if ch[slot] in [symbolA, symbolB]:
-                    ch[slot] = 'X'
-
-            new_corpus[''.join(ch)] += 1
-
-        new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-        print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-        print('Change in entropy = {}\n'.format(starting_h - ending_h))
-        result = [corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h]
-        self.results = [result]
-
-
-    def calcByFlexion(self):
-        corpus_size, starting_h = self.calculateEntropy()
-
-        finger = self.flexionFingerSelection.currentText()
-        joint = self.flexionJointSelection.currentText()
-
-        jointDict = {'Proximal': 0,
-                     'Medial': 1,
-                     'Distal': 2,
-                     'All': -1}
-
-        fingerDict = {'Thumb':2,
-                      'Index': 16,
-                      'Middle': 21,
-                      'Ring': 26,
-                      'Pinky': 31,
-                      'All': -1}
-
-        offset = jointDict[joint]
-        slot = fingerDict[finger]
-        slot += offset
-
-        if slot > 0:#user chose particular fingers
-
-            print('{} {} JOINTS'.format(finger.upper(), joint.upper()))
-            print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-            new_corpus = defaultdict(int)
-            for word in self.corpus:
-                ch = word.config1hand1.copy()
-                ch[slot] = 'X'
-                new_corpus[''.join(ch)] += 1
-
-            new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-            print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-            print('Change in entropy = {}\n'.format(starting_h - ending_h))
-            self.results = [[corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h]]
-
-        else: #user chose an "All" option
-
-            if joint == 'All' and finger != 'All':
-                #all the joints on a particular finger
-
-                slot = fingerDict[finger]
-
-                print('ALL {} JOINTS'.format(finger.upper()))
-                print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-                new_corpus = defaultdict(int)
-                for word in self.corpus:
-                    ch = word.config1hand1.copy()
-                    ch[slot] = 'X' #proximal
-                    ch[slot+1] = 'X' #medial
-                    if not finger == 'Thumb':
-                        ch[slot+2] = 'X' #distal
-                    new_corpus[''.join(ch)] += 1
-
-                new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-                print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-                print('Change in entropy = {}\n'.format(starting_h-ending_h))
-                self.results = [[corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h]]
-
-            elif finger == 'All' and joint != 'All':
-                #a particular joint on all the fingers
-
-                if joint == 'Proximal':
-                    slot = 17
-                elif joint == 'Medial':
-                    slot = 18
-                elif joint == 'Distal':
-                    slot = 19
-
-                print('ALL {} JOINTS'.format(joint.upper()))
-                print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-                # for finger,slot in [('INDEX', 17), ('MIDDLE',22), ('RING',27), ('PINKY',32)]:
-                new_corpus = defaultdict(int)
-                for word in self.corpus:
-                    ch = word.config1hand1.copy()
-                    ch[slot] = 'X'
-                    ch[slot+5] = 'X'
-                    ch[slot+10] = 'X'
-                    ch[slot+15] = 'X'
-                    new_corpus[''.join(ch)] += 1
-
-                    new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-                print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-                print('Change in entropy = {}\n'.format(starting_h-ending_h))
-                self.results = [[corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h]]
-
-            elif finger == 'All' and joint == 'All':
-                results = list()
-                for finger, slot in [('THUMB', 2), ('INDEX', 17), ('MIDDLE', 22), ('RING', 27), ('PINKY', 31)]:
-                    print('ALL {} JOINTS'.format(joint.upper()))
-                    print('Starting size = {}\nStarting entropy = {}'.format(corpus_size, starting_h))
-                    new_corpus = defaultdict(int)
-                    for word in self.corpus:
-                        ch = word.config1hand1.copy()
-                        ch[slot] = 'X'
-                        ch[slot+1] = 'X'
-                        if not finger == 'Thumb':
-                            ch[slot+2] = 'X'
-                        new_corpus[''.join(ch)] += 1
-
-                    new_corpus_size, ending_h = self.calculateEntropy(new_corpus)
-                    print('After merging size = {}\nAfter merging entropy = {}'.format(len(new_corpus), ending_h))
-                    print('Change in entropy = {}\n'.format(starting_h-ending_h))
-                    results.append([corpus_size, starting_h, new_corpus_size, ending_h, starting_h-ending_h])
-                self.results = results
 
 class FunctionalLoadResultsTable(QDialog):
 
-    def __init__(self, results):
+    def __init__(self, results, matrices=None, intervals=None):
         super().__init__()
+        self.results = results
+        self.matrices = matrices
+        self.intervals = intervals
 
-        layout = QHBoxLayout()
+        layout = QVBoxLayout()
 
         table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels(['Starting corpus size', 'Starting entropy',
-                                         'Ending corpus size', 'Ending entropy', 'Change in entropy'])
-        for result in results:
+        headers = ['Config-hands', 'Contrast', 'Starting corpus size', 'Starting entropy',
+                   'Ending corpus size', 'Ending entropy', 'Change in entropy']
+        if intervals is not None:
+            headers.extend(['Starting entropy (lower)', 'Starting entropy (upper)',
+                            'Change in entropy (lower)', 'Change in entropy (upper)'])
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        for n, result in enumerate(results):
             table.insertRow(table.rowCount())
-            for i, item in enumerate(result):
+            items = list(result) if intervals is None else list(result) + list(intervals[n])
+            for i, item in enumerate(items):
                 newItem = QTableWidgetItem(str(item))
                 table.setItem(table.rowCount()-1, i, newItem)
 
         layout.addWidget(table)
+        if intervals is not None:
+            methodLabel = QLabel(BOOTSTRAP_METHOD)
+            methodLabel.setWordWrap(True)
+            layout.addWidget(methodLabel)
+
+        buttonLayout = QHBoxLayout()
+        saveButton = QPushButton('Save results...')
+        saveButton.clicked.connect(self.saveResults)
+        buttonLayout.addWidget(saveButton)
+        if matrices:
+            matrixButton = QPushButton('Save slot by symbol pair matrix...')
+            matrixButton.clicked.connect(self.saveMatrix)
+            buttonLayout.addWidget(matrixButton)
+        layout.addLayout(buttonLayout)
         self.setLayout(layout)
 
+    def saveResults(self):
+        path = QFileDialog.getSaveFileName(self, 'Save Functional Load Results', 'functional_load', '*.tsv')[0]
+        if path:
+            save_results(self.results, path, self.intervals)
+
+    def saveMatrix(self):
+        path = QFileDialog.getSaveFileName(self, 'Save Functional Load Matrix', 'functional_load_matrix', '*.tsv')[0]
+        if path:
+            save_matrices(self.matrices, path)
+
+
+class FunctionalLoadDashboard(QDialog):
+    """
+    A window showing the functional load of the flexion and duction contrasts, kept up to date as signs are saved
+    and deleted. The main window passes every change to signSaved and signDeleted.
+    """
+
+    def __init__(self, corpus, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Functional Load Dashboard')
+        self.setModal(False)
+        self.tracker = None
+
+        layout = QVBoxLayout()
+        optionLayout = QHBoxLayout()
+        self.confighandSelection = QComboBox()
+        self.confighandSelection.addItems(CONFIGHANDS)
+        self.confighandSelection.currentIndexChanged.connect(self.rebuild)
+        self.weightingSelection = QComboBox()
+        self.weightingSelection.addItems(['Type frequency', 'Token frequency'])
+        self.weightingSelection.currentIndexChanged.connect(self.rebuild)
+        optionLayout.addWidget(self.confighandSelection)
+        optionLayout.addWidget(self.weightingSelection)
+        layout.addLayout(optionLayout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(['Contrast', 'Ending corpus size', 'Ending entropy',
+                                              'Change in entropy'])
+        layout.addWidget(self.table)
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+        self.setLayout(layout)
+
+        self.setCorpus(corpus)
+
+    def setCorpus(self, corpus, rebuild=True):
+        """
+        :param rebuild: False if the corpus has the same signs as the one already counted, as when it has just been
+        saved and read back, so that the counts can be kept
+        """
+        self.corpus = corpus
+        if rebuild:
+            self.rebuild()
+
+    def rebuild(self):
+        weighting = TOKEN_WEIGHTING if self.weightingSelection.currentIndex() == 1 else TYPE_WEIGHTING
+        signs = self.corpus if self.corpus is not None else None
+        self.tracker = FunctionalLoadTracker(predefined_contrasts(), self.confighandSelection.currentText(),
+                                             weighting, signs)
+        self.refresh()
+
+    def signSaved(self, oldSign, newSign):
+        """
+        :param oldSign: the sign that was replaced, or None if this is a new gloss
+        """
+        if oldSign is not None:
+            self.tracker.remove(oldSign)
+        self.tracker.add(newSign)
+        self.refresh()
+
+    def signDeleted(self, sign):
+        self.tracker.remove(sign)
+        self.refresh()
+
+    def refresh(self):
+        results = self.tracker.results()
+        self.table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            for column, value in enumerate([result.contrast, result.endingSize, result.endingEntropy,
+                                            result.change]):
+                self.table.setItem(row, column, QTableWidgetItem(str(value)))
+        self.summary.setText('{} distinct transcriptions, entropy {:.4f}'.format(len(self.tracker.tables[0]),
+                                                                                self.tracker.entropy(0)))
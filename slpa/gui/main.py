@@ -8,6 +8,10 @@ from datetime import date
 from xml.etree import ElementTree as xmlElementTree
 from lexicon import *
 from binary import *
+from corpusmerge import plan_merge, apply_merge, KEEP_CURRENT, OVERWRITE, KEEP_BOTH
+from corpusio import (import_tsv, first_parameters, export_tsv, format_sign, import_arrow, export_arrow,
+                      arrow_available, import_jsonl, export_jsonl, count_lines, export_delta, watermark_path,
+                      validate_tsv)
 from gui.transcriptions import *
 from gui.constraintwidgets import *
 from gui.notes import NotesDialog, CoderDialog
@@ -22,6 +26,7 @@ from gui.handshape_search import HandshapeSearchDialog
 from gui.phonological_search import ExtendedFingerSearchDialog
 from gui.results_windows import ResultsWindow, SearchResultsWindow
 from gui.helperwidgets import PredefinedHandshapeDialog
+from gui.function_windows import runWithProgress
 import __init__
 from pprint import pprint
 from gui.location_definer import LocationDefinerDialog
@@ -265,14 +270,22 @@ class CorpusList(QListWidget):
 
 
 class MergeCorpusMessageBox(QMessageBox):
-    def __init__(self):
+    def __init__(self, plan):
         super().__init__()
-        self.setWindowTitle('Duplicate entry')
-        self.baseText = 'Your current corpus already has a sign called {}.\n\nWhat do you want to do?'
-        self.addButton('Keep the current sign', QMessageBox.AcceptRole)
-        self.addButton('Overwrite with the new sign', QMessageBox.ResetRole)
-        self.alwaysMergeCheckBox = QCheckBox('Do this for all future duplicates')
-        self.setCheckBox(self.alwaysMergeCheckBox)
+        self.setWindowTitle('Duplicate entries')
+        self.setText('The corpus you are merging has {}.\n\n'
+                     'What do you want to do with the conflicting signs?'.format(plan.summary()))
+        self.setDetailedText('\n'.join(sign.gloss for sign in plan.conflicts))
+        self.policies = dict()
+        for text, policy in [('Keep the current signs', KEEP_CURRENT),
+                             ('Overwrite with the new signs', OVERWRITE),
+                             ('Keep both', KEEP_BOTH)]:
+            button = self.addButton(text, QMessageBox.AcceptRole)
+            self.policies[button] = policy
+        self.addButton(QMessageBox.Cancel)
+
+    def policy(self):
+        return self.policies.get(self.clickedButton())
 
 
 class MainWindow(QMainWindow):
@@ -316,6 +329,7 @@ class MainWindow(QMainWindow):
 
         self.wrapper = QWidget()  # placeholder for central widget in QMainWindow
         self.corpus = None
+        self.functionalLoadDashboard = None
         self.globalLayout = QHBoxLayout()
 
         #Make video player
@@ -390,6 +404,11 @@ class MainWindow(QMainWindow):
         self.configTabs.widget(0).updateSignal.connect(self.updateLastUpdated)
         self.configTabs.widget(1).updateSignal.connect(self.updateLastUpdated)
         layout.addWidget(self.configTabs)
+        self.liveConstraints = LiveConstraintChecker({'config{}hand{}'.format(j, k):
+                                                      getattr(self.configTabs.widget(j-1),
+                                                              'hand{}Transcription'.format(k))
+                                                      for j in [1, 2] for k in [1, 2]},
+                                                     self.constraints, enabled=self.liveConstraintChecking)
 
         #Add "global" handshape options (as checkboxes)
         additionalOptionLayout = QHBoxLayout()
@@ -449,7 +468,7 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(mainScroll)
 
         self.parameterDialog = None
-        self.setupParameterDialog(ParameterTreeModel(parameters.defaultParameters))
+        self.setupParameterDialog(parameters.sharedDefaultParameters)
         self.initCorpusNotes()
         #self.initSignNotes()
         self.makeCorpusDock()
@@ -513,7 +532,9 @@ class MainWindow(QMainWindow):
         if alert.buttonRole(alert.clickedButton()) == QMessageBox.NoRole:
             return
         else:
-            del self.corpus.wordlist[gloss]
+            word = self.corpus.removeWord(gloss)
+            if self.functionalLoadDashboard is not None:
+                self.functionalLoadDashboard.signDeleted(word)
             for n in range(self.corpusList.count()):
                 item = self.corpusList.item(n)
                 if item.text() == gloss:
@@ -539,20 +560,13 @@ class MainWindow(QMainWindow):
     def checkForearm(self):
         self.forearmChecked.emit(self.forearmCheckBox.isChecked())
 
-    def setupParameterDialog(self, model):
-        currentGloss = self.currentGloss()
-        # if self.corpus is not None and currentGloss:
-        #     model = self.corpus[currentGloss].parameters
-        # else:
-        #     model = ParameterTreeModel(parameters.defaultParameters)
-
+    def setupParameterDialog(self, parameterList):
+        #the dialog and its model are only built once, and show each sign by changing the items that differ
         if self.parameterDialog is None:
-            self.parameterDialog = ParameterDialog(model)
+            self.parameterDialog = ParameterDialog(ParameterTreeModel(parameterList))
             #self.parameterDialog.reset()
         else:
-            self.parameterDialog.close()
-            self.parameterDialog.deleteLater()
-            self.parameterDialog = ParameterDialog(model, checkStrategy='load')
+            self.parameterDialog.loadParameters(parameterList)
 
     def currentHandShape(self):
         kwargs = self.generateKwargs()
@@ -675,6 +689,7 @@ class MainWindow(QMainWindow):
         self.settings.setValue('defaultCoderName', self.coder)
         self.settings.setValue('askAboutDuplicates', self.askAboutDuplicatesAct.isChecked())
         self.settings.setValue('showSaveAlert', self.alertOnCorpusSaveAct.isChecked())
+        self.settings.setValue('liveConstraintChecking', self.liveConstraintsAct.isChecked())
         self.settings.setValue('parametersAlwaysOnTop', self.keepParametersOnTopAct.isChecked())
         self.settings.setValue('restrictedTranscriptions', self.setRestrictionsAct.isChecked())
         self.settings.setValue('autoSave', self.autoSaveAct.isChecked())
@@ -715,6 +730,8 @@ class MainWindow(QMainWindow):
         self.askAboutDuplicatesAct.setChecked(self.showDuplicateWarning)
         self.showSaveAlert = self.settings.value('showSaveAlert', defaultValue=True, type=bool)
         self.alertOnCorpusSaveAct.setChecked(self.showSaveAlert)
+        self.liveConstraintChecking = self.settings.value('liveConstraintChecking', defaultValue=False, type=bool)
+        self.liveConstraintsAct.setChecked(self.liveConstraintChecking)
         self.parametersAlwaysOnTop = self.settings.value('parametersAlwaysOnTop', defaultValue=True, type=bool)
         self.keepParametersOnTopAct.setChecked(self.parametersAlwaysOnTop)
         self.restrictedTranscriptions = self.settings.value('restrictedTranscriptions', type=bool)
@@ -754,7 +771,7 @@ class MainWindow(QMainWindow):
             newCorpus.addWord(word)
         newCorpus.path = path
         save_binary(newCorpus, newCorpus.path)
-        self.corpus = load_binary(newCorpus.path)
+        self.reloadCorpus(newCorpus.path)
 
     def checkForFlags(self):
         for word in self.corpus:
@@ -825,7 +842,17 @@ class MainWindow(QMainWindow):
                 word.parameters = newTree
 
         save_binary(self.corpus, self.corpus.path)
-        self.corpus = load_binary(self.corpus.path)
+        self.reloadCorpus(self.corpus.path, changed=True)
+
+    def reloadCorpus(self, path, changed=False):
+        """
+        Read a corpus back after saving it, so that self.corpus is what is on disk, and give the functional load
+        dashboard the new object, since it would otherwise go on using the old one
+        :param changed: True if the signs were changed on the way, so that the dashboard has to count them again
+        """
+        self.corpus = load_binary(path)
+        if self.functionalLoadDashboard is not None:
+            self.functionalLoadDashboard.setCorpus(self.corpus, rebuild=changed)
 
     def getOrCreateCorpusPath(self):
         if os.path.exists(self.corpus.path):
@@ -865,6 +892,25 @@ class MainWindow(QMainWindow):
                     violationLabel.setToolTip('\n'.join(tip))
         return
 
+    def checkCorpus(self):
+        if not self.corpus:
+            alert = QMessageBox()
+            alert.setWindowTitle('No corpus')
+            alert.setText('You have not yet loaded a corpus, so there is nothing to check.')
+            alert.exec_()
+            return
+
+        if not any(self.constraints.values()):
+            alert = QMessageBox()
+            alert.setWindowTitle('No constraints')
+            alert.setText('No constraints have been selected. To set constraints, go to the Constraints menu.')
+            alert.exec_()
+            return
+
+        report = check_corpus(self.corpus, self.constraints)
+        dialog = CorpusConstraintReport(report)
+        dialog.exec_()
+
     def launchBlender(self):
         transcriptions = self.getTranscriptions()
         dialog = TranscriptionSelectDialog(transcriptions, mode='blender')
@@ -1020,6 +1066,8 @@ class MainWindow(QMainWindow):
         self.corpusNotes.setText(self.corpus.notes)
 
         self.transcriptionInfo.signNoteText.setText(self.currentHandShape().notes)
+        if self.functionalLoadDashboard is not None:
+            self.functionalLoadDashboard.setCorpus(self.corpus)
 
         #self.signNotes.setText(self.currentHandShape().notes)
         #save_binary(self.corpus, self.corpus.path)
@@ -1039,7 +1087,7 @@ class MainWindow(QMainWindow):
             self.corpus.path = path
             self.corpus.name = os.path.split(path)[1].split('.')[0]
             save_binary(self.corpus, path)
-            self.corpus = load_binary(path)
+            self.reloadCorpus(path)
 
     @decorators.checkForGloss
     #@decorators.checkForCorpus
@@ -1095,7 +1143,7 @@ class MainWindow(QMainWindow):
 
         self.updateCorpus(kwargs, isDuplicate)
         save_binary(self.corpus, self.corpus.path)
-        self.corpus = load_binary(self.corpus.path)
+        self.reloadCorpus(self.corpus.path)
         if self.showSaveAlert:
             QMessageBox.information(self, 'Success', 'Corpus successfully updated!')
         self.askSaveChanges = False
@@ -1103,7 +1151,10 @@ class MainWindow(QMainWindow):
 
     def updateCorpus(self, kwargs, isDuplicate=False):
         sign = Sign(kwargs)
+        oldSign = self.corpus.wordlist.get(sign.gloss)
         self.corpus.addWord(sign)
+        if self.functionalLoadDashboard is not None:
+            self.functionalLoadDashboard.signSaved(oldSign, sign)
         self.corpus.corpusNotes = kwargs['corpusNotes']
         if not isDuplicate:
             self.corpusList.addItem(kwargs['gloss'])
@@ -1115,6 +1166,8 @@ class MainWindow(QMainWindow):
 
     def newCorpus(self):
         self.corpus = None
+        if self.functionalLoadDashboard is not None:
+            self.functionalLoadDashboard.setCorpus(None)
         self.newGloss()
         self.corpusList.clear()
         self.askSaveChanges = False
@@ -1162,8 +1215,7 @@ class MainWindow(QMainWindow):
                     slot.setText('' if text == '_' else text)
                     slot.updateFlags(sign.flags[name][slot.num - 1])
 
-        model = ParameterTreeModel(sign.parameters)
-        self.setupParameterDialog(model)
+        self.setupParameterDialog(sign.parameters)
         for option in GLOBAL_OPTIONS:
             name = option+'CheckBox'
             widget = getattr(self, name)
@@ -1177,6 +1229,8 @@ class MainWindow(QMainWindow):
                 setattr(sign, option, False)
             widget.setChecked(sign[option])
 
+        #clearAll wiped the violation labels, so they are redrawn for the new sign
+        self.liveConstraints.checkAll()
         self.askSaveChanges = False
         #self.showMaximized()
 
@@ -1232,9 +1286,15 @@ class MainWindow(QMainWindow):
             return 
         dialog = FunctionalLoadDialog(self.corpus)
         dialog.exec_()
-        resultsTable = FunctionalLoadResultsTable(dialog.results)
+        resultsTable = FunctionalLoadResultsTable(dialog.results, dialog.matrices, dialog.intervals)
         resultsTable.exec_()
 
+    def showFunctionalLoadDashboard(self):
+        if self.functionalLoadDashboard is None:
+            self.functionalLoadDashboard = FunctionalLoadDashboard(self.corpus, parent=self)
+        self.functionalLoadDashboard.show()
+        self.functionalLoadDashboard.raise_()
+
     def createMenus(self):
         self.fileMenu = self.menuBar().addMenu('&File')
         self.fileMenu.addAction(self.newCorpusAct)
@@ -1244,7 +1304,12 @@ class MainWindow(QMainWindow):
         self.fileMenu.addAction(self.saveCorpusAsAct)
         self.fileMenu.addAction(self.newGlossAct)
         self.fileMenu.addAction(self.exportCorpusAct)
+        self.fileMenu.addAction(self.exportDeltaAct)
+        self.fileMenu.addAction(self.exportArrowAct)
+        self.fileMenu.addAction(self.exportJsonAct)
         self.fileMenu.addAction(self.importCorpusAct)
+        self.fileMenu.addAction(self.importArrowAct)
+        self.fileMenu.addAction(self.importJsonAct)
         self.fileMenu.addAction(self.quitAct)
         self.fileMenu.addAction(self.switchAct)
 
@@ -1256,6 +1321,8 @@ class MainWindow(QMainWindow):
 
         self.constraintsMenu = self.menuBar().addMenu('&Constraints')
         self.constraintsMenu.addAction(self.setConstraintsAct)
+        self.constraintsMenu.addAction(self.checkCorpusAct)
+        self.constraintsMenu.addAction(self.liveConstraintsAct)
 
         self.settingsMenu = self.menuBar().addMenu('&Options')
         self.settingsMenu.addAction(self.autoSaveAct)
@@ -1268,6 +1335,7 @@ class MainWindow(QMainWindow):
         self.transcriptionMenu.addAction(self.changeTranscriptionFlagsAct)
         self.transcriptionMenu.addAction(self.setBlenderPathAct)
         self.transcriptionMenu.addAction(self.openLocationDefinerAct)
+        self.transcriptionMenu.addAction(self.functionalLoadDashboardAct)
 
         self.notesMenu = self.menuBar().addMenu('&Notes')
         self.notesMenu.addAction(self.addCorpusNotesAct)
@@ -1316,6 +1384,12 @@ class MainWindow(QMainWindow):
 
     def resetSettings(self):
         self.readSettings(reset = True)
+        self.liveConstraints.setConstraints(self.constraints)
+        self.liveConstraints.setEnabled(self.liveConstraintChecking)
+
+    def setLiveConstraintChecking(self):
+        self.liveConstraintChecking = self.liveConstraintsAct.isChecked()
+        self.liveConstraints.setEnabled(self.liveConstraintChecking)
 
     def askAboutDuplicates(self):
         if self.askAboutDuplicatesAct.isChecked():
@@ -1389,9 +1463,14 @@ class MainWindow(QMainWindow):
                 self.loadHandShape(dialog.searchWord)
                 return
             else:
-                matches = False
-
-        if matches:
+                #no exact match, so offer glosses that contain the search word or are spelled similarly
+                glossIndex = self.corpus.glossIndex
+                glosses = glossIndex.substring(dialog.searchWord)
+                found = set(glosses)
+                glosses.extend(g for g in glossIndex.fuzzy(dialog.searchWord) if g not in found)
+                matches = [self.corpus[g] for g in glosses]
+
+        if matches and searchType != 'gloss':
             remove = list()
             attrs = GLOBAL_OPTIONS
             for i,match in enumerate(matches):
@@ -1399,7 +1478,7 @@ class MainWindow(QMainWindow):
                     remove.append(i)
             matches = [matches[i] for i in range(len(matches)) if not i in remove]
 
-
+        if matches:
             resultsDialog = SearchResultsDialog(matches)
             resultsDialog.exec_()
             if resultsDialog.result:
@@ -1506,14 +1585,22 @@ class MainWindow(QMainWindow):
 
         if dialog.filename:
             corpus2 = load_binary(dialog.filename)
-            for sign in corpus2:
-                if sign.gloss in self.corpus:
-                    alert = MergeCorpusMessageBox()
-                    alert.setText(alert.baseText.format(sign.gloss))
-                    alert.exec_()
-                else:
-                    self.corpus.addWord(sign)
+            plan = plan_merge(self.corpus, corpus2)
+            policy = KEEP_CURRENT
+            if plan.conflicts:
+                alert = MergeCorpusMessageBox(plan)
+                alert.exec_()
+                policy = alert.policy()
+                if policy is None:
+                    return
+            report = apply_merge(self.corpus, plan, policy)
             save_binary(self.corpus, self.corpus.path)
+            alert = QMessageBox()
+            alert.setWindowTitle('Merge complete')
+            alert.setText(report.summary())
+            if report.conflicts:
+                alert.setDetailedText(report.conflictText())
+            alert.exec_()
             currentGloss = self.currentGloss()
             self.setupNewCorpus()
 
@@ -1535,6 +1622,10 @@ class MainWindow(QMainWindow):
         #                           self,
         #                           triggered = self.funcLoad)
 
+        self.functionalLoadDashboardAct = QAction('Show functional load dashboard...',
+                                                  self,
+                                                  triggered=self.showFunctionalLoadDashboard)
+
         self.copyAct = QAction('&Copy a transcription...',
                                self,
                                triggered=self.copyTranscription)
@@ -1576,6 +1667,16 @@ class MainWindow(QMainWindow):
                                        statusTip='Import from tsv file',
                                        triggered=self.importCorpus)
 
+        self.importArrowAct = QAction('Import corpus from Parquet or Arrow...',
+                                      self,
+                                      statusTip='Import from a file made by Export corpus as Parquet or Arrow',
+                                      triggered=self.importArrowCorpus)
+
+        self.importJsonAct = QAction('Import corpus from JSON Lines...',
+                                     self,
+                                     statusTip='Import from a file with one sign per line in JSON',
+                                     triggered=self.importJsonCorpus)
+
         self.setBlenderPathAct = QAction('Set path to Blender...',
                                          self,
                                          statusTip='Set path to Blender',
@@ -1654,6 +1755,21 @@ class MainWindow(QMainWindow):
                                        statusTip='Save corpus as tsv for opening as a spreadsheet',
                                        triggered=self.exportCorpus)
 
+        self.exportArrowAct = QAction('Export corpus as Parquet or Arrow...',
+                                      self,
+                                      statusTip='Save corpus in a columnar file for analysis in pandas or R',
+                                      triggered=self.exportArrowCorpus)
+
+        self.exportDeltaAct = QAction('Export changes since last export...',
+                                      self,
+                                      statusTip='Save only the signs added, changed or deleted since an earlier tsv export',
+                                      triggered=self.exportDelta)
+
+        self.exportJsonAct = QAction('Export corpus as JSON Lines...',
+                                     self,
+                                     statusTip='Save corpus with one sign per line in JSON, for use with other tools',
+                                     triggered=self.exportJsonCorpus)
+
         self.setRestrictionsAct = QAction('Allow &unrestricted transcriptions',
                                           self,
                                           statusTip='If on, anything can be entered into transcriptions',
@@ -1663,6 +1779,15 @@ class MainWindow(QMainWindow):
                                          self,
                                          statusTip='Select (violable) constraints on transcriptions',
                                          triggered=self.setConstraints)
+        self.liveConstraintsAct = QAction('Check constraints while &typing',
+                                          self,
+                                          statusTip='Mark constraint violations as soon as a slot is changed',
+                                          checkable=True,
+                                          triggered=self.setLiveConstraintChecking)
+        self.checkCorpusAct = QAction('Check &corpus against constraints...',
+                                      self,
+                                      statusTip='Check every sign in the corpus against the selected constraints',
+                                      triggered=self.checkCorpus)
         self.addCorpusNotesAct = QAction('Edit &corpus notes...',
                                          self,
                                          statusTip='Open a notepad for information about the corpus',
@@ -1790,6 +1915,7 @@ class MainWindow(QMainWindow):
         if constraints:
             for c in MasterConstraintList:
                 self.constraints[c[0]] = getattr(dialog, c[0]).isChecked()
+            self.liveConstraints.setConstraints(self.constraints)
 
     def setTranscriptionRestrictions(self):
         restricted = self.setRestrictionsAct.isChecked()
@@ -1822,106 +1948,120 @@ class MainWindow(QMainWindow):
                 kwargs['x_in_box'] = x_in_box
             if null:
                 kwargs['null'] = null
-            #output = [word.export(**kwargs) for word in self.corpus]
-            try:
-                with open(path, encoding='utf-8', mode='w') as f:
-                    print(Sign.headers, file=f)
-                    for sign in self.corpus:
-                        kwargs['sign'] = sign
-                        output = self.getSignDataForExport(**kwargs)
-                        print(output, file=f)
-                if self.showSaveAlert:
-                    QMessageBox.information(self, 'Success', 'Corpus successfully exported!')
-            except PermissionError:
+            #formatting is sent to worker processes for very large corpora
+            processes = None if len(self.corpus) > 50000 else 1
+            #the watermark lets Export changes since last export write only what changed after this
+            worker = runWithProgress(self, 'Exporting {}...'.format(os.path.split(path)[-1]), export_tsv,
+                                     self.corpus, path, processes=processes, watermark=True, **kwargs)
+            if isinstance(worker.error, PermissionError):
                 filename = os.path.split(path)[-1]
                 alert = QMessageBox()
                 alert.setWindowTitle('Error encountered')
                 alert.setText('The file {} is already open in a program on your computer. Please close the file before '
                               'saving, or else choose a different file name.'.format(filename))
                 alert.exec_()
+            elif worker.error is not None:
+                alert = QMessageBox()
+                alert.setWindowTitle('Error encountered')
+                alert.setText('The corpus could not be exported:\n{}'.format(worker.error))
+                alert.exec_()
+            elif worker.result and self.showSaveAlert:
+                QMessageBox.information(self, 'Success', 'Corpus successfully exported!')
 
-    @classmethod
-    def getSignDataForExport(self, sign=None, include_fields=False, blank_space='_', x_in_box=X_IN_BOX, null=NULL,
-                             parameter_format='xml'):
+    def exportDelta(self):
+        if not self.corpus:
+            alert = QMessageBox()
+            alert.setWindowTitle('No corpus')
+            alert.setText('You must save the current word to a corpus before you can export it.')
+            alert.exec_()
+            return
 
-        def add_fields(transcription):
-            transcription = '[{}]1[{}]2[{}]3[{}]4[{}]5[{}]6[{}]7'.format(transcription[0],
-                                                                         ''.join(transcription[1:5]),
-                                                                         ''.join(transcription[5:15]),
-                                                                         ''.join(transcription[15:19]),
-                                                                         ''.join(transcription[19:24]),
-                                                                         ''.join(transcription[24:29]),
-                                                                         ''.join(transcription[29:34]))
-            return transcription
-
-        output = list()
-        output.append(sign.gloss)
-        for config_num in [1, 2]:
-            for hand_num in [1, 2]:
-                hand = getattr(sign, 'config{}hand{}'.format(config_num, hand_num))
-                if hand[0] == '_' or not hand[0]:
-                    hand[0] = blank_space
-                else:
-                    hand[0] = 'V'
-                transcription = [x if x else blank_space for x in hand]
-                transcription[7] = null
-                if transcription[19] == X_IN_BOX:
-                    transcription[19] = x_in_box
-                if transcription[24] == X_IN_BOX:
-                    transcription[24] = x_in_box
-                if transcription[29] == X_IN_BOX:
-                    transcription[29] = x_in_box
-                if include_fields:
-                    transcription = add_fields(transcription)
-                output.append(''.join(transcription))
-
-        for config_num in [1, 2]:
-            for hand_num in [1, 2]:
-                slot_list = getattr(sign, 'config{}hand{}'.format(config_num, hand_num))
-                for slot_num in range(34):
-                    symbol = slot_list[slot_num]
-                    if symbol == X_IN_BOX:
-                        symbol = x_in_box
-                    if symbol == NULL:
-                        symbol = null
-                    output.append(symbol)
-
-                uncertain, estimates = list(), list()
-                key_name = 'config{}hand{}'.format(config_num, hand_num)
-                for i, flag in enumerate(sign.flags[key_name]):
-                    if flag.isUncertain:
-                        uncertain.append(str(i + 1))
-                    if flag.isEstimate:
-                        estimates.append(str(i + 1))
-                uncertain = 'None' if not uncertain else '-'.join(uncertain)
-                estimates = 'None' if not estimates else '-'.join(estimates)
-                output.append(uncertain)
-                output.append(estimates)
-
-        output.append(str(sign.frequency))
-        output.append(sign.coder)
-        output.append(str(sign.lastUpdated))
+        basePath = QFileDialog.getOpenFileName(self, 'Choose Earlier Export', self.previousFolderPath, '*.tsv')[0]
+        if not basePath:
+            return
+        if not os.path.exists(watermark_path(basePath)):
+            alert = QMessageBox()
+            alert.setWindowTitle('No watermark')
+            alert.setText('There is no record of what {} contained, so the changes since then cannot be found. '
+                          'Export the whole corpus again with Export corpus as tsv, and later exports can contain '
+                          'only the changes.'.format(os.path.split(basePath)[-1]))
+            alert.exec_()
+            return
 
-        for option in GLOBAL_OPTIONS:
-            output.append('True' if getattr(sign, option) else 'False')
+        path = QFileDialog.getSaveFileName(self, 'Export Changes', os.path.splitext(basePath)[0]+'-changes',
+                                           '*.tsv')[0]
+        if not path:
+            return
+        worker = runWithProgress(self, 'Exporting {}...'.format(os.path.split(path)[-1]), export_delta,
+                                 self.corpus, path, basePath)
+        if worker.error is not None:
+            alert = QMessageBox()
+            alert.setWindowTitle('Error encountered')
+            alert.setText('The changes could not be exported:\n{}'.format(worker.error))
+            alert.exec_()
+        elif worker.result is not None and self.showSaveAlert:
+            delta = worker.result
+            QMessageBox.information(self, 'Success', 'Exported {} added, {} changed and {} deleted signs.'.format(
+                len(delta.added), len(delta.changed), len(delta.deleted)))
 
-        for option in FINGERSPELL_OPTIONS:
-            output.append('True' if getattr(sign, option) else 'False')
+    def exportArrowCorpus(self):
+        if self.checkArrowAvailable():
+            self.exportCorpusFile('Parquet (*.parquet);;Arrow (*.arrow *.feather)', export_arrow)
 
-        notes = ''.join([n.replace('\n', '  ').replace('\t', '    ') for n in sign.notes])
-        output.append(notes)
-        if parameter_format == 'xml':
-            outputParameters = parameters.exportXML(sign.parameters)
-        elif parameter_format == 'txt':
-            outputParameters = parameters.exportTree(sign.parameters)
-        elif parameter_format == 'none':
-            outputParameters = ' '
-        output.append(outputParameters)
-        output = '\t'.join(output)
+    def exportJsonCorpus(self):
+        self.exportCorpusFile('JSON Lines (*.jsonl)', export_jsonl)
 
-        return output
+    def exportCorpusFile(self, fileFilter, exportFunction):
+        if not self.corpus:
+            alert = QMessageBox()
+            alert.setWindowTitle('No corpus')
+            alert.setText('You must save the current word to a corpus before you can export it.')
+            alert.exec_()
+            return
+
+        path = QFileDialog.getSaveFileName(self, 'Export Corpus', self.corpus.name, fileFilter)[0]
+        if not path:
+            return
+        worker = runWithProgress(self, 'Exporting {}...'.format(os.path.split(path)[-1]), exportFunction,
+                                 self.corpus, path)
+        if worker.error is not None:
+            alert = QMessageBox()
+            alert.setWindowTitle('Error encountered')
+            alert.setText('The corpus could not be exported:\n{}'.format(worker.error))
+            alert.exec_()
+        elif worker.result and self.showSaveAlert:
+            QMessageBox.information(self, 'Success', 'Corpus successfully exported!')
+
+    def checkArrowAvailable(self):
+        if arrow_available():
+            return True
+        alert = QMessageBox()
+        alert.setWindowTitle('Missing package')
+        alert.setText('Parquet and Arrow files need the pyarrow package. You can install it with\n'
+                      'pip install pyarrow\nand then restart SLP-Annotator.')
+        alert.exec_()
+        return False
+
+    @classmethod
+    def getSignDataForExport(self, sign=None, include_fields=False, blank_space='_', x_in_box=X_IN_BOX, null=NULL,
+                             parameter_format='xml'):
+        return format_sign(sign, include_fields=include_fields, blank_space=blank_space, x_in_box=x_in_box,
+                           null=null, parameter_format=parameter_format)
 
     def importCorpus(self):
+        self.importCorpusFile('tsv')
+
+    def importArrowCorpus(self):
+        if self.checkArrowAvailable():
+            self.importCorpusFile('arrow')
+
+    def importJsonCorpus(self):
+        self.importCorpusFile('jsonl')
+
+    def importCorpusFile(self, fileType='tsv'):
+        """
+        :param fileType: 'tsv', 'arrow' (Parquet or Arrow) or 'jsonl'
+        """
         if self.corpus is not None:
             alert = QMessageBox()
             alert.setWindowTitle('Warning')
@@ -1932,12 +2072,17 @@ class MainWindow(QMainWindow):
             alert.exec_()
             if alert.buttonRole(alert.clickedButton()) == QMessageBox.NoRole:
                 return
-        filepath = QFileDialog.getOpenFileName(self, 'Import Corpus from TSV', self.previousFolderPath, '*.tsv')
+        caption, fileFilter = {'tsv': ('Import Corpus from TSV', '*.tsv'),
+                               'arrow': ('Import Corpus from Parquet or Arrow', '*.parquet *.arrow *.feather'),
+                               'jsonl': ('Import Corpus from JSON Lines', '*.jsonl')}[fileType]
+        filepath = QFileDialog.getOpenFileName(self, caption, self.previousFolderPath, fileFilter)
         filepath = filepath[0]
         if not filepath:
             return
         self.previousFolderPath = filepath
+        path = filepath
         filepath, filename = os.path.split(filepath)
+        extension = os.path.splitext(filename)[1]
         filename = filename.split('.')[0]
 
         corpora = [f for f in os.listdir(filepath) if f.endswith('.corpus')]
@@ -1956,7 +2101,7 @@ class MainWindow(QMainWindow):
                           'SLPAnnotator by selecting File > Save as...\n\n'
                           'What do you want to do?'.format(filename, filename))
 
-            alert.addButton('Import TSV file', QMessageBox.AcceptRole)
+            alert.addButton('Import file', QMessageBox.AcceptRole)
             alert.addButton('Cancel', QMessageBox.RejectRole)
             alert.exec_()
             if alert.buttonRole(alert.clickedButton()) == QMessageBox.RejectRole:
@@ -1967,72 +2112,93 @@ class MainWindow(QMainWindow):
         else:
             corpus = Corpus({'name': filename, 'path':os.path.join(filepath, filename+'.corpus')})
 
-        with open(os.path.join(filepath, filename+'.tsv'), mode='r', encoding='utf-8') as f:
-            headers = f.readline().strip()
-            headers = headers.split('\t')
-            #print('headers', headers)
-            start = f.tell()
-            #print('start', start)
-            firstline = f.readline()
-            #print('firstline', firstline)
-            params = firstline.split('\t')[-1].strip()
-            verfied, useDefaultParameters = self.verifyParametersForImport(params)
+        #the parameters of each sign are checked as it is read, except in TSV files
+        if fileType == 'arrow':
+            worker = runWithProgress(self, 'Importing {}...'.format(filename+extension), import_arrow, path, corpus)
+        elif fileType == 'jsonl':
+            processes = None if count_lines(path) > 50000 else 1
+            worker = runWithProgress(self, 'Importing {}...'.format(filename+extension), import_jsonl, path, corpus,
+                                     processes=processes)
+        else:
+            verfied, useDefaultParameters = self.verifyParametersForImport(first_parameters(path))
             if not verfied:
                 return
-            f.seek(start)
-
-            for line in f:
-                line = line.strip()
-                line = line.split('\t')
-                data = {h: l for h, l in zip(headers, line)}
-                kwargs = dict()
-                flags = dict()
-                transcriptions = [[[None for n in range(34)], [None for n in range(34)]],
-                                  [[None for n in range(34)], [None for n in range(34)]]]
-                for config in [1, 2]:
-                    for hand in [1, 2]:
-                        for n in range(1,35):
-                            name = 'config{}hand{}slot{}'.format(config, hand, n)
-                            transcriptions[config-1][hand-1][n-1] = data[name]
-
-                        uncertain = data['config{}hand{}uncertain'.format(config, hand)]
-                        if uncertain == 'None':
-                            uncertain = list()
-                        else:
-                            uncertain = [int(n) for n in uncertain.split('-')]
-
-                        estimated = data['config{}hand{}estimated'.format(config, hand)]
-                        if estimated == 'None':
-                            estimated = list()
-                        else:
-                            estimated = [int(n) for n in estimated.split('-')]
-
-                        confighand = 'config{}hand{}'.format(config, hand)
-                        flags[confighand] = [Flag(True if n in uncertain else False, True if n in estimated else False)
-                                             for n in range(34)]
-                kwargs['config1'] = transcriptions[0]
-                kwargs['config2'] = transcriptions[1]
-                kwargs['flags'] = flags
-                kwargs['gloss'] = data['gloss']
-                for option in GLOBAL_OPTIONS:  #GLOBAL_OPTIONS = ['forearm', 'estimated', 'uncertain', 'incomplete']
-                    kwargs[option] = True if data[option] == 'True' else False
-                for option in FINGERSPELL_OPTIONS:
-                    kwargs[option] = True if data[option] == 'True' else False
-                if useDefaultParameters:
-                    model = ParameterTreeModel(parameters.defaultParameters)
-                else:
-                    model = ParameterTreeModel(data['parameters'], fromXML=True)
-                kwargs['_frequency'] = float(data['frequency'])
-                kwargs['_coder'] = data['coder']
-                year, month, day = tuple(data['date'].split(sep='-'))
-                kwargs['_lastUpdated'] = date(int(year), int(month), int(day))
-                kwargs['parameters'] = model.params
-                kwargs['signNotes'] = '' if data['notes'] == 'None' else data['notes']
-                sign = Sign(kwargs)
-                corpus.addWord(sign)
+            if not self.validateImport(path, filename+extension, useDefaultParameters):
+                return
+            worker = runWithProgress(self, 'Importing {}...'.format(filename+extension), import_tsv, path, corpus,
+                                     useDefaultParameters=useDefaultParameters)
+        if worker.error is not None:
+            alert = QMessageBox()
+            alert.setWindowTitle('Error encountered')
+            alert.setText('The file {} could not be imported:\n{}'.format(filename+extension, worker.error))
+            alert.exec_()
+            return
+
+        report = worker.result
+        if report.cancelled:
+            return
+
+        #problems in TSV files were already reported by validateImport
+        if report.errors and fileType != 'tsv':
+            alert = QMessageBox()
+            alert.setWindowTitle('Import problems')
+            alert.setText('{}\n\nThe first problem was on line {}: {}'.format(report.summary(),
+                                                                         report.errors[0].line,
+                                                                         report.errors[0].message))
+            alert.addButton('Save list of problems...', QMessageBox.AcceptRole)
+            alert.addButton('OK', QMessageBox.RejectRole)
+            alert.exec_()
+            if alert.buttonRole(alert.clickedButton()) == QMessageBox.AcceptRole:
+                errorPath = QFileDialog.getSaveFileName(self, 'Save Import Problems', filename+'-import-problems',
+                                                        '*.tsv')[0]
+                if errorPath:
+                    report.save(errorPath)
+
         self.corpus = corpus
         self.setupNewCorpus()
 
+    def validateImport(self, path, filename, useDefaultParameters):
+        """
+        Check every line of a TSV file before it is imported, and list the problems
+        :return: True if the import should go ahead
+        """
+        processes = None if os.path.getsize(path) > 100*1024*1024 else 1
+        worker = runWithProgress(self, 'Checking {}...'.format(filename), validate_tsv, path,
+                                 check_parameters=not useDefaultParameters, processes=processes)
+        if worker.error is not None:
+            alert = QMessageBox()
+            alert.setWindowTitle('Error encountered')
+            alert.setText('The file {} could not be checked:\n{}'.format(filename, worker.error))
+            alert.exec_()
+            return False
+
+        report = worker.result
+        if report.cancelled:
+            return False
+        if not report.errors and not report.warnings:
+            return True
+
+        problems = report.problems()
+        shown = '\n'.join('Line {}: {}{}'.format(problem.line, '' if kind == 'error' else '(warning) ',
+                                                  problem.message) for problem, kind in problems[:10])
+        if len(problems) > 10:
+            shown += '\n... and {} more'.format(len(problems)-10)
+        while True:
+            alert = QMessageBox()
+            alert.setWindowTitle('Problems in {}'.format(filename))
+            alert.setText('{}\n\n{}\n\nLines that cannot be imported will be skipped.'.format(report.summary(), shown))
+            alert.addButton('Import anyway', QMessageBox.AcceptRole)
+            alert.addButton('Save list of problems...', QMessageBox.ActionRole)
+            alert.addButton('Cancel', QMessageBox.RejectRole)
+            alert.exec_()
+            role = alert.buttonRole(alert.clickedButton())
+            if role != QMessageBox.ActionRole:
+                return role == QMessageBox.AcceptRole
+            errorPath = QFileDialog.getSaveFileName(self, 'Save Import Problems',
+                                                    os.path.splitext(filename)[0]+'-import-problems', '*.tsv')[0]
+            if errorPath:
+                report.save(errorPath)
+
     def verifyParametersForImport(self, parameters):
         message = None
         useDefaults = False
@@ -2089,11 +2255,12 @@ class MainWindow(QMainWindow):
         self.gloss.glossEdit.repaint()
         self.configTabs.widget(0).clearAll(clearFlags=clearFlags)
         self.configTabs.widget(1).clearAll(clearFlags=clearFlags)
+        self.liveConstraints.checkAll()
         self.configTabs.setCurrentIndex(0)
         self.transcriptionRestrictionsChanged.emit(self.restrictedTranscriptions)
 
         self.parameterDialog.accept()
-        self.setupParameterDialog(ParameterTreeModel(parameters.defaultParameters))
+        self.setupParameterDialog(parameters.sharedDefaultParameters)
         self.transcriptionInfo.clearSignNoteText()
         self.transcriptionInfo.changeCoderName(self.coder)
         #self.initSignNotes()
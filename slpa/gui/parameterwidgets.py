@@ -19,11 +19,10 @@ class ParameterDialog(QDialog):
         self.adjustedWidth = self.frameGeometry().width()
         self.adjustedPos = self.pos()
 
-        self.model = model
-        self.model.itemChanged.connect(self.updateDisplayTree)
-
+        self.loading = False
+        self.model = None
         self.treeView = ParameterTreeView()
-        self.treeView.setModel(self.model)
+        self.setModel(model)
         self.treeView.clicked.connect(self.updateDisplayTree)
 
         self.displayTree = anytree.Node('Selected Parameters', parent=None)
@@ -68,6 +67,26 @@ class ParameterDialog(QDialog):
         self.resize(self.adjustedHeight, self.adjustedWidth)
         self.move(self.adjustedPos)
 
+    def setModel(self, model):
+        if self.model is not None:
+            self.model.itemChanged.disconnect(self.updateDisplayTree)
+        self.model = model
+        self.model.itemChanged.connect(self.updateDisplayTree)
+        self.treeView.setModel(self.model)
+
+    def loadParameters(self, parameterList):
+        """
+        Show the parameters of another sign. The same model is kept and only the items that differ are changed,
+        unless the parameters do not fit parameterSchema, in which case they get a model of their own.
+        """
+        self.loading = True
+        try:
+            if not self.model.applyParameters(parameterList):
+                self.setModel(ParameterTreeModel(parameterList))
+        finally:
+            self.loading = False
+        self.updateDisplayTree()
+
     def saveParameters(self):
         def traverse(item):
             item.parameter.is_checked = item.checkState()
@@ -166,6 +185,9 @@ class ParameterDialog(QDialog):
         self.hide()
 
     def updateDisplayTree(self):
+        if self.loading:
+            #loadParameters updates the display once it has changed every item
+            return
         self.displayTree = anytree.Node('Selected Parameters', parent=None)
         self.buildDisplayTree(self.model.invisibleRootItem(), self.displayTree)
         self.generateDisplayTreeText()
@@ -188,6 +210,14 @@ class ParameterTreeModel(QStandardItemModel):
         else:
             if type(parameterList) != OldParameterTreeModel:
                 self.params = parameterList
+        selection = parameters.parameterSchema.selection(self.params)
+        if selection is not None:
+            #built from the schema, so that self.items are in the order of its node numbers (see applyParameters)
+            self.params = parameters.parameterSchema.sharedTree(selection)
+        #items edit their parameters in place, so a selection shared between signs is copied first
+        self.params = parameters.privateParameters(self.params)
+        self.numbered = selection is not None
+        self.items = list()
         self.buttonGroups = defaultdict(list)
         self.specialButtons = list()
         topItem = self.invisibleRootItem()
@@ -198,34 +228,29 @@ class ParameterTreeModel(QStandardItemModel):
         self.buttonGroups['Major Location'].extend(self.specialButtons)
 
     def parseXML(self, xmlstring):
-        topElement = xmlElementTree.fromstring(xmlstring)
-
-        for topChild in topElement:
-            p = parameters.getParameterFromXML(topChild)
-            p.parent = None
-            self.params.append(p)
-            if topChild.attrib['is_checked'] == 'True':
-                p.is_checked = True
-            for child in topChild:
-                self.addNodeFromXML(child, p)
-
-
-    def addNodeFromXML(self, element, parentParameter):
-        if list(element):
-            #this seems to be the best way to check if the element has children
-            #the .getchildren() method has been deprecated for a long time now
-            #and trying to access element._children attribute results in an unexplainable AttributeError
-            parameter = parameters.getParameterFromXML(element)
-            parentParameter.addChildren([parameter])
-            parameter.parent = parentParameter
-            for subelement in element:
-                self.addNodeFromXML(subelement, parameter)
-
-        else:
-            parameter = parameters.getParameterFromXML(element, terminal=True)
-            parentParameter.addChildren([parameter])
-            parameter.parent = parentParameter
+        self.params = parameters.parseXML(xmlstring)
+
+    def applyParameters(self, parameterList):
+        """
+        Show another list of parameters in this model, changing only the items that are checked differently or have
+        a different name. This is much quicker than building a new model for every sign.
+        :return: False if the model or the parameters do not fit parameterSchema, in which case nothing is changed
+        """
+        if not self.numbered:
+            return False
+        selection = parameters.parameterSchema.selection(parameterList)
+        if selection is None:
+            return False
 
+        tree = parameters.parameterSchema.sharedTree(selection)
+        for item, parameter in zip(self.items, parameters.walkParameters(tree)):
+            if item.isCheckable() and bool(item.checkState()) != parameter.is_checked:
+                item.setCheckState(parameter.is_checked)
+            item.parameter.is_checked = parameter.is_checked
+            if item.text() != parameter.name:
+                item.setText(parameter.name)
+            item.parameter.name = parameter.name
+        return True
 
     def handleItemChanged(self, item):
         if item.parent is None or not hasattr(item.parent, 'name'):
@@ -252,6 +277,7 @@ class ParameterTreeModel(QStandardItemModel):
 
     def addItem(self, parameter, parent):
         newItem = ParameterTreeItem(parameter, parent=parent)
+        self.items.append(newItem)
 
         if parameter.children:
             parent.appendRow(newItem)
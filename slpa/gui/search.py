@@ -542,6 +542,36 @@ class TranscriptionsSearchOptionsDialog(QDialog):
             self.wildcard = self.wildcardLineEdit.text()
         super().accept()
 
+class GlossCompleter(QCompleter):
+    """
+    Completer for gloss searches. Instead of loading every gloss in the corpus up front, the model is refilled
+    from the corpus gloss index each time the user types, with prefix matches first, then substring matches.
+    """
+    maxSuggestions = 50
+
+    def __init__(self, corpus, lineEditWidget):
+        super().__init__(lineEditWidget)
+        self.glossIndex = corpus.glossIndex
+        self.model = QStringListModel()
+        self.setModel(self.model)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        lineEditWidget.textEdited.connect(self.updateSuggestions)
+
+    def updateSuggestions(self, text):
+        if not text:
+            self.model.setStringList(list())
+            return
+        suggestions = self.glossIndex.prefix(text, limit=self.maxSuggestions)
+        if len(suggestions) < self.maxSuggestions:
+            for gloss in self.glossIndex.substring(text, limit=self.maxSuggestions):
+                if gloss not in suggestions:
+                    suggestions.append(gloss)
+                if len(suggestions) >= self.maxSuggestions:
+                    break
+        self.model.setStringList(suggestions)
+
+
 class GlossSearchDialog(QDialog):
 
     def __init__(self, corpus):
@@ -556,12 +586,7 @@ class GlossSearchDialog(QDialog):
         searchLayout.addWidget(searchLabel)
 
         self.searchEdit = QLineEdit()
-        completer = QCompleter()
-        model = QStringListModel()
-        model.setStringList([word.gloss for word in corpus])
-        completer.setModel(model)
-        completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self.searchEdit.setCompleter(completer)
+        self.searchEdit.setCompleter(GlossCompleter(corpus, self.searchEdit))
         searchLayout.addWidget(self.searchEdit)
 
         buttonLayout = QHBoxLayout()
@@ -492,7 +492,7 @@ class CoderSlot(QPushButton):
 
         self.menu = QMenu()
 
-        self.options = sorted(list({sign.coder for sign in self.corpus}))
+        self.options = sorted(self.corpus.statistics.coders)
 
         for option in self.options:
             if not option:
@@ -581,7 +581,7 @@ class LastUpdateSlot(QPushButton):
 
         self.menu = QMenu()
 
-        self.options = sorted(list({str(sign.lastUpdated) for sign in self.corpus}))
+        self.options = sorted(str(d) for d in self.corpus.statistics.dates)
 
         for option in self.options:
             if not option:
@@ -733,8 +733,9 @@ class TranscriptionSearchDialog(FunctionDialog):
         frequencyGroup.setFixedWidth(100)
         freqeuncyLayout = QVBoxLayout()
         frequencyGroup.setLayout(freqeuncyLayout)
-        self.minLineEdit = QLineEdit(str(self.corpus.getFrequencyRange()[0]))
-        self.maxLineEdit = QLineEdit(str(self.corpus.getFrequencyRange()[1]))
+        minFreq, maxFreq = self.corpus.getFrequencyRange()
+        self.minLineEdit = QLineEdit(str(minFreq))
+        self.maxLineEdit = QLineEdit(str(maxFreq))
         freqeuncyLayout.addWidget(QLabel('From:'))
         freqeuncyLayout.addWidget(self.minLineEdit)
         freqeuncyLayout.addWidget(QLabel('To:'))
@@ -1,17 +1,372 @@
 #from slpa import __version__ as currentSLPAversion
 import os
 import re
-from collections import OrderedDict
+from bisect import bisect_left, insort
+from collections import OrderedDict, Counter
 from random import choice
 from datetime import date
-from parameters import defaultParameters
+from parameters import defaultParameters, parameterSchema, ParameterSelection
 from gui.parameterwidgets import ParameterTreeModel
 from gui.transcriptions import Flag
-from constants import GLOBAL_OPTIONS, FINGERSPELL_OPTIONS
+from constants import GLOBAL_OPTIONS, FINGERSPELL_OPTIONS, EMPTY_CONFIG_HAND
+from binary import save_binary
 
 X_IN_BOX = '\u2327'
 NULL = '\u2205'
 
+#bit flags for Sign.classification
+ONE_HAND = 1
+ONE_CONFIG = 2
+SAME_HANDS = 4
+#(mask, value) pairs picking out each sign type
+SIGN_TYPE_BITS = {'one': (ONE_HAND, ONE_HAND),
+                  'two-same': (ONE_HAND|SAME_HANDS, SAME_HANDS),
+                  'two-diff': (ONE_HAND|SAME_HANDS, 0)}
+
+
+class GlossIndex:
+    """
+    Keeps the glosses of a corpus in sorted order, along with a case-folded lookup map.
+    The index is updated one gloss at a time by Corpus.addWord and Corpus.removeWord, so iterating over
+    the corpus never needs to re-sort the word list.
+
+    For gloss searching, the case-folded glosses are also kept in sorted order (for prefix searches) and, once the
+    first fuzzy search has been run, in a trigram index that also speeds up substring searches. The trigram index
+    is rebuilt on demand rather than saved with the corpus.
+    """
+
+    def __init__(self, glosses=None):
+        self.glosses = sorted(glosses) if glosses is not None else list()
+        self.folded = dict()
+        for gloss in self.glosses:
+            self.folded.setdefault(gloss.casefold(), list()).append(gloss)
+        self.keys = sorted(self.folded)
+        self._trigrams = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_trigrams'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if not hasattr(self, 'keys'):
+            self.keys = sorted(self.folded)
+        if not hasattr(self, '_trigrams'):
+            self._trigrams = None
+
+    def __len__(self):
+        return len(self.glosses)
+
+    def __iter__(self):
+        # iterate over a snapshot, so that words can be added or removed during the loop
+        return iter(self.glosses[:])
+
+    def __contains__(self, gloss):
+        return gloss.casefold() in self.folded
+
+    def add(self, gloss):
+        n = bisect_left(self.glosses, gloss)
+        if n < len(self.glosses) and self.glosses[n] == gloss:
+            return
+        self.glosses.insert(n, gloss)
+        key = gloss.casefold()
+        if key not in self.folded:
+            self.folded[key] = list()
+            insort(self.keys, key)
+            if self._trigrams is not None:
+                for trigram in trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(key)
+        insort(self.folded[key], gloss)
+
+    def remove(self, gloss):
+        n = bisect_left(self.glosses, gloss)
+        if n == len(self.glosses) or self.glosses[n] != gloss:
+            raise KeyError(gloss)
+        del self.glosses[n]
+        key = gloss.casefold()
+        matches = self.folded[key]
+        matches.remove(gloss)
+        if not matches:
+            del self.folded[key]
+            del self.keys[bisect_left(self.keys, key)]
+            if self._trigrams is not None:
+                for trigram in trigrams(key):
+                    self._trigrams[trigram].discard(key)
+                    if not self._trigrams[trigram]:
+                        del self._trigrams[trigram]
+
+    def lookup(self, text):
+        """
+        Find the gloss that matches text, ignoring case
+        :param text: a string
+        :return: the stored gloss, or None if there is no match. If several glosses differ only by case,
+        the first one in sorted order is returned.
+        """
+        try:
+            return self.folded[text.casefold()][0]
+        except KeyError:
+            return None
+
+    @property
+    def trigramIndex(self):
+        if self._trigrams is None:
+            self._trigrams = dict()
+            for key in self.keys:
+                for trigram in trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(key)
+        return self._trigrams
+
+    def expand(self, keys, limit=None):
+        output = list()
+        for key in keys:
+            output.extend(self.folded[key])
+            if limit is not None and len(output) >= limit:
+                return output[:limit]
+        return output
+
+    def prefix(self, text, limit=None):
+        """
+        Find all glosses that begin with text, ignoring case
+        :param text: a string
+        :param limit: the maximum number of glosses to return, or None for no limit
+        :return: a sorted list of glosses
+        """
+        text = text.casefold()
+        keys = list()
+        for n in range(bisect_left(self.keys, text), len(self.keys)):
+            key = self.keys[n]
+            if not key.startswith(text):
+                break
+            keys.append(key)
+            if limit is not None and len(keys) >= limit:
+                break
+        return self.expand(keys, limit)
+
+    def substring(self, text, limit=None):
+        """
+        Find all glosses that contain text anywhere, ignoring case
+        :param text: a string
+        :param limit: the maximum number of glosses to return, or None for no limit
+        :return: a sorted list of glosses
+        """
+        text = text.casefold()
+        if len(text) < 3 or self._trigrams is None:
+            #a plain scan is fast enough on its own, so don't hold up the caller to build the trigram index
+            keys = [key for key in self.keys if text in key]
+        else:
+            index = self.trigramIndex
+            candidates = None
+            for n in range(len(text)-2):
+                postings = index.get(text[n:n+3], set())
+                candidates = postings.copy() if candidates is None else candidates & postings
+                if not candidates:
+                    return list()
+            keys = sorted(key for key in candidates if text in key)
+        return self.expand(keys, limit)
+
+    def fuzzy(self, text, max_distance=2, limit=None):
+        """
+        Find all glosses within max_distance edits (insertions, deletions or substitutions) of text, ignoring case
+        :param text: a string
+        :param max_distance: the largest edit distance to accept
+        :param limit: the maximum number of glosses to return, or None for no limit
+        :return: a list of glosses, closest matches first
+        """
+        text = text.casefold()
+        query = set(trigrams(text))
+        #every edit can destroy at most three of the query's trigrams, so a match must share at least this many
+        threshold = len(query) - 3 * max_distance
+        if threshold <= 0:
+            candidates = self.keys
+        else:
+            shared = dict()
+            index = self.trigramIndex
+            for trigram in query:
+                for key in index.get(trigram, ()):
+                    shared[key] = shared.get(key, 0) + 1
+            candidates = [key for key, count in shared.items() if count >= threshold]
+
+        scored = list()
+        for key in candidates:
+            if abs(len(key) - len(text)) > max_distance:
+                continue
+            distance = edit_distance(text, key, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, key))
+        scored.sort()
+        return self.expand([key for distance, key in scored], limit)
+
+
+def trigrams(text):
+    padded = '\x00\x00{}\x00\x00'.format(text)
+    return [padded[n:n+3] for n in range(len(padded)-2)]
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Levenshtein distance between two strings. The calculation stops early once the distance is known to be
+    larger than max_distance, in which case max_distance+1 is returned.
+    """
+    previous = list(range(len(b)+1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1,
+                               current[j-1] + 1,
+                               previous[j-1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class CorpusStatistics:
+    """
+    Summary counts for a corpus: frequency range, coders, dates, hand/config types and the symbols used in each
+    transcription slot. Corpus.addWord and Corpus.removeWord update the counts one sign at a time, and the object
+    is saved along with the corpus, so dialogs can read these values without looping over every sign.
+    """
+
+    confighands = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+    #raise this whenever the counts change, so that statistics saved with older corpora are rebuilt
+    #2: sign classifications recomputed after EMPTY_CONFIG_HAND was corrected
+    VERSION = 2
+
+    def __init__(self, signs=None):
+        self.version = CorpusStatistics.VERSION
+        self.signCount = 0
+        self.frequencies = Counter()
+        self.sortedFrequencies = list()
+        self.coders = Counter()
+        self.dates = Counter()
+        self.handTypes = Counter()
+        self.configTypes = Counter()
+        self.signClasses = {classification: set() for classification in range(8)}
+        self.slotSymbols = {confighand: [Counter() for n in range(34)] for confighand in self.confighands}
+        if signs is not None:
+            for sign in signs:
+                self.add(sign)
+
+    def add(self, sign):
+        self.signCount += 1
+        frequency = sign.frequency
+        if not self.frequencies[frequency]:
+            insort(self.sortedFrequencies, frequency)
+        self.frequencies[frequency] += 1
+        self.coders[sign.coder] += 1
+        self.dates[sign.lastUpdated] += 1
+        self.handTypes[sign.hand_type] += 1
+        self.configTypes[sign.config_type] += 1
+        self.signClasses[sign.classification].add(sign.gloss)
+        for confighand in self.confighands:
+            for counter, symbol in zip(self.slotSymbols[confighand], getattr(sign, confighand)):
+                counter[symbol if symbol else '_'] += 1
+
+    def remove(self, sign):
+        self.signCount -= 1
+        frequency = sign.frequency
+        decrement(self.frequencies, frequency)
+        if not self.frequencies[frequency]:
+            del self.sortedFrequencies[bisect_left(self.sortedFrequencies, frequency)]
+        decrement(self.coders, sign.coder)
+        decrement(self.dates, sign.lastUpdated)
+        decrement(self.handTypes, sign.hand_type)
+        decrement(self.configTypes, sign.config_type)
+        self.signClasses[sign.classification].discard(sign.gloss)
+        for confighand in self.confighands:
+            for counter, symbol in zip(self.slotSymbols[confighand], getattr(sign, confighand)):
+                decrement(counter, symbol if symbol else '_')
+
+    def glossesOfType(self, mask, value):
+        """
+        :param mask: the classification bits to look at, e.g. ONE_HAND|ONE_CONFIG
+        :param value: the required setting of those bits, e.g. ONE_HAND for one-handed, two-config signs
+        :return: a set of the glosses whose classification matches
+        """
+        glosses = set()
+        for classification, members in self.signClasses.items():
+            if classification & mask == value:
+                glosses.update(members)
+        return glosses
+
+    def frequencyRange(self):
+        if not self.sortedFrequencies:
+            raise ValueError('Cannot get the frequency range of an empty corpus')
+        return self.sortedFrequencies[0], self.sortedFrequencies[-1]
+
+    def symbolHistogram(self, confighand, slot):
+        """
+        :param confighand: one of 'config1hand1', 'config1hand2', 'config2hand1', 'config2hand2'
+        :param slot: a slot number, from 1 to 34
+        :return: a Counter of the symbols used in that slot, with '_' for empty slots
+        """
+        return self.slotSymbols[confighand][slot-1]
+
+
+def decrement(counter, key):
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class TranscriptionPool:
+    """
+    Stores one shared tuple for every distinct config-hand transcription in a corpus, and remembers which
+    gloss and config-hand use it. Signs in the corpus hold these tuples instead of their own lists, so identical
+    transcriptions (empty hands, common handshapes) take up memory once and compare equal by identity.
+    """
+
+    confighands = ['config1hand1', 'config1hand2', 'config2hand1', 'config2hand2']
+
+    def __init__(self, signs=None):
+        self.transcriptions = dict() #transcription tuple -> (the shared tuple, set of (gloss, confighand))
+        if signs is not None:
+            for sign in signs:
+                self.add(sign)
+
+    def __len__(self):
+        return len(self.transcriptions)
+
+    def add(self, sign):
+        for confighand in self.confighands:
+            transcription = tuple(getattr(sign, confighand))
+            try:
+                shared, users = self.transcriptions[transcription]
+            except KeyError:
+                shared, users = transcription, set()
+                self.transcriptions[transcription] = (shared, users)
+            users.add((sign.gloss, confighand))
+            sign.setTranscription(confighand, shared)
+
+    def remove(self, sign):
+        for confighand in self.confighands:
+            transcription = tuple(getattr(sign, confighand))
+            shared, users = self.transcriptions[transcription]
+            users.discard((sign.gloss, confighand))
+            if not users:
+                del self.transcriptions[transcription]
+
+    def users(self, transcription):
+        """
+        :param transcription: a sequence of 34 symbols
+        :return: a sorted list of the (gloss, confighand) pairs with exactly this transcription
+        """
+        try:
+            return sorted(self.transcriptions[tuple(transcription)][1])
+        except KeyError:
+            return list()
+
+    def duplicates(self, min_count=2):
+        """
+        :param min_count: the smallest number of config-hands that have to share a transcription
+        :return: a list of (transcription, sorted list of (gloss, confighand)) pairs, most shared first
+        """
+        groups = [(shared, sorted(users)) for shared, users in self.transcriptions.values()
+                  if len(users) >= min_count]
+        groups.sort(key=lambda group: (-len(group[1]), group[1]))
+        return groups
+
 
 class Corpus:
     corpus_attributes = {'name': 'corpus', 'wordlist': dict(), '_discourse': None, 'path': None,
@@ -40,6 +395,15 @@ class Corpus:
         else:
             return value
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        statistics = state.get('_statistics')
+        if statistics is not None and getattr(statistics, 'version', None) != CorpusStatistics.VERSION:
+            #the signs were classified by an older version, so they are classified again and the statistics rebuilt
+            for sign in self.wordlist.values():
+                sign.classify()
+            del self._statistics
+
     def regExSearch(self, query):
         expressions = [[query[0], query[1]], [query[2], query[3]]]
         match_list = list()
@@ -66,6 +430,25 @@ class Corpus:
     def notes(self):
         return self.corpusNotes
 
+    @property
+    def glossIndex(self):
+        if not hasattr(self, '_glossIndex'):
+            #corpora saved before the index existed get one built the first time it's needed
+            self._glossIndex = GlossIndex(self.wordlist.keys())
+        return self._glossIndex
+
+    @property
+    def transcriptionPool(self):
+        if not hasattr(self, '_transcriptionPool'):
+            self._transcriptionPool = TranscriptionPool(self.wordlist.values())
+        return self._transcriptionPool
+
+    @property
+    def statistics(self):
+        if not hasattr(self, '_statistics') or getattr(self._statistics, 'version', None) != CorpusStatistics.VERSION:
+            self._statistics = CorpusStatistics(self.wordlist.values())
+        return self._statistics
+
     def __len__(self):
         return len(self.wordlist)
 
@@ -73,39 +456,123 @@ class Corpus:
         if hasattr(item, 'gloss'):
             return item.gloss in self.wordlist
         else:
-            return item.upper() in [w.upper() for w in self.wordlist]
+            return item in self.glossIndex #this is case-insensitive
 
     def __getitem__(self, key):
         try:
-            word = self.wordlist[key]
+            return self.wordlist[key]
         except KeyError:
-            try:
-                word = self.wordlist[key.upper()]
-            except KeyError:
-                word = self.wordlist[key.lower()]
-                #if this fails, then a KeyError is raised as usual
-        return word
+            gloss = self.glossIndex.lookup(key)
+            if gloss is None:
+                raise
+            return self.wordlist[gloss]
 
     def __iter__(self):
-        wordlist = sorted(self.wordlist.keys())
-        for item in wordlist:
-            yield self.wordlist[item]
+        for gloss in self.glossIndex:
+            yield self.wordlist[gloss]
 
     def __repr__(self):
         return 'Corpus object with name "{}"'.format(self.name)
 
     def addWord(self, hs):
+        glossIndex, statistics, pool = self.glossIndex, self.statistics, self.transcriptionPool
+        if hs.gloss in self.wordlist:
+            statistics.remove(self.wordlist[hs.gloss])
+            pool.remove(self.wordlist[hs.gloss])
+        else:
+            glossIndex.add(hs.gloss)
         self.wordlist[hs.gloss] = hs
+        statistics.add(hs)
+        pool.add(hs)
+
+    def removeWord(self, gloss):
+        glossIndex, statistics, pool = self.glossIndex, self.statistics, self.transcriptionPool
+        word = self.wordlist.pop(gloss)
+        glossIndex.remove(gloss)
+        statistics.remove(word)
+        pool.remove(word)
+        return word
+
+    def duplicateTranscriptions(self, min_count=2):
+        """
+        Group config-hands that have exactly the same transcription, for duplicate reports
+        :return: a list of (transcription, list of (gloss, confighand)) pairs, see TranscriptionPool.duplicates
+        """
+        return self.transcriptionPool.duplicates(min_count)
+
+    def glossesWithTranscription(self, transcription):
+        """
+        :param transcription: a sequence of 34 symbols
+        :return: a sorted list of the glosses that use this transcription in any config-hand
+        """
+        return sorted({gloss for gloss, confighand in self.transcriptionPool.users(transcription)})
 
     def randomWord(self):
         word = choice(list(self.wordlist.keys()))
         return self.wordlist[word]
 
     def getFrequencyRange(self):
-        minFreq = min(word.frequency for gloss, word in self.wordlist.items())
-        maxFreq = max(word.frequency for gloss, word in self.wordlist.items())
-
-        return minFreq, maxFreq
+        return self.statistics.frequencyRange()
+
+    def bulkUpdate(self, edits, glosses=None, save=True):
+        """
+        Apply the same edits to many signs and save the corpus once at the end. Every edit is checked before any
+        sign is changed, so a bad edit leaves the corpus untouched.
+        :param edits: a list of corpusedits.SetField, ReplaceSymbol and SetFlags objects, applied in order
+        :param glosses: the glosses of the signs to change, or None for every sign
+        :param save: if True and the corpus has a path, write the corpus to disk after all the edits
+        :return: the number of signs changed
+        """
+        for edit in edits:
+            edit.validate()
+        if glosses is None:
+            glosses = list(self.glossIndex)
+        else:
+            glosses = list(glosses)
+            missing = [gloss for gloss in glosses if gloss not in self.wordlist]
+            if missing:
+                raise KeyError('These glosses are not in the corpus: {}'.format(', '.join(missing)))
+
+        statistics, pool = self.statistics, self.transcriptionPool
+        reclassify = any(edit.changesTranscription for edit in edits)
+        for gloss in glosses:
+            sign = self.wordlist[gloss]
+            statistics.remove(sign)
+            if reclassify:
+                pool.remove(sign)
+            for edit in edits:
+                edit.apply(sign)
+            if reclassify:
+                sign.classify()
+                pool.add(sign)
+            statistics.add(sign)
+
+        if save and self.path is not None:
+            save_binary(self, self.path)
+        return len(glosses)
+
+    def signsOfType(self, hand_type='Either', config_type='Either', sign_types=None):
+        """
+        Look up signs by their classification instead of checking every sign in the corpus
+        :param hand_type: One-hand signs, Two-hand signs, Either
+        :param config_type: One-config signs, Two-config signs, Either
+        :param sign_types: a collection of 'one', 'two-same' and 'two-diff', or None for all of them
+        :return: a list of signs, in gloss order
+        """
+        mask = value = 0
+        if hand_type != 'Either':
+            mask |= ONE_HAND
+            value |= ONE_HAND if hand_type[:3].lower() == 'one' else 0
+        if config_type != 'Either':
+            mask |= ONE_CONFIG
+            value |= ONE_CONFIG if config_type[:3].lower() == 'one' else 0
+        glosses = self.statistics.glossesOfType(mask, value)
+        if sign_types is not None:
+            typed = set()
+            for sign_type in sign_types:
+                typed.update(self.statistics.glossesOfType(*SIGN_TYPE_BITS[sign_type]))
+            glosses &= typed
+        return [self.wordlist[gloss] for gloss in sorted(glosses)]
 
 
 class Sign:
@@ -153,8 +620,7 @@ class Sign:
         self.config1hand1, self.config1hand2 = self.config1
         self.config2hand1, self.config2hand2 = self.config2
 
-        self.determine_hand_type()
-        self.determine_config_type()
+        self.classify()
 
     def copyValue(self, value):
         if isinstance(value, dict):
@@ -181,27 +647,101 @@ class Sign:
     def __repr__(self):
         return self.__str__()
 
-    def determine_hand_type(self):
-        c1h1, c1h2, c2h1, c2h2 = self.get_transcription_strings()
+    def classify(self):
+        """
+        Work out whether this is a one-hand sign, a one-config sign and whether both hands have the same
+        transcription, and store the answers as bit flags in self.classification. This has to be called again
+        if the transcriptions are changed in place.
+        """
+        c1h1, c1h2, c2h1, c2h2 = [tuple(slot if slot else '_' for slot in transcription)
+                                  for transcription in (self.config1hand1, self.config1hand2,
+                                                        self.config2hand1, self.config2hand2)]
+        empty = [transcription[1:] == EMPTY_CONFIG_HAND for transcription in (c1h1, c1h2, c2h1, c2h2)]
+
+        classification = 0
+        if (empty[0] and empty[2]) or (empty[1] and empty[3]):
+            classification |= ONE_HAND
+        if (empty[0] and empty[1]) or (empty[2] and empty[3]):
+            classification |= ONE_CONFIG
+        if c1h1 == c1h2 and c2h1 == c2h2:
+            classification |= SAME_HANDS
+        self._classification = classification
 
-        if (c1h1 == '______∅/______1____2____3____4___' and c2h1 == '______∅/______1____2____3____4___') \
-                or (c1h2 == '______∅/______1____2____3____4___' and c2h2 == '______∅/______1____2____3____4___'):
-            typ = 'one'
-        else:
-            typ = 'two'
+    @property
+    def parameters(self):
+        """
+        The parameters of this sign as a list of top-level parameters. A sign only stores the differences between
+        its parameters and parameterSchema (see ParameterSelection), and the list is built from the schema when it
+        is asked for. Signs with the same selection get the same list, which must not be changed in place.
+        """
+        value = self.storedParameters()
+        if isinstance(value, ParameterSelection):
+            return parameterSchema.sharedTree(value)
+        return value
+
+    @parameters.setter
+    def parameters(self, value):
+        if isinstance(value, (list, tuple)):
+            #anything that does not fit the schema, like a tree from an older version of the parameters, is kept as is
+            selection = parameterSchema.selection(value)
+            if selection is not None:
+                value = selection
+        self._parameters = value
 
-        self.hand_type = typ
+    @property
+    def parameterSelection(self):
+        """
+        :return: the ParameterSelection of this sign, or None if its parameters do not fit parameterSchema
+        """
+        value = self.storedParameters()
+        return value if isinstance(value, ParameterSelection) else None
+
+    def storedParameters(self):
+        if '_parameters' not in self.__dict__:
+            #signs saved before parameters were stored as selections
+            self.parameters = self.__dict__.pop('parameters', defaultParameters)
+        return self._parameters
 
-    def determine_config_type(self):
-        c1h1, c1h2, c2h1, c2h2 = self.get_transcription_strings()
+    @property
+    def classification(self):
+        if not hasattr(self, '_classification'):
+            #signs saved before classifications were stored
+            self.classify()
+        return self._classification
 
-        if (c1h1 == '______∅/______1____2____3____4___' and c1h2 == '______∅/______1____2____3____4___') \
-                or (c2h1 == '______∅/______1____2____3____4___' and c2h2 == '______∅/______1____2____3____4___'):
-            typ = 'one'
+    @property
+    def hand_type(self):
+        return 'one' if self.classification & ONE_HAND else 'two'
+
+    @property
+    def config_type(self):
+        return 'one' if self.classification & ONE_CONFIG else 'two'
+
+    @property
+    def sign_type(self):
+        if self.classification & ONE_HAND:
+            return 'one'
+        elif self.classification & SAME_HANDS:
+            return 'two-same'
         else:
-            typ = 'two'
+            return 'two-diff'
+
+    def setTranscription(self, confighand, transcription):
+        """
+        Replace one of the four transcriptions, keeping self.config1 and self.config2 in step with it.
+        Call classify afterwards to update the classification.
+        :param confighand: one of 'config1hand1', 'config1hand2', 'config2hand1', 'config2hand2'
+        :param transcription: a list of 34 symbols
+        """
+        setattr(self, confighand, transcription)
+        self.config1 = [self.config1hand1, self.config1hand2]
+        self.config2 = [self.config2hand1, self.config2hand2]
+
+    def determine_hand_type(self):
+        self.classify()
 
-        self.config_type = typ
+    def determine_config_type(self):
+        self.classify()
 
     @property
     def frequency(self):
@@ -249,11 +789,8 @@ class Sign:
         for config_num in [1,2]:
             for hand_num in [1,2]:
                 hand = getattr(self, 'config{}hand{}'.format(config_num, hand_num))
-                if hand[0] == '_' or not hand[0]:
-                    hand[0] = blank_space
-                else:
-                    hand[0] = 'V'
                 transcription = [x if x else blank_space for x in hand]
+                transcription[0] = self.forearmSymbol(hand, blank_space)
                 transcription[7] = null
                 if transcription[19] == X_IN_BOX:
                     transcription[19] = x_in_box
@@ -270,7 +807,8 @@ class Sign:
             for hand_num in [1,2]:
                 #mini_output = list()
                 slot_list = getattr(self, 'config{}hand{}'.format(config_num, hand_num))
-                for slot_num in range(34):
+                output.append(self.forearmSymbol(slot_list, blank_space))
+                for slot_num in range(1, 34):
                     symbol = slot_list[slot_num]
                     if symbol == X_IN_BOX:
                         symbol = x_in_box
@@ -310,6 +848,10 @@ class Sign:
 
         return output
 
+    @staticmethod
+    def forearmSymbol(transcription, blank_space='_'):
+        return blank_space if transcription[0] == '_' or not transcription[0] else 'V'
+
     def add_fields(self, transcription):
         transcription = '[{}]1[{}]2[{}]3[{}]4[{}]5[{}]6[{}]7'.format(transcription[0],
                                                                      ''.join(transcription[1:5]),
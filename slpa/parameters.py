@@ -1,5 +1,5 @@
 import anytree
-from xml.etree.ElementTree import Element as xmlElement, SubElement as xmlSubElement
+import copy
 from xml.etree import ElementTree as xmlElementTree
 
 class Parameter:
@@ -249,6 +249,17 @@ def encodeXMLName(name):
         name = 'Zero'
     return name.replace(' ', '_')
 
+def xmlTag(name):
+    """
+    :return: encodeXMLName(name), with anything that cannot be in an element name replaced by _. Renamed editable
+    parameters can be called anything, and parseXML reads names from the name attribute, so the tag only has to be
+    well-formed.
+    """
+    tag = ''.join(c if c.isalnum() or c in '_-.' else '_' for c in encodeXMLName(name))
+    if not (tag[:1].isalpha() or tag[:1] == '_'):
+        tag = '_' + tag
+    return tag
+
 def decodeXMLName(name):
     if name == 'Zero':
         name = '0'
@@ -276,29 +287,260 @@ def getParameterFromXML(element, terminal=False):
                               element.attrib['parent'],
                               is_editable= textToBoolean(element.attrib['is_editable']),
                               is_default= textToBoolean(element.attrib['is_default']))
+    if 'is_checked' in element.attrib:
+        p.is_checked = textToBoolean(element.attrib['is_checked'])
     return p
 
-def getXMLElements(param, elements):
-    paramName = encodeXMLName(param.name)
-    for e in elements:
-        if ((param.parent is None and e.attrib['name'] == 'Parameters')  # top-level parameter
-            or (e.attrib['name'] == param.parent.name)):  # sub-level parameter
-            se = xmlSubElement(e, paramName)
-            se.attrib['name'] = param.name
-            se.attrib['is_checked'] = booleanToText(param.is_checked)
-            se.attrib['is_default'] = booleanToText(param.is_default)
-            se.attrib['is_editable'] = booleanToText(hasattr(param, 'is_editable') and param.is_editable)
-            se.attrib['parent'] = e.attrib['name']
-            elements.append(se)
-            break
-    return elements
-
-def getChildXMLElements(parameter, elements):
-    for child in parameter.children:
-        elements = getXMLElements(child, elements)
-        elements = getChildXMLElements(child, elements)
-    return elements
+def parseXML(xmlstring):
+    """
+    Rebuild a list of top-level parameters from a string made by exportXML. No Qt objects are created, so this can
+    run outside the GUI thread (see ParameterTreeModel.parseXML).
+    """
+    params = list()
+    topElement = xmlElementTree.fromstring(xmlstring)
+    for topChild in topElement:
+        p = getParameterFromXML(topChild)
+        p.parent = None
+        params.append(p)
+        if topChild.attrib['is_checked'] == 'True':
+            p.is_checked = True
+        for child in topChild:
+            addParameterFromXML(child, p)
+    return params
+
+def addParameterFromXML(element, parentParameter):
+    if list(element):
+        #this seems to be the best way to check if the element has children
+        #the .getchildren() method has been deprecated for a long time now
+        #and trying to access element._children attribute results in an unexplainable AttributeError
+        parameter = getParameterFromXML(element)
+        parentParameter.addChildren([parameter])
+        parameter.parent = parentParameter
+        for subelement in element:
+            addParameterFromXML(subelement, parameter)
+    else:
+        parameter = getParameterFromXML(element, terminal=True)
+        parentParameter.addChildren([parameter])
+        parameter.parent = parentParameter
+
+class SharedParameters(tuple):
+    """
+    A parameter selection that is shared by every sign with the same parameters, as returned by sharedParseXML
+    and ParameterSchema.sharedTree. It must not be changed: anything that edits parameters should work on
+    privateParameters(...) instead. If the tree fits parameterSchema, its ParameterSelection is in self.selection.
+    """
+    selection = None
+
+#parameter selections already parsed, keyed by their XML (see sharedParseXML)
+parseCache = dict()
+PARSE_CACHE_SIZE = 1024
+
+def sharedParseXML(xmlstring):
+    """
+    Like parseXML, but every call with the same string returns the same SharedParameters. Most signs in a corpus
+    have the same few selections, so an import only parses each of them once and keeps one copy in memory.
+    Parameters that fit parameterSchema are returned as the schema's tree for their selection, which also puts the
+    parameters from files written by an earlier exportXML back under their own parents.
+    """
+    try:
+        return parseCache[xmlstring]
+    except KeyError:
+        pass
+    shared = SharedParameters(parseXML(xmlstring))
+    selection = parameterSchema.selection(shared)
+    if selection is not None:
+        shared = parameterSchema.sharedTree(selection)
+    if len(parseCache) >= PARSE_CACHE_SIZE:
+        parseCache.clear()
+    parseCache[xmlstring] = shared
+    return shared
+
+def privateParameters(parameterList):
+    """
+    :return: a copy of a SharedParameters that can be edited without changing other signs, or any other parameter
+    list unchanged
+    """
+    if isinstance(parameterList, SharedParameters):
+        return copy.deepcopy(list(parameterList))
+    return parameterList
+
+def walkParameters(parameterList):
+    """
+    :return: every parameter in a list of top-level parameters, in the order of a depth-first walk
+    """
+    for parameter in parameterList:
+        yield parameter
+        yield from walkParameters(parameter.children)
+
+class ParameterSelection:
+    """
+    The parameters of one sign, stored as their differences from a ParameterSchema: a tuple of
+    (node number, is_checked, new name or None) for every parameter that is checked differently from its default
+    or has been renamed. is_checked is stored as True or False, as in the XML, whatever check state it was set to. Selections cannot be changed, so equal selections are shared (see ParameterSchema.intern)
+    and comparing two of them only looks at their changes.
+    """
+    __slots__ = ('changes',)
 
+    def __init__(self, changes=()):
+        self.changes = tuple(sorted(changes, key=lambda change: change[0]))
+
+    def __reduce__(self):
+        return ParameterSelection, (self.changes,)
+
+    def __eq__(self, other):
+        return isinstance(other, ParameterSelection) and self.changes == other.changes
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __repr__(self):
+        return 'ParameterSelection({!r})'.format(self.changes)
+
+class ParameterSchema:
+    """
+    What the parameters of every sign have in common: the names, the hierarchy, the defaults and which parameters
+    can be renamed. The schema keeps its own copy of the parameters it is built from, and numbers them in the order
+    of walkParameters. It is not changed afterwards.
+    """
+
+    def __init__(self, parameterList):
+        self.parameters = copy.deepcopy(list(parameterList))
+        nodes = list(walkParameters(self.parameters))
+        numbers = {id(node): number for number, node in enumerate(nodes)}
+        self.names = tuple(node.name for node in nodes)
+        self.defaults = tuple(bool(node.is_checked) for node in nodes)
+        self.editable = tuple(bool(getattr(node, 'is_editable', False)) for node in nodes)
+        self.top = tuple(numbers[id(node)] for node in self.parameters)
+        self.childNumbers = tuple(tuple(numbers[id(child)] for child in node.children) for node in nodes)
+        self.legacyChildNumbers = self.legacyLayout()
+        self.selections = dict()
+        self.trees = dict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def legacyLayout(self):
+        """
+        :return: the children of every node as exportXML wrote them before it walked the tree once. It put each
+        parameter under the first element written with its parent's name, so when two parameters have the same
+        name (like the two "Contour of movement"), the children of the second end up under the first.
+        """
+        parents = dict()
+        for number, children in enumerate(self.childNumbers):
+            for child in children:
+                parents[child] = number
+        layout = [list() for number in range(len(self))]
+        written = list() #(name, number) for every element written so far, in order
+        top = list()
+        for number in range(len(self)):
+            if number in parents:
+                parentName = self.names[parents[number]]
+                parent = next(element for name, element in written if name == parentName)
+                layout[parent].append(number)
+            else:
+                top.append(number)
+            written.append((self.names[number], number))
+        if top != list(self.top):
+            return self.childNumbers
+        return tuple(tuple(children) for children in layout)
+
+    def intern(self, selection):
+        return self.selections.setdefault(selection, selection)
+
+    def selection(self, parameterList):
+        """
+        :return: the ParameterSelection of a list of top-level parameters, or None if the parameters do not have the
+        same names and hierarchy as the schema (apart from renamed editable parameters). Parameters read from a
+        file written by an earlier exportXML, with the hierarchy of legacyLayout, get the selection they were
+        written from.
+        """
+        if isinstance(parameterList, SharedParameters) and parameterList.selection is not None:
+            return parameterList.selection
+        for layout in [self.childNumbers, self.legacyChildNumbers]:
+            changes = list()
+            if self.matchChildren(parameterList, self.top, changes, layout):
+                return self.intern(ParameterSelection(changes))
+            if self.legacyChildNumbers == self.childNumbers:
+                break
+        return None
+
+    def matchChildren(self, children, numbers, changes, layout):
+        if len(children) != len(numbers):
+            return False
+        #parameters with the same name are matched in order, which parseXML keeps when it sorts them
+        byName = dict()
+        for number in numbers:
+            byName.setdefault(self.names[number], list()).append(number)
+        renamed = list()
+        for child in children:
+            if child.name not in byName:
+                renamed.append(child)
+                continue
+            number = byName[child.name].pop(0)
+            if not byName[child.name]:
+                del byName[child.name]
+            if not self.matchParameter(child, number, changes, layout):
+                return False
+        if renamed:
+            #only an editable parameter can have a name that is not in the schema
+            unmatched = [number for numbers in byName.values() for number in numbers]
+            if len(renamed) != 1 or not self.editable[unmatched[0]]:
+                return False
+            return self.matchParameter(renamed[0], unmatched[0], changes, layout)
+        return True
+
+    def matchParameter(self, parameter, number, changes, layout):
+        name = parameter.name if parameter.name != self.names[number] else None
+        is_checked = bool(parameter.is_checked)
+        if name is not None or is_checked != self.defaults[number]:
+            changes.append((number, is_checked, name))
+        return self.matchChildren(parameter.children, layout[number], changes, layout)
+
+    def tree(self, selection):
+        """
+        :return: a new list of top-level parameters, with the selection applied to a copy of the schema
+        """
+        parameterList = copy.deepcopy(self.parameters)
+        nodes = list(walkParameters(parameterList))
+        for number, is_checked, name in selection.changes:
+            nodes[number].is_checked = is_checked
+            if name is not None:
+                nodes[number].name = name
+        return parameterList
+
+    def sharedTree(self, selection):
+        """
+        :return: a SharedParameters for the selection, which is only built once for all the signs that have it
+        """
+        try:
+            return self.trees[selection]
+        except KeyError:
+            pass
+        shared = SharedParameters(self.tree(selection))
+        shared.selection = selection
+        if len(self.trees) >= PARSE_CACHE_SIZE:
+            self.trees.clear()
+        self.trees[selection] = shared
+        return shared
+
+    def checked(self, selection):
+        """
+        :return: the numbers of the checked parameters, without building a tree
+        """
+        checked = [number for number, is_default in enumerate(self.defaults) if is_default]
+        checked = set(checked)
+        for number, is_checked, name in selection.changes:
+            if is_checked:
+                checked.add(number)
+            else:
+                checked.discard(number)
+        return sorted(checked)
 
 def exportTree(parameterList):
     export = list()
@@ -311,21 +553,92 @@ def exportTree(parameterList):
     export = ','.join(export)
     return export
 
-def exportXML(parameterList):
-
-    elements = list()
-    top = xmlElement('Parameters')
-    top.attrib['name'] = 'Parameters'
-    top.attrib['is_checked'] = 'False'
-    top.attrib['is_default'] = 'False'
-    top.attrib['is_editable'] = 'False'
-    elements.append(top)
+#serialized parameter selections, keyed by their signature (see exportXML)
+xmlCache = dict()
+XML_CACHE_SIZE = 1024
+
+def escapeXMLAttribute(text):
+    #the same escapes as ElementTree uses for attribute values
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    if '"' in text:
+        text = text.replace('"', '&quot;')
+    if '\r' in text:
+        text = text.replace('\r', '&#13;')
+    if '\n' in text:
+        text = text.replace('\n', '&#10;')
+    if '\t' in text:
+        text = text.replace('\t', '&#09;')
+    return text
+
+def addSignature(param, signature):
+    signature.append((param.name, param.is_checked, param.is_default,
+                      hasattr(param, 'is_editable') and param.is_editable, len(param.children)))
+    for child in param.children:
+        addSignature(child, signature)
+
+def xmlFromSignature(signature):
+    """
+    Write the XML for a signature made by exportXML. Each entry is a parameter, in the order of a depth-first walk,
+    with the number of children it has, which is enough to know where every element ends.
+    """
+    pieces = list()
+    stack = list() #[tag, name, children still to write] for every open element
+    for name, is_checked, is_default, is_editable, children in signature:
+        attributes = 'name="{}" is_checked="{}" is_default="{}" is_editable="{}"'.format(
+            escapeXMLAttribute(name), booleanToText(is_checked), booleanToText(is_default),
+            booleanToText(is_editable))
+        if stack:
+            attributes += ' parent="{}"'.format(escapeXMLAttribute(stack[-1][1]))
+        tag = xmlTag(name)
+        if children:
+            pieces.append('<{} {}>'.format(tag, attributes))
+            stack.append([tag, name, children])
+            continue
+
+        pieces.append('<{} {} />'.format(tag, attributes))
+        while stack:
+            stack[-1][2] -= 1
+            if stack[-1][2]:
+                break
+            pieces.append('</{}>'.format(stack.pop()[0]))
+    return ''.join(pieces)
 
+def exportXML(parameterList):
+    """
+    Write a list of top-level parameters as XML, in the format ParameterTreeModel.parseXML reads. This walks the
+    tree once, so each parameter is written under its own parent even when another parameter has the same name.
+    Earlier versions put each parameter under the first element named like its parent, so their files have the
+    children of Local Movement's "Contour of movement" under Major Movement's, and the XML for the same
+    parameters is not the same string as before.
+    Most signs have the same selection, so the XML is cached by a signature of the whole tree.
+    """
+    #a selection from the schema is a much cheaper key than a signature, since it only holds the changes
+    key = parameterList.selection if isinstance(parameterList, SharedParameters) else None
+    if key is not None and key in xmlCache:
+        return xmlCache[key]
+    if key is not None:
+        #always written from the schema's tree, so that a selection has one XML whichever tree it came from
+        parameterList = parameterSchema.sharedTree(key)
+
+    signature = [('Parameters', False, False, False, len(parameterList))]
     for param in parameterList:
-        elements = getXMLElements(param, elements)
-        elements = getChildXMLElements(param, elements)
-
-    string = xmlElementTree.tostring(top, encoding='unicode', method='xml')
+        addSignature(param, signature)
+    signature = tuple(signature)
+    key = signature if key is None else key
+
+    try:
+        return xmlCache[key]
+    except KeyError:
+        pass
+    string = xmlFromSignature(signature)
+    if len(xmlCache) >= XML_CACHE_SIZE:
+        xmlCache.clear()
+    xmlCache[key] = string
     return string
 
 
@@ -334,4 +647,9 @@ defaultParameterTree = anytree.Node('Parameters', parent = None)
 for parameter in defaultParameters:
     parentNode = anytree.Node(parameter.name, parent = defaultParameterTree)
     for childParameter in parameter.children:
-        addChild(parentNode, childParameter)
\ No newline at end of file
+        addChild(parentNode, childParameter)
+#the schema that sign parameters are stored against, built before anything can change defaultParameters
+parameterSchema = ParameterSchema(defaultParameters)
+
+#the default selection for signs imported without parameters
+sharedDefaultParameters = parameterSchema.sharedTree(parameterSchema.intern(ParameterSelection()))
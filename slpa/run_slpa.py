@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import sys
 import os
+import multiprocessing
 from gui.main import MainWindow, QApplicationMessaging
 
 if sys.platform.startswith('win'):
@@ -35,5 +36,6 @@ def run_slpa():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     run_slpa()
 
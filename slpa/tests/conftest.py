@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+#the modules in slpa import each other by their top-level names, as they do when run_slpa.py is run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from imports import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def empty_hand(qapp):
+    """
+    :return: the transcription of an empty config-hand, as the transcription slots give it after clearAll
+    """
+    from gui.transcriptions import TranscriptionConfigTab
+    tab = TranscriptionConfigTab(1)
+    tab.clearAll()
+    return tab.hand1()
@@ -0,0 +1,34 @@
+from analysis.constraint_check import check_corpus, check_corpus_compiled, is_empty
+from lexicon import Sign
+
+
+def one_handed_sign(empty_hand):
+    hand = list(empty_hand)
+    hand[1:5] = ['O', '=', 'F', 'F']
+    return Sign({'gloss': 'one-hand', 'config1': [hand, empty_hand[:]], 'config2': [hand[:], empty_hand[:]]})
+
+
+def test_empty_config_hand_is_empty(empty_hand):
+    assert is_empty(empty_hand)
+    #slot 1 (the forearm) is not part of the template
+    assert is_empty(['V'] + empty_hand[1:])
+    assert not is_empty(empty_hand[:2] + ['O'] + empty_hand[3:])
+
+
+def test_empty_config_hands_have_no_violations(empty_hand):
+    sign = one_handed_sign(empty_hand)
+    for report in (check_corpus([sign], processes=1), check_corpus_compiled([sign])):
+        assert not [violation for violation in report.violations
+                    if violation.confighand in ('config1hand2', 'config2hand2')]
+
+
+def test_empty_config_hands_are_checked_if_asked(empty_hand):
+    sign = one_handed_sign(empty_hand)
+    for report in (check_corpus([sign], processes=1, skip_empty=False),
+                   check_corpus_compiled([sign], skip_empty=False)):
+        assert 'config1hand2' in [violation.confighand for violation in report.violations]
+
+
+def test_compiled_check_matches_pool_check(empty_hand):
+    sign = one_handed_sign(empty_hand)
+    assert check_corpus([sign], processes=1).violations == check_corpus_compiled([sign]).violations
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from analysis.constraint_check import check_transcription, compare_specs, slot_data, supported_constraints
+from constants import FINGER_SYMBOLS, STANDARD_SYMBOLS
+from constraints import RingPinkyAnatomicalContstraint
+from constraintspecs import (CONSTRAINT_SPECS, ConstraintSpecError, EncodedSlots, compile_specs, dependency_graph,
+                             validate_spec)
+
+#slots that the ported constraints read, which are filled more often with finger symbols by finger_transcriptions
+FINGER_SLOTS = [4, 5, 17, 18, 19, 22, 23, 24, 27, 28, 29, 32, 33, 34]
+
+
+def transcription(**slots):
+    """
+    :return: a transcription of 34 empty slots, with the slots given as slot17='F' and so on filled in
+    """
+    symbols = [''] * 34
+    for name, symbol in slots.items():
+        symbols[int(name[4:])-1] = symbol
+    return symbols
+
+
+def random_transcriptions(count, seed=0):
+    rng = np.random.default_rng(seed)
+    symbols = STANDARD_SYMBOLS + ['']
+    return [[symbols[n] for n in row] for row in rng.integers(0, len(symbols), size=(count, 34)).tolist()]
+
+
+def finger_transcriptions(count, seed=0):
+    #random transcriptions with finger symbols in the finger slots, so that the conditions of the
+    #conditional constraints hold much more often than they do for transcriptions made of any symbol
+    rng = np.random.default_rng(seed)
+    fingers = FINGER_SYMBOLS + ['']
+    output = random_transcriptions(count, seed)
+    for row in output:
+        for slot in FINGER_SLOTS:
+            row[slot-1] = fingers[rng.integers(0, len(fingers))]
+        row[14] = ['4', '1', ''][rng.integers(0, 3)]
+    return output
+
+
+FIXTURES = [
+    transcription(),
+    transcription(slot18='H', slot23='H', slot28='H', slot33='H'),
+    transcription(slot18='F', slot19='E', slot33='i', slot34='i'),
+    transcription(slot22='F', slot17='E', slot27='H'),
+    transcription(slot32='F', slot17='i', slot27='F'),
+    transcription(slot27='F', slot17='E', slot22='H', slot32='i'),
+    transcription(slot28='E', slot29='H', slot33='F', slot34='F'),
+    transcription(slot28='E', slot29='H', slot33='F', slot34='F', slot15='4'),
+    transcription(slot28='i', slot29='F', slot33='F', slot34='F'),
+]
+
+
+def test_fixtures_match_constraint_classes():
+    assert compare_specs(FIXTURES) == []
+
+
+def test_random_transcriptions_match_constraint_classes():
+    assert compare_specs(random_transcriptions(5000)) == []
+
+
+def test_finger_transcriptions_match_constraint_classes():
+    assert compare_specs(finger_transcriptions(5000)) == []
+
+
+def test_specs_are_ports_of_supported_constraints():
+    ported = [spec['id'] for spec in CONSTRAINT_SPECS]
+    assert len(set(ported)) == len(ported)
+    assert set(ported) <= {name for name, constraint in supported_constraints()}
+
+
+def test_ring_pinky_reports_the_slots_it_checks():
+    flexed = transcription(slot28='E', slot29='H', slot33='F', slot34='F')
+    assert RingPinkyAnatomicalContstraint.check(slot_data(flexed)) == '28, 29, 33, 34'
+    name = RingPinkyAnatomicalContstraint.name
+    assert [slot for slot, constraint in check_transcription(flexed, supported_constraints())
+            if constraint == name] == [28, 29, 33, 34]
+
+    spec = dict(compile_specs())['RingPinkyAnatomicalContstraint']
+    violations = spec.evaluate(EncodedSlots([flexed]))
+    assert (np.nonzero(violations[0])[0] + 1).tolist() == [28, 29, 33, 34]
+
+
+def test_ring_pinky_exception_for_thumb_contact():
+    flexed = transcription(slot28='E', slot29='H', slot33='F', slot34='F', slot15='4')
+    assert not RingPinkyAnatomicalContstraint.check(slot_data(flexed))
+    spec = dict(compile_specs())['RingPinkyAnatomicalContstraint']
+    assert not spec.evaluate(EncodedSlots([flexed])).any()
+
+
+def test_invalid_specs_are_rejected():
+    spec = dict(CONSTRAINT_SPECS[1])
+    validate_spec(spec)
+    with pytest.raises(ConstraintSpecError):
+        validate_spec(dict(spec, constraint_type='other'))
+    with pytest.raises(ConstraintSpecError):
+        validate_spec(dict(spec, rules=[{'match': [[18, 35]]}]))
+    with pytest.raises(ConstraintSpecError):
+        compile_specs([spec, spec])
+
+
+def test_dependency_graph():
+    graph = dependency_graph()
+    assert 'RingPinkyAnatomicalContstraint' in graph[15]
+    assert 'MedialJointConstraint' in graph[18]
+    assert not graph[1]
@@ -0,0 +1,76 @@
+import pytest
+import lexicon
+from corpusedits import BulkEditError, ReplaceSymbol, SetField, SetFlags, SignEdit
+from lexicon import Corpus, CorpusStatistics, Sign, TranscriptionPool
+
+
+def test_sign_edit_needs_apply():
+    with pytest.raises(TypeError):
+        SignEdit()
+
+    class Rename(SignEdit):
+        def apply(self, sign):
+            sign.gloss = sign.gloss.upper()
+
+    Rename().validate()
+
+
+def test_edits_are_validated():
+    SetField('coder', 'someone').validate()
+    with pytest.raises(BulkEditError):
+        SetField('frequency', True).validate()
+    with pytest.raises(BulkEditError):
+        SetField('gloss', 'x').validate()
+    with pytest.raises(BulkEditError):
+        ReplaceSymbol('F', 'not a symbol').validate()
+
+
+def make_sign(gloss, empty_hand, symbols):
+    hand = list(empty_hand)
+    hand[1:5] = symbols
+    return Sign({'gloss': gloss, 'config1': [hand, empty_hand[:]], 'config2': [hand[:], empty_hand[:]]})
+
+
+def test_bulk_update_keeps_the_corpus_indexes_up_to_date(empty_hand, tmp_path, monkeypatch):
+    saved = list()
+    monkeypatch.setattr(lexicon, 'save_binary', lambda corpus, path: saved.append(path))
+    corpus = Corpus({'name': 'test', 'path': str(tmp_path / 'test.corpus')})
+    for gloss, symbols in [('a', ['O', '=', 'F', 'F']), ('b', ['L', '=', 'F', 'F']), ('c', ['O', '=', 'F', 'F'])]:
+        corpus.addWord(make_sign(gloss, empty_hand, symbols))
+    assert len(corpus.signsOfType(hand_type='One-hand signs')) == 3
+
+    edits = [SetField('frequency', 4.0), SetField('coder', 'someone'),
+             ReplaceSymbol('_', 'F', slots=[3], confighands=['config1hand2']),
+             ReplaceSymbol('O', 'U', slots=[2]), SetFlags(isUncertain=True, slots=[2, 3])]
+    assert corpus.bulkUpdate(edits, glosses=['a', 'b']) == 2
+    assert saved == [corpus.path]
+
+    assert [corpus[gloss].config1hand1[1] for gloss in 'abc'] == ['U', 'L', 'O']
+    assert [corpus[gloss].frequency for gloss in 'abc'] == [4.0, 4.0, 1.0]
+    assert [flag.isUncertain for flag in corpus['a'].flags['config2hand1'][:4]] == [False, True, True, False]
+    assert not any(flag.isUncertain for flag in corpus['c'].flags['config2hand1'])
+    #the classifications, statistics, transcription pool and gloss index are what they would be if every sign
+    #had been added as it is now
+    assert [sign.gloss for sign in corpus.signsOfType(hand_type='One-hand signs')] == ['c']
+    assert [sign.gloss for sign in corpus.signsOfType(hand_type='Two-hand signs')] == ['a', 'b']
+    assert vars(corpus.statistics) == vars(CorpusStatistics(corpus))
+    rebuilt = TranscriptionPool(Sign({'gloss': sign.gloss, 'config1': [sign.config1hand1, sign.config1hand2],
+                                      'config2': [sign.config2hand1, sign.config2hand2]}) for sign in corpus)
+    assert {key: users for key, (shared, users) in corpus.transcriptionPool.transcriptions.items()} == \
+        {key: users for key, (shared, users) in rebuilt.transcriptions.items()}
+    assert corpus.getFrequencyRange() == (1.0, 4.0)
+    assert list(corpus.glossIndex) == ['a', 'b', 'c']
+    assert corpus.glossesWithTranscription(corpus['a'].config1hand2) == ['a', 'b']
+
+
+def test_bad_bulk_update_changes_nothing(empty_hand, monkeypatch):
+    saved = list()
+    monkeypatch.setattr(lexicon, 'save_binary', lambda corpus, path: saved.append(path))
+    corpus = Corpus({'name': 'test', 'path': 'test.corpus'})
+    corpus.addWord(make_sign('a', empty_hand, ['O', '=', 'F', 'F']))
+    with pytest.raises(BulkEditError):
+        corpus.bulkUpdate([SetField('coder', 'someone'), ReplaceSymbol('O', 'not a symbol')])
+    with pytest.raises(KeyError):
+        corpus.bulkUpdate([SetField('coder', 'someone')], glosses=['a', 'missing'])
+    assert corpus['a'].coder == 'Unknown'
+    assert saved == []
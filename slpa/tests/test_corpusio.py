@@ -0,0 +1,378 @@
+import json
+from datetime import date
+from itertools import combinations
+import pytest
+import corpusio
+import parameters
+from gui.transcriptions import Flag
+from lexicon import Corpus, Sign
+from parameters import ParameterSelection, parameterSchema
+
+
+def make_sign(gloss, empty_hand, symbols=('O', '=', 'F', 'F'), **kwargs):
+    hand = list(empty_hand)
+    hand[1:5] = symbols
+    kwargs.update({'gloss': gloss, 'config1': [hand, empty_hand[:]], 'config2': [hand[:], empty_hand[:]]})
+    return Sign(kwargs)
+
+
+@pytest.fixture
+def signs(empty_hand):
+    """
+    :return: signs with flags, options, notes and parameters that are not the defaults
+    """
+    specify = next(number for number, name in enumerate(parameterSchema.names)
+                   if name == 'Specify' and parameterSchema.editable[number])
+    renamed = ParameterSelection([(specify, True, 'Three times')])
+    selections = [ParameterSelection()] + distinct_selections(3) + [renamed]
+    signs = list()
+    for n, selection in enumerate(selections):
+        flags = {confighand: [Flag(slot % 7 == n, slot % 11 == n) for slot in range(33)] + [Flag(n == 1, n == 2)]
+                 for confighand in corpusio.CONFIGHANDS}
+        sign = make_sign('sign{}'.format(n), empty_hand, [['O', 'L', 'U'][n % 3], '=', 'F', ['F', 'E'][n % 2]],
+                         flags=flags, _frequency=n+0.5, _coder='coder{}'.format(n % 2),
+                         _lastUpdated=date(2020, 1, n+1), signNotes='note {}'.format(n) if n else '',
+                         forearm=n % 2 == 1, uncertain=n == 2, fingerspelled=n == 3)
+        sign.parameters = parameterSchema.intern(selection)
+        signs.append(sign)
+    return signs
+
+
+def assert_same_signs(corpus, signs):
+    assert sorted(corpus.wordlist) == sorted(sign.gloss for sign in signs)
+    for sign in signs:
+        copy = corpus[sign.gloss]
+        assert corpusio.format_sign(copy) == corpusio.format_sign(sign)
+        assert copy.flags == sign.flags
+        assert copy.parameterSelection == sign.parameterSelection
+
+
+def distinct_selections(number):
+    """
+    :return: a list of different ParameterSelections, each checking two parameters the other way from their default
+    """
+    selections = list()
+    for a, b in combinations(range(len(parameterSchema)), 2):
+        changes = [(a, not parameterSchema.defaults[a], None), (b, not parameterSchema.defaults[b], None)]
+        selections.append(parameterSchema.intern(ParameterSelection(changes)))
+        if len(selections) == number:
+            return selections
+
+
+def test_arrow_export_with_more_selections_than_the_caches_hold(empty_hand, tmp_path):
+    pytest.importorskip('pyarrow')
+    selections = distinct_selections(parameters.PARSE_CACHE_SIZE + 500)
+    signs = list()
+    for n, selection in enumerate(selections):
+        sign = make_sign('sign{}'.format(n), empty_hand)
+        sign.parameters = selection
+        signs.append(sign)
+
+    path = str(tmp_path / 'corpus.parquet')
+    assert corpusio.export_arrow(signs, path)
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_arrow(path, corpus)
+    assert report.imported == len(signs)
+    assert not report.errors
+    for n, selection in enumerate(selections):
+        assert corpus['sign{}'.format(n)].parameterSelection == selection
+
+
+def test_jsonl_lines_with_wrong_types_are_reported(empty_hand, tmp_path):
+    good = json.loads(corpusio.sign_to_json(make_sign('good', empty_hand)))
+    lines = [good]
+    for gloss, changes in [('null frequency', {'_frequency': None}),
+                           ('list frequency', {'_frequency': [1]}),
+                           ('word frequency', {'_frequency': 'often'}),
+                           (None, {}),
+                           ('number coder', {'_coder': 3}),
+                           ('null notes', {'signNotes': None}),
+                           ('short flags', {'flags': {confighand: [[False, False]] * 33
+                                                      for confighand in corpusio.CONFIGHANDS}}),
+                           ('string flags', {'flags': {confighand: ['no'] * 34
+                                                       for confighand in corpusio.CONFIGHANDS}})]:
+        line = dict(good, gloss=gloss)
+        line.update(changes)
+        lines.append(line)
+    lines.append(dict(good, gloss='string frequency', _frequency='3'))
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text('\n'.join(json.dumps(line) for line in lines) + '\n', encoding='utf-8')
+
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_jsonl(str(path), corpus)
+    assert sorted(corpus.wordlist) == ['good', 'string frequency']
+    assert corpus['string frequency'].frequency == 3.0
+    assert [error.line for error in report.errors] == list(range(2, 10))
+    assert report.imported == 2
+
+
+def test_tsv_import_reports_malformed_lines(signs, tmp_path):
+    path = str(tmp_path / 'corpus.tsv')
+    assert corpusio.export_tsv(signs[:2], path)
+    good = corpusio.format_sign(signs[2]).split('\t')
+    columns = corpusio.column_map(Sign.headers.split('\t'))
+    bad = list()
+    for gloss, column, value in [('bad frequency', 'frequency', 'often'), ('bad date', 'date', 'yesterday'),
+                                 ('bad flags', 'config1hand1uncertain', '1-x'),
+                                 ('bad parameters', 'parameters', '<Parameters>')]:
+        line = good[:]
+        line[columns['gloss']] = gloss
+        line[columns[column]] = value
+        bad.append('\t'.join(line))
+    with open(path, mode='a', encoding='utf-8') as f:
+        f.write('short\tline\n')
+        f.write('\n'.join(bad) + '\n')
+        f.write(corpusio.format_sign(signs[2]) + '\n')
+
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_tsv(path, corpus)
+    assert_same_signs(corpus, signs[:3])
+    assert report.imported == 3
+    assert [(error.line, error.gloss) for error in report.errors] == [
+        (4, 'short'), (5, 'bad frequency'), (6, 'bad date'), (7, 'bad flags'), (8, 'bad parameters')]
+    assert not report.cancelled
+
+
+def test_tsv_import_stops_when_asked(signs, tmp_path):
+    path = str(tmp_path / 'corpus.tsv')
+    corpusio.export_tsv(signs, path)
+    progress = list()
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_tsv(path, corpus, chunk=2, call_back=lambda done, total: progress.append((done, total)),
+                                 stop_check=lambda: len(progress) == 2)
+    assert report.cancelled
+    assert report.imported == 4
+    assert sorted(corpus.wordlist) == ['sign0', 'sign1', 'sign2', 'sign3']
+    assert progress == [(3, 6), (5, 6)]
+
+
+def test_tsv_flags_are_numbered_from_one(signs, tmp_path):
+    line = corpusio.format_sign(signs[0]).split('\t')
+    columns = corpusio.column_map(Sign.headers.split('\t'))
+    for confighand in corpusio.CONFIGHANDS:
+        line[columns[confighand+'uncertain']] = 'None'
+        line[columns[confighand+'estimated']] = 'None'
+    line[columns['config1hand1uncertain']] = '1-34'
+    line[columns['config2hand2estimated']] = '2'
+    path = tmp_path / 'corpus.tsv'
+    path.write_text(Sign.headers + '\n' + '\t'.join(line) + '\n', encoding='utf-8')
+
+    corpus = Corpus({'name': 'test'})
+    corpusio.import_tsv(str(path), corpus)
+    flags = corpus['sign0'].flags
+    assert [n for n, flag in enumerate(flags['config1hand1']) if flag.isUncertain] == [0, 33]
+    assert [n for n, flag in enumerate(flags['config2hand2']) if flag.isEstimate] == [1]
+    assert sum(flag.isUncertain or flag.isEstimate for confighand in corpusio.CONFIGHANDS
+               for flag in flags[confighand]) == 3
+    #and written out again as the same numbers
+    assert corpusio.format_sign(corpus['sign0']).split('\t') == line
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_tsv_round_trip(signs, tmp_path, processes):
+    path = str(tmp_path / 'corpus.tsv')
+    assert corpusio.export_tsv(signs, path, processes=processes, chunk=2)
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_tsv(path, corpus)
+    assert not report.errors
+    assert_same_signs(corpus, signs)
+    assert ':Three times' in parameters.exportTree(corpus['sign4'].parameters)
+
+
+def test_cancelled_tsv_export_leaves_the_old_file(signs, tmp_path):
+    path = tmp_path / 'corpus.tsv'
+    path.write_text('old', encoding='utf-8')
+    assert not corpusio.export_tsv(signs, str(path), chunk=2, stop_check=lambda: True)
+    assert path.read_text(encoding='utf-8') == 'old'
+    assert [file.name for file in tmp_path.iterdir()] == ['corpus.tsv']
+
+
+@pytest.mark.parametrize('name', ['corpus.parquet', 'corpus.arrow'])
+def test_arrow_round_trip(signs, tmp_path, name):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / name)
+    assert corpusio.export_arrow(signs, path)
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_arrow(path, corpus)
+    assert not report.errors
+    assert_same_signs(corpus, signs)
+    table = corpusio.read_arrow(path)
+    assert table.column('selected_parameters').to_pylist()[0] == corpusio.checked_parameters(signs[0].parameters)
+
+
+def test_arrow_rows_that_cannot_be_read_are_reported(signs, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    table = corpusio.arrow_table(signs)
+    xml = table.column('parameters').to_pylist()
+    xml[1] = '<Parameters>'
+    table = table.set_column(table.column_names.index('parameters'), 'parameters', pyarrow.array(xml))
+    path = str(tmp_path / 'corpus.arrow')
+    pyarrow.feather.write_feather(table, path)
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_arrow(path, corpus)
+    assert [(error.line, error.gloss) for error in report.errors] == [(2, 'sign1')]
+    assert report.imported == len(signs) - 1
+
+
+def test_arrow_export_and_import_stop_when_asked(signs, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'corpus.parquet'
+    assert not corpusio.export_arrow(signs, str(path), chunk=2, stop_check=lambda: True)
+    assert not list(tmp_path.iterdir())
+
+    corpusio.export_arrow(signs, str(path))
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_arrow(str(path), corpus, chunk=2, stop_check=lambda: True)
+    assert report.cancelled
+    assert sorted(corpus.wordlist) == ['sign0', 'sign1']
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_jsonl_round_trip(signs, tmp_path, processes):
+    path = str(tmp_path / 'corpus.jsonl')
+    assert corpusio.export_jsonl(signs, path)
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_jsonl(path, corpus, processes=processes, chunk=2)
+    assert not report.errors
+    assert report.imported == len(signs)
+    assert_same_signs(corpus, signs)
+    for sign in signs:
+        assert corpus[sign.gloss].lastUpdated == sign.lastUpdated
+
+
+def test_malformed_jsonl_lines_are_reported(signs, tmp_path):
+    good = json.loads(corpusio.sign_to_json(signs[0]))
+    missing = dict(good, gloss='no config2')
+    del missing['config2']
+    lines = [json.dumps(good), '{"gloss": "not closed"', '["a list"]', json.dumps(missing),
+             json.dumps(dict(good, gloss='short', config1=[good['config1'][0][:30], good['config1'][1]])),
+             json.dumps(dict(good, gloss='bad date', _lastUpdated='soon')),
+             json.dumps(dict(good, gloss='bad parameters', parameters='<Parameters>')), '',
+             corpusio.sign_to_json(signs[1])]
+    path = tmp_path / 'corpus.jsonl'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_jsonl(str(path), corpus)
+    assert_same_signs(corpus, signs[:2])
+    assert [(error.line, error.gloss) for error in report.errors] == [
+        (2, ''), (3, ''), (4, 'no config2'), (5, 'short'), (6, 'bad date'), (7, 'bad parameters')]
+
+
+def test_jsonl_export_and_import_stop_when_asked(signs, tmp_path):
+    path = tmp_path / 'corpus.jsonl'
+    assert not corpusio.export_jsonl(signs, str(path), every=2, stop_check=lambda: True)
+    assert not list(tmp_path.iterdir())
+
+    corpusio.export_jsonl(signs, str(path))
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_jsonl(str(path), corpus, chunk=2, stop_check=lambda: True)
+    assert report.cancelled
+    assert sorted(corpus.wordlist) == ['sign0', 'sign1']
+
+
+def test_delta_export_and_merge(signs, empty_hand, tmp_path):
+    base = str(tmp_path / 'base.tsv')
+    assert corpusio.export_tsv(signs[:4], base, watermark=True)
+    changed = make_sign('sign1', empty_hand, ['U', '<', 'E', 'F'], flags=signs[1].flags,
+                        _lastUpdated=date.today())
+    current = [signs[0], changed, signs[3], signs[4]]
+
+    delta = str(tmp_path / 'delta.tsv')
+    assert corpusio.export_delta(current, delta, base) == corpusio.Delta(['sign4'], ['sign1'], ['sign2'])
+    merged = str(tmp_path / 'merged.tsv')
+    assert corpusio.merge_delta(base, delta, merged) == corpusio.Delta(['sign4'], ['sign1'], ['sign2'])
+    corpus = Corpus({'name': 'test'})
+    report = corpusio.import_tsv(merged, corpus)
+    assert not report.errors
+    assert_same_signs(corpus, current)
+    with open(merged, encoding='utf-8') as f:
+        assert [line.split('\t', 1)[0] for line in f] == ['gloss', 'sign0', 'sign1', 'sign3', 'sign4']
+
+    #the merged export has the delta's watermark, so the next delta starts from it
+    assert corpusio.export_delta(current, str(tmp_path / 'next.tsv'), merged) == corpusio.Delta([], [], [])
+    #a change that did not update the date is only found without use_dates
+    notes = make_sign('sign0', empty_hand, flags=signs[0].flags, signNotes='changed',
+                      _lastUpdated=signs[0].lastUpdated)
+    current[0] = notes
+    assert corpusio.export_delta(current, str(tmp_path / 'next.tsv'), merged).changed == []
+    assert corpusio.export_delta(current, str(tmp_path / 'next.tsv'), merged, use_dates=False).changed == ['sign0']
+
+
+def test_delta_export_stops_when_asked(signs, tmp_path):
+    base = str(tmp_path / 'base.tsv')
+    corpusio.export_tsv(signs, base, watermark=True)
+    delta = tmp_path / 'delta.tsv'
+    assert corpusio.export_delta(signs, str(delta), base, use_dates=False, chunk=2, stop_check=lambda: True) is None
+    assert not delta.exists()
+
+
+def test_merge_delta_rejects_other_files(signs, tmp_path):
+    base = str(tmp_path / 'base.tsv')
+    corpusio.export_tsv(signs, base, watermark=True)
+    with pytest.raises(ValueError):
+        corpusio.merge_delta(base, base)
+
+
+def problem_file(signs, path):
+    """
+    Write an export of signs followed by lines with one problem each, and return the glosses of those lines
+    """
+    corpusio.export_tsv(signs[:2], path)
+    good = corpusio.format_sign(signs[2]).split('\t')
+    columns = corpusio.column_map(Sign.headers.split('\t'))
+    slot = columns['config1hand1'][1]
+    lines = list()
+    for gloss, column, value in [('bad flags', 'config1hand1estimated', '3-x'), ('bad frequency', 'frequency', 'x'),
+                                 ('bad date', 'date', '2020-13-01'), ('bad parameters', 'parameters', '<a>'),
+                                 ('odd symbol', slot, '#'), ('odd option', 'forearm', 'yes'),
+                                 ('sign0', 'gloss', 'sign0'), ('odd flags', 'config2hand1uncertain', '3-35')]:
+        line = good[:]
+        line[columns['gloss']] = gloss
+        line[slot if column == slot else columns[column]] = value
+        lines.append('\t'.join(line))
+    lines.append('\t'.join(good + ['extra']))
+    lines.append('short\tline')
+    with open(path, mode='a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_validate_tsv_finds_every_problem(signs, tmp_path, processes):
+    path = str(tmp_path / 'corpus.tsv')
+    problem_file(signs, path)
+    report = corpusio.validate_tsv(path, processes=processes, chunk=3)
+    assert report.lines == 12
+    assert [(error.line, error.gloss) for error in report.errors] == [
+        (4, 'bad flags'), (5, 'bad frequency'), (6, 'bad date'), (7, 'bad parameters'), (13, 'short')]
+    assert [(warning.line, warning.gloss) for warning in report.warnings] == [
+        (8, 'odd symbol'), (9, 'odd option'), (10, 'sign0'), (11, 'odd flags'), (12, 'sign2')]
+    assert 'line 2' in report.warnings[2].message
+
+    #the lines validate_tsv calls errors are the ones import_tsv skips
+    corpus = Corpus({'name': 'test'})
+    imported = corpusio.import_tsv(path, corpus)
+    assert [error.line for error in imported.errors] == [error.line for error in report.errors]
+
+
+def test_validate_tsv_without_parameters_and_bad_headers(signs, tmp_path):
+    path = str(tmp_path / 'corpus.tsv')
+    problem_file(signs, path)
+    report = corpusio.validate_tsv(path, check_parameters=False)
+    assert 'bad parameters' not in [error.gloss for error in report.errors]
+
+    headers = tmp_path / 'headers.tsv'
+    headers.write_text('gloss\tfrequency\n', encoding='utf-8')
+    report = corpusio.validate_tsv(str(headers))
+    assert [error.line for error in report.errors] == [1]
+    empty = tmp_path / 'empty.tsv'
+    empty.write_text('', encoding='utf-8')
+    assert corpusio.validate_tsv(str(empty)).errors == [corpusio.LineError(1, '', 'the file is empty')]
+
+
+def test_validate_tsv_stops_when_asked(signs, tmp_path):
+    path = str(tmp_path / 'corpus.tsv')
+    problem_file(signs, path)
+    report = corpusio.validate_tsv(path, chunk=3, stop_check=lambda: True)
+    assert report.cancelled
+    assert report.lines == 3
@@ -0,0 +1,54 @@
+from corpusmerge import KEEP_BOTH, KEEP_CURRENT, OVERWRITE, apply_merge, plan_merge, transcription_key
+from lexicon import Corpus, Sign
+
+
+def make_sign(gloss, empty_hand, symbols):
+    hand = list(empty_hand)
+    hand[1:5] = symbols
+    return Sign({'gloss': gloss, 'config1': [hand, empty_hand[:]], 'config2': [hand[:], empty_hand[:]]})
+
+
+def make_corpus(signs):
+    corpus = Corpus({'name': 'test'})
+    for sign in signs:
+        corpus.addWord(sign)
+    return corpus
+
+
+def test_transcription_key(empty_hand):
+    a = make_sign('a', empty_hand, ['O', '=', 'F', 'F'])
+    assert transcription_key(a) == transcription_key(make_sign('b', empty_hand, ['O', '=', 'F', 'F']))
+    assert transcription_key(a) != transcription_key(make_sign('a', empty_hand, ['L', '=', 'F', 'F']))
+    a.forearm = True
+    assert transcription_key(a) != transcription_key(make_sign('a', empty_hand, ['O', '=', 'F', 'F']))
+
+
+def test_glosses_are_compared_ignoring_case(empty_hand):
+    corpus = make_corpus([make_sign('hello', empty_hand, ['O', '=', 'F', 'F'])])
+    plan = plan_merge(corpus, [make_sign('HELLO', empty_hand, ['O', '=', 'F', 'F']),
+                               make_sign('Hello', empty_hand, ['L', '=', 'F', 'F']),
+                               make_sign('bye', empty_hand, ['O', '=', 'F', 'F']),
+                               make_sign('BYE', empty_hand, ['L', '=', 'F', 'F'])])
+    assert [sign.gloss for sign in plan.identical] == ['HELLO']
+    assert [sign.gloss for sign in plan.conflicts] == ['Hello', 'BYE']
+    assert [sign.gloss for sign in plan.new] == ['bye']
+
+    report = apply_merge(corpus, plan, KEEP_CURRENT)
+    assert sorted(corpus.wordlist) == ['bye', 'hello']
+    assert report.added == ['bye']
+
+
+def test_overwrite_replaces_sign_with_other_case(empty_hand):
+    corpus = make_corpus([make_sign('hello', empty_hand, ['O', '=', 'F', 'F'])])
+    plan = plan_merge(corpus, [make_sign('Hello', empty_hand, ['L', '=', 'F', 'F'])])
+    apply_merge(corpus, plan, OVERWRITE)
+    assert list(corpus.wordlist) == ['Hello']
+    assert corpus['hello'].config1hand1[1] == 'L'
+
+
+def test_keep_both_adds_numbered_gloss(empty_hand):
+    corpus = make_corpus([make_sign('hello', empty_hand, ['O', '=', 'F', 'F']),
+                          make_sign('HELLO (2)', empty_hand, ['O', '=', 'F', 'F'])])
+    plan = plan_merge(corpus, [make_sign('Hello', empty_hand, ['L', '=', 'F', 'F'])])
+    report = apply_merge(corpus, plan, KEEP_BOTH)
+    assert report.conflicts == [('Hello', 'added as Hello (3)')]
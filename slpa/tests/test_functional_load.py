@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from analysis.functional_load import (CONFIGHANDS, CONCATENATED, MULTISET, TOKEN_WEIGHTING, TYPE_WEIGHTING,
+                                      EncodedTranscriptions, FunctionalLoadTracker, bootstrap_functional_load,
+                                      contact_contrasts, custom_contrast, duction_contrasts, functional_load,
+                                      opposition_contrasts, pairwise_functional_load, predefined_contrasts)
+from lexicon import Sign
+
+
+def make_sign(gloss, empty_hand, symbols, two_hands=False, frequency=1.0):
+    hand = list(empty_hand)
+    hand[1:5] = symbols
+    other = hand[:] if two_hands else empty_hand[:]
+    return Sign({'gloss': gloss, 'config1': [hand, other], 'config2': [hand[:], other[:]], '_frequency': frequency})
+
+
+def test_pooled_selection_leaves_out_empty_config_hands(empty_hand):
+    signs = [make_sign('one-hand', empty_hand, ['O', '=', 'F', 'F']),
+             make_sign('two-hand', empty_hand, ['L', '=', 'F', 'F'], two_hands=True)]
+    pooled = EncodedTranscriptions(signs, CONFIGHANDS, MULTISET)
+    #two config-hands of the one-handed sign and all four of the two-handed sign
+    assert len(pooled) == 6
+    assert len(EncodedTranscriptions(signs, CONFIGHANDS, CONCATENATED)) == 2
+
+
+def test_pooled_entropy_ignores_empty_config_hands(empty_hand):
+    signs = [make_sign('a', empty_hand, ['O', '=', 'F', 'F']), make_sign('b', empty_hand, ['L', '=', 'F', 'F'])]
+    result, = functional_load(EncodedTranscriptions(signs, CONFIGHANDS, MULTISET), duction_contrasts('Thumb/Finger'))
+    #two transcriptions, two config-hands each, and nothing else
+    assert result.startingSize == 2
+    assert result.startingEntropy == 1.0
+
+
+def test_thumb_contrasts(empty_hand):
+    signs = [make_sign('a', empty_hand, ['O', '=', 'F', 'F']), make_sign('b', empty_hand, ['L', '=', 'F', 'F'])]
+    opposition, contact = functional_load(signs, opposition_contrasts() + contact_contrasts())
+    assert (opposition.startingSize, opposition.endingSize, opposition.change) == (2, 1, 1.0)
+    assert (contact.endingSize, contact.change) == (2, 0.0)
+
+    hand = list(signs[0].config1hand1)
+    hand[5:7] = ['t', 'd']
+    touching = Sign({'gloss': 'c', 'config1': [hand, empty_hand[:]], 'config2': [hand[:], empty_hand[:]]})
+    contact, = functional_load([signs[0], touching], contact_contrasts())
+    assert (contact.startingSize, contact.endingSize, contact.change) == (2, 1, 1.0)
+
+
+def test_bootstrap_intervals_contain_the_estimates(empty_hand):
+    symbols = ['O', 'L', 'U', '?']
+    signs = [make_sign('s{}'.format(n), empty_hand, [symbols[n % 4], ['=', '<'][n % 3 == 0], 'F', 'F'])
+             for n in range(40)]
+    contrasts = opposition_contrasts() + duction_contrasts('Thumb/Finger')
+    results = functional_load(signs, contrasts)
+    intervals = bootstrap_functional_load(signs, contrasts, seed=0)
+    for result, interval in zip(results, intervals):
+        assert interval.startingLower <= result.startingEntropy <= interval.startingUpper
+        assert interval.changeLower <= result.change <= interval.changeUpper
+    assert intervals == bootstrap_functional_load(signs, contrasts, seed=0)
+
+
+def assert_tracker_matches(tracker, signs, contrasts, weighting):
+    expected = functional_load(signs, contrasts, weighting=weighting)
+    for result, tracked in zip(expected, tracker.results()):
+        assert tracked.startingEntropy == pytest.approx(result.startingEntropy, abs=1e-9)
+        assert tracked.endingEntropy == pytest.approx(result.endingEntropy, abs=1e-9)
+        assert tracked.change == pytest.approx(result.change, abs=1e-9)
+        if weighting == TYPE_WEIGHTING:
+            assert (tracked.startingSize, tracked.endingSize) == (result.startingSize, result.endingSize)
+
+
+@pytest.mark.parametrize('weighting', [TYPE_WEIGHTING, TOKEN_WEIGHTING])
+def test_tracker_follows_adds_edits_and_deletes(empty_hand, weighting):
+    contrasts = predefined_contrasts() + opposition_contrasts()
+    signs = [make_sign('a', empty_hand, ['O', '=', 'F', 'F'], frequency=3.0),
+             make_sign('b', empty_hand, ['L', '=', 'F', 'F'], frequency=0.0),
+             make_sign('c', empty_hand, ['O', '<', 'F', 'F'], frequency=2.0),
+             make_sign('d', empty_hand, ['U', '<', 'E', 'F'], frequency=0.0)]
+    tracker = FunctionalLoadTracker(contrasts, weighting=weighting, signs=signs)
+    assert_tracker_matches(tracker, signs, contrasts, weighting)
+
+    added = make_sign('e', empty_hand, ['L', '<', 'F', 'F'], frequency=5.0)
+    tracker.add(added)
+    signs.append(added)
+    assert_tracker_matches(tracker, signs, contrasts, weighting)
+
+    #an edit is the old sign removed and the new one added, as in FunctionalLoadDashboard.signSaved
+    edited = make_sign('c', empty_hand, ['L', '=', 'F', 'F'], frequency=0.0)
+    tracker.remove(signs[2])
+    tracker.add(edited)
+    signs[2] = edited
+    assert_tracker_matches(tracker, signs, contrasts, weighting)
+
+    for n in [1, 0]:
+        tracker.remove(signs.pop(n))
+        assert_tracker_matches(tracker, signs, contrasts, weighting)
+
+
+def test_tracker_ignores_signs_it_never_counted(empty_hand):
+    signs = [make_sign('a', empty_hand, ['O', '=', 'F', 'F']), make_sign('b', empty_hand, ['L', '=', 'F', 'F'])]
+    tracker = FunctionalLoadTracker(predefined_contrasts(), signs=signs)
+    tracker.remove(make_sign('c', empty_hand, ['U', '<', 'E', 'F']))
+    tracker = FunctionalLoadTracker(predefined_contrasts(), weighting=TOKEN_WEIGHTING, signs=signs)
+    tracker.remove(make_sign('d', empty_hand, ['U', '<', 'E', 'F'], frequency=0.0))
+    assert sorted(tracker.tables[0]) == sorted(tracker.keys(sign)[0] for sign in signs)
+    assert_tracker_matches(tracker, signs, predefined_contrasts(), TOKEN_WEIGHTING)
+
+
+@pytest.mark.parametrize('weighting', [TYPE_WEIGHTING, TOKEN_WEIGHTING])
+@pytest.mark.parametrize('pooled', [False, True])
+def test_pairwise_matrix_matches_functional_load(empty_hand, weighting, pooled):
+    rows = [['O', '=', 'F', 'F'], ['L', '=', 'F', 'F'], ['U', '=', 'F', 'F'], ['O', '<', 'F', 'F'],
+            ['L', '<', 'E', 'F'], ['O', '=', 'E', 'F'], ['U', '<', 'F', 'E'], ['L', '=', 'F', 'E']]
+    signs = [make_sign('s{}'.format(n), empty_hand, symbols, frequency=float(n % 3 + 1))
+             for n, symbols in enumerate(rows)]
+    encoded = EncodedTranscriptions(signs, CONFIGHANDS, MULTISET) if pooled else EncodedTranscriptions(signs)
+    matrix = pairwise_functional_load(encoded, weighting=weighting)
+    pairs = matrix.pairs()
+    assert sorted((slot, a, b) for slot, a, b, change in pairs) == [
+        (2, 'L', 'O'), (2, 'L', 'U'), (2, 'O', 'U'), (3, '<', '='), (4, 'E', 'F'), (5, 'E', 'F')]
+
+    contrasts = [custom_contrast(a, b, [slot]) for slot, a, b, change in pairs]
+    results = functional_load(encoded, contrasts, weighting=weighting)
+    for (slot, a, b, change), result, pairResult in zip(pairs, results, matrix.results()):
+        assert change == pytest.approx(result.change, abs=1e-12)
+        assert pairResult.endingSize == result.endingSize
+        assert pairResult.endingEntropy == pytest.approx(result.endingEntropy, abs=1e-12)
+        assert matrix.values[slot-1, matrix.symbols.index(b), matrix.symbols.index(a)] == pytest.approx(change)
+    #a pair of symbols that never appear in the same slot has no value
+    assert np.isnan(matrix.values[1, matrix.symbols.index('O'), matrix.symbols.index('F')])
@@ -0,0 +1,53 @@
+import pickle
+from constants import EMPTY_CONFIG_HAND
+from lexicon import Corpus, CorpusStatistics, Sign
+
+
+def make_sign(gloss, config1, config2):
+    return Sign({'gloss': gloss, 'config1': config1, 'config2': config2})
+
+
+def test_empty_config_hand_matches_default_slots(empty_hand):
+    assert tuple(empty_hand[1:]) == EMPTY_CONFIG_HAND
+
+
+def test_one_handed_sign_from_default_slots(empty_hand):
+    empty = empty_hand
+    hand = list(empty)
+    hand[1:5] = ['O', '=', 'F', 'F']
+    sign = make_sign('one-hand', [hand, empty[:]], [hand[:], empty[:]])
+    assert sign.hand_type == 'one'
+    assert sign.config_type == 'two'
+    assert sign.sign_type == 'one'
+
+    corpus = Corpus({'name': 'test'})
+    corpus.addWord(sign)
+    corpus.addWord(make_sign('two-hand', [hand[:], hand[:]], [hand[:], hand[:]]))
+    assert [s.gloss for s in corpus.signsOfType(hand_type='One-hand signs')] == ['one-hand']
+    assert [s.gloss for s in corpus.signsOfType(hand_type='Two-hand signs')] == ['two-hand']
+
+
+def test_one_config_sign_from_default_slots(empty_hand):
+    empty = empty_hand
+    hand = list(empty)
+    hand[1:5] = ['O', '=', 'F', 'F']
+    sign = make_sign('one-config', [hand, hand[:]], [empty[:], empty[:]])
+    assert sign.hand_type == 'two'
+    assert sign.config_type == 'one'
+    assert sign.sign_type == 'two-same'
+
+
+def test_saved_classifications_are_rebuilt(empty_hand):
+    empty = empty_hand
+    hand = list(empty)
+    hand[1:5] = ['O', '=', 'F', 'F']
+    corpus = Corpus({'name': 'test'})
+    corpus.addWord(make_sign('one-hand', [hand, empty[:]], [hand[:], empty[:]]))
+    #as saved by a version that classified this sign as two-handed
+    corpus['one-hand']._classification = 0
+    corpus.statistics.version = CorpusStatistics.VERSION - 1
+
+    loaded = pickle.loads(pickle.dumps(corpus))
+    assert loaded['one-hand'].hand_type == 'one'
+    assert loaded.statistics.version == CorpusStatistics.VERSION
+    assert [s.gloss for s in loaded.signsOfType(hand_type='One-hand signs')] == ['one-hand']
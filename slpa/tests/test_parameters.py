@@ -0,0 +1,210 @@
+import os
+import pickle
+from xml.etree import ElementTree
+import pytest
+import parameters
+from lexicon import Sign
+from parameters import ParameterSelection, parameterSchema
+
+#parameter XML written by exportXML before it walked the tree once: the default parameters, then the same with Arc
+#and Wiggling as the two contours and Local Repetition's "Specify" renamed to "Three times"
+BASELINE_XML = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'baseline_parameters.xml')
+
+
+@pytest.fixture
+def baseline_xml():
+    with open(BASELINE_XML, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def node(*path):
+    """
+    :return: the schema's number for the parameter at the end of a path of names
+    """
+    numbers = parameterSchema.top
+    for name in path:
+        number = next(number for number in numbers if parameterSchema.names[number] == name)
+        numbers = parameterSchema.childNumbers[number]
+    return number
+
+
+def assert_written_under_parents(element, parameterList):
+    assert [child.attrib['name'] for child in element] == [parameter.name for parameter in parameterList]
+    for child, parameter in zip(element, parameterList):
+        assert child.attrib['parent'] == element.attrib['name']
+        assert child.attrib['is_checked'] == parameters.booleanToText(parameter.is_checked)
+        assert_written_under_parents(child, parameter.children)
+
+
+def test_export_xml_writes_every_parameter_under_its_own_parent():
+    tree = parameterSchema.tree(ParameterSelection())
+    top = ElementTree.fromstring(parameters.exportXML(tree))
+    assert top.tag == 'Parameters'
+    assert_written_under_parents(top, tree)
+    #both contours have their own children, which earlier versions of exportXML got wrong
+    contours = [element for element in top.iter('Contour_of_movement')]
+    assert [len(contour) for contour in contours] == [6, 10]
+    assert top.find('Major_Location/Signing_space_location/Vector/Zero').attrib['name'] == '0'
+
+
+def test_export_xml_escapes_renamed_parameters():
+    specify = node('Local Movement', 'Local Repetition', 'Specify')
+    name = '3 < 4 & "5" >\n\tsix'
+    tree = parameterSchema.tree(ParameterSelection([(specify, True, name)]))
+    xml = parameters.exportXML(tree)
+    assert '&lt;' in xml and '&amp;' in xml and '&quot;' in xml and '&#10;' in xml
+    parsed = parameters.parseXML(xml)
+    assert parameterSchema.selection(parsed) == ParameterSelection([(specify, True, name)])
+    #the same string whether the tree is shared or not, and cached for the selection
+    shared = parameterSchema.sharedTree(parameterSchema.selection(parsed))
+    assert parameters.exportXML(shared) == xml
+    assert parameters.exportXML(shared) is parameters.exportXML(shared)
+
+
+def test_baseline_xml_gets_the_selection_it_was_written_from(baseline_xml):
+    default, edited = baseline_xml
+    assert parameterSchema.selection(parameters.parseXML(default)) == ParameterSelection()
+    assert parameters.sharedParseXML(default).selection == ParameterSelection()
+
+    major = ('Major Movement', 'Contour of movement')
+    local = ('Local Movement', 'Contour of movement')
+    specify = node('Local Movement', 'Local Repetition', 'Specify')
+    expected = ParameterSelection([(node(*major, 'Hold'), False, None), (node(*major, 'Arc'), True, None),
+                                   (node(*local, 'Hold'), False, None), (node(*local, 'Wiggling'), True, None),
+                                   (node('Local Movement', 'Local Repetition', 'None'), False, None),
+                                   (specify, True, 'Three times')])
+    assert parameterSchema.selection(parameters.parseXML(edited)) == expected
+
+
+def test_baseline_xml_is_read_back_under_the_right_parents(baseline_xml, monkeypatch):
+    monkeypatch.setattr(parameters, 'parseCache', dict())
+    shared = parameters.sharedParseXML(baseline_xml[1])
+    assert shared is parameterSchema.sharedTree(shared.selection)
+    checked = parameters.exportTree(shared).split(',')
+    assert checked.count('Contour of movement:Arc') == 1
+    assert checked.count('Contour of movement:Wiggling') == 1
+    assert 'Local Repetition:Three times' in checked
+    local = next(p for p in shared if p.name == 'Local Movement').children[0]
+    assert [child.name for child in local.children if child.is_checked] == ['Wiggling']
+    #written again, the parameters are in the current layout
+    assert parameters.exportXML(shared) == parameters.exportXML(parameterSchema.tree(shared.selection))
+
+
+def xml_without(name):
+    """
+    :return: the default parameter XML with the top-level parameter called name left out, which does not fit the schema
+    """
+    top = ElementTree.fromstring(parameters.exportXML(parameterSchema.tree(ParameterSelection())))
+    top.remove(next(element for element in top if element.attrib['name'] == name))
+    return ElementTree.tostring(top, encoding='unicode')
+
+
+def test_shared_parse_xml_shares_one_tree_per_selection(baseline_xml, monkeypatch):
+    monkeypatch.setattr(parameters, 'parseCache', dict())
+    monkeypatch.setattr(parameterSchema, 'trees', dict())
+    default = parameters.exportXML(parameterSchema.tree(ParameterSelection()))
+    shared = parameters.sharedParseXML(default)
+    assert parameters.sharedParseXML(default) is shared
+    assert isinstance(shared, parameters.SharedParameters)
+    #a different string for the same selection still gets the same tree
+    assert parameters.sharedParseXML(baseline_xml[0]) is shared
+    assert shared is parameterSchema.sharedTree(ParameterSelection())
+
+    #parameters that do not fit the schema are kept as parsed, and shared by their XML
+    odd = xml_without('Reduplication')
+    oddShared = parameters.sharedParseXML(odd)
+    assert oddShared.selection is None
+    assert [parameter.name for parameter in oddShared] == ['Quality', 'Major Movement', 'Local Movement',
+                                                           'Major Location']
+    assert parameters.sharedParseXML(odd) is oddShared
+
+    #editing needs a private copy
+    private = parameters.privateParameters(shared)
+    assert isinstance(private, list) and not isinstance(private, parameters.SharedParameters)
+    private[0].is_checked = True
+    assert not shared[0].is_checked
+    assert parameters.privateParameters(private) is private
+
+
+def test_shared_parse_xml_cache_is_cleared_when_full(monkeypatch):
+    monkeypatch.setattr(parameters, 'PARSE_CACHE_SIZE', 2)
+    monkeypatch.setattr(parameters, 'parseCache', dict())
+    strings = [xml_without(name) for name in ['Quality', 'Major Movement', 'Local Movement']]
+    first = parameters.sharedParseXML(strings[0])
+    parameters.sharedParseXML(strings[1])
+    assert len(parameters.parseCache) == 2
+    third = parameters.sharedParseXML(strings[2])
+    assert list(parameters.parseCache) == [strings[2]]
+    assert parameters.sharedParseXML(strings[2]) is third
+    #parsed again after it was dropped, as a new but equal tree
+    again = parameters.sharedParseXML(strings[0])
+    assert again is not first
+    assert parameters.exportXML(again) == parameters.exportXML(first)
+
+
+def test_selection_and_tree_round_trip():
+    for changes in [[], [(0, True, None)], [(node('Reduplication', 'None'), False, None),
+                                            (node('Reduplication', 'Twice'), True, None)],
+                    [(number, not default, None) for number, default in enumerate(parameterSchema.defaults)]]:
+        selection = ParameterSelection(changes)
+        tree = parameterSchema.tree(selection)
+        assert parameterSchema.selection(tree) == selection
+        assert parameters.exportTree(tree) == parameters.exportTree(parameterSchema.sharedTree(selection))
+        checked = [number for number, parameter in enumerate(parameters.walkParameters(tree)) if parameter.is_checked]
+        assert parameterSchema.checked(selection) == checked
+    #the defaults need no changes, and selections with the same changes are one object
+    assert parameterSchema.selection(parameters.defaultParameters) == ParameterSelection()
+    assert parameterSchema.intern(ParameterSelection([(0, True, None)])) is parameterSchema.intern(
+        ParameterSelection([(0, True, None)]))
+
+
+def test_renamed_editable_parameters():
+    specify = node('Major Movement', 'Major Movement Repetition', 'Specify')
+    tree = parameterSchema.tree(ParameterSelection())
+    nodes = list(parameters.walkParameters(tree))
+    nodes[specify].name = 'Four times'
+    nodes[specify].is_checked = True
+    selection = parameterSchema.selection(tree)
+    assert selection == ParameterSelection([(specify, True, 'Four times')])
+    assert list(parameters.walkParameters(parameterSchema.tree(selection)))[specify].name == 'Four times'
+
+    #renamed but not checked is still a change
+    nodes[specify].is_checked = False
+    assert parameterSchema.selection(tree) == ParameterSelection([(specify, False, 'Four times')])
+    #only editable parameters can be renamed, and only one of a parameter's children
+    nodes[specify - 1].name = 'Many'
+    assert parameterSchema.selection(tree) is None
+    nodes[specify - 1].name = parameterSchema.names[specify - 1]
+    nodes[node('Quality', 'Temporal')].name = 'Timing'
+    assert parameterSchema.selection(tree) is None
+
+
+def test_shared_trees_are_rebuilt_after_the_cache_is_cleared(monkeypatch):
+    monkeypatch.setattr(parameters, 'PARSE_CACHE_SIZE', 2)
+    monkeypatch.setattr(parameterSchema, 'trees', dict())
+    selections = [parameterSchema.intern(ParameterSelection([(number, True, None)])) for number in range(3)]
+    first = parameterSchema.sharedTree(selections[0])
+    assert parameterSchema.sharedTree(selections[0]) is first
+    assert first.selection is selections[0]
+    for selection in selections[1:]:
+        parameterSchema.sharedTree(selection)
+    assert list(parameterSchema.trees) == [selections[2]]
+    again = parameterSchema.sharedTree(selections[0])
+    assert again is not first
+    assert parameterSchema.selection(again) == selections[0]
+
+
+def test_signs_store_their_selection(empty_hand):
+    selection = ParameterSelection([(node('Reduplication', 'Once'), True, None)])
+    sign = Sign({'gloss': 'a', 'config1': [empty_hand[:], empty_hand[:]], 'config2': [empty_hand[:], empty_hand[:]],
+                 'parameters': parameterSchema.tree(selection)})
+    assert sign.parameterSelection == selection
+    assert parameterSchema.selection(sign.parameters) == selection
+    copy = pickle.loads(pickle.dumps(sign))
+    assert copy.parameterSelection == selection
+
+    #parameters that do not fit the schema are kept as they are
+    odd = parameters.parseXML(xml_without('Quality'))
+    sign.parameters = odd
+    assert sign.parameterSelection is None
+    assert sign.parameters is odd